@@ -1,14 +1,28 @@
-import pywhatkit as kit
-import requests
 from datetime import datetime, timedelta
-import time
-import schedule
+import functools
 import json
 import os
+import uuid
 import logging
-from typing import List, Dict, Optional
-import pandas as pd
-import re
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Union
+
+from storage import open_storage
+from dispatch import BroadcastDispatcher
+from transport import Transport, create_transport
+from outbox import Outbox, DeferDelivery
+from scheduler import Scheduler, DAY
+from github_status import GitHubStatusChecker
+from phone_numbers import format_phone, check_recipients
+from templates import TemplateStore, compile_template
+from auto_reply import AutoReplyEngine, FileSource, InboundSource
+from quota import QuotaMeter
+import metrics
+from SkyBot_Pro import SERVICES
+import bulk_io
+
+# Imported on first use: heavy modules stay out of cold start (see benchmarks/bench_import.py)
+if TYPE_CHECKING:
+    from fleet import BroadcastFleet
 
 # Configure logging
 logging.basicConfig(
@@ -21,26 +35,142 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Recorded only while metrics are enabled (SKYBOT_METRICS=1)
+MESSAGES = metrics.counter("skybot_messages_total", "Send attempts by outcome", ("type", "result", "client"))
+QUEUED = metrics.counter("skybot_queued_total", "Messages put in the outbox", ("client",))
+
+STATUS_REPORT_TEMPLATE = """🤖 *Sky Bot Status Report* 🤖
+
+📞 Bot Phone: {your_number}
+🌍 Country Code: +{country_code}
+🔗 GitHub: {github_url}
+🕒 Local Time: {local_time}
+📊 Total Contacts: {contact_count}
+📨 Messages Sent Today: {today_count}
+🔧 Bot Version: 1.0.0
+✅ Status: Operational
+
+{github_status}
+
+_Sky Bot - Automated WhatsApp Assistant_"""
+
 class SkyWhatsAppBot:
-    def __init__(self):
-        """Initialize Sky WhatsApp Bot"""
+    # Settings a business can override through `config`
+    CONFIG_KEYS = ("your_number", "country_code", "wait_time", "close_tab", "tab_close_delay",
+                   "send_rate", "send_burst", "send_retries")
+    
+    def __init__(self, storage: str = "sqlite", transport: Union[str, Transport] = "pywhatkit",
+                 data_dir: str = ".", config: Optional[Dict] = None, recover_outbox: bool = True):
+        """
+        Initialize Sky WhatsApp Bot
+        
+        Args:
+            storage: Storage backend, "sqlite" or "json"
+            transport: "pywhatkit", "web" (persistent session), "mock" or a Transport instance
+            data_dir: Directory for this bot's data files
+            config: Overrides for CONFIG_KEYS (e.g. another business's number)
+            recover_outbox: Replay messages left in flight by the last run; pass
+                False when another process is delivering from the same outbox
+        """
         # Your contact information
         self.your_number = "0748529340"  # South Africa number
         self.country_code = "27"  # South Africa country code
         self.github_url = "https://github.com/Sky95360/Sky_b.o.t"
+        self.github = GitHubStatusChecker("https://api.github.com/repos/Sky95360/Sky_b.o.t")
         
         # WhatsApp Web configuration
         self.wait_time = 20  # seconds for WhatsApp Web to load
         self.close_tab = True
         self.tab_close_delay = 3
         
+        # Broadcast rate limiting
+        self.send_rate = 0.2  # messages per second across all workers
+        self.send_burst = 1
+        self.send_retries = 2
+        
+        for key, value in (config or {}).items():
+            if key not in self.CONFIG_KEYS:
+                raise ValueError(f"Unknown bot setting: {key}")
+            setattr(self, key, value)
+        
+        # Message delivery
+        self.transport_kind = None if isinstance(transport, Transport) else transport
+        if isinstance(transport, Transport):
+            self.transport = transport
+        elif transport == "pywhatkit":
+            self.transport = create_transport(
+                transport,
+                wait_time=self.wait_time,
+                close_tab=self.close_tab,
+                tab_close_delay=self.tab_close_delay
+            )
+        elif transport == "web":
+            self.transport = create_transport(
+                transport,
+                profile_dir=os.path.join(data_dir, "whatsapp_session"),
+                wait_time=self.wait_time
+            )
+        else:
+            self.transport = create_transport(transport)
+        
+        # Browser-driven transports own one window, so only one sender at a time
+        self.send_workers = 4 if self.transport.concurrent else 1
+        
         # Data storage
-        self.contacts_file = "contacts.json"
-        self.messages_file = "messages.json"
-        self.scheduled_tasks = []
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+        self.contacts_file = os.path.join(data_dir, "contacts.json")
+        self.messages_file = os.path.join(data_dir, "messages.json")
+        self.message_log_dir = os.path.join(data_dir, "message_log")
+        self.clients_file = os.path.join(data_dir, "clients.json")
+        self.db_file = os.path.join(data_dir, "skybot.db")
+        self.outbox_file = os.path.join(data_dir, "outbox.db")
+        self.jobs_file = os.path.join(data_dir, "scheduled_jobs.db")
+        self.auto_replies_file = os.path.join(data_dir, "auto_replies.json")
+        self.usage_file = os.path.join(data_dir, "usage.json")
         
         # Create data files if they don't exist
         self._initialize_data_files()
+        
+        # Contacts, message log and clients (a new database imports the JSON files)
+        self.storage = open_storage(
+            storage,
+            db_file=self.db_file,
+            contacts_file=self.contacts_file,
+            log_dir=self.message_log_dir,
+            clients_file=self.clients_file,
+            normalize=self.format_phone_number
+        )
+        
+        self.dispatcher = BroadcastDispatcher(
+            self.send_instant_message,
+            rate=self.send_rate,
+            burst=self.send_burst,
+            workers=self.send_workers,
+            max_retries=self.send_retries
+        )
+        
+        # Monthly message quotas of SkyBot Pro clients (sends made with a client_id)
+        self.quota = QuotaMeter(self.usage_file, limit_for=self._client_quota)
+        
+        # Durable queue drained in the background by start_outbox()
+        self.outbox = Outbox(self.outbox_file, max_attempts=self.send_retries + 1, recover=recover_outbox)
+        
+        # Timed jobs (persisted); due jobs are queued into the outbox
+        self.scheduler = Scheduler(self.jobs_file, run_job=self._run_scheduled_job)
+        
+        # Message templates from messages.json, compiled once
+        self.templates = TemplateStore(self.messages_file)
+        self.templates.register("status_report", STATUS_REPORT_TEMPLATE, category="status")
+        
+        # Keyword/regex auto-replies, answered through the outbox
+        self.auto_replies = AutoReplyEngine(self.queue_message, self.auto_replies_file)
+        
+        # Worker processes for large group broadcasts (see start_fleet)
+        self.fleet: Optional["BroadcastFleet"] = None
+        
+        # Parquet-backed message analytics, created on first use (pandas is slow to import)
+        self._message_analytics = None
     
     def _initialize_data_files(self):
         """Create necessary data files"""
@@ -91,64 +221,86 @@ class SkyWhatsAppBot:
             phone_number: Phone number to format
             
         Returns:
-            Formatted phone number with country code
+            Formatted phone number with country code (numbers given as
+            +<code>... keep their own country code)
         """
-        # Remove any non-digit characters
-        phone_digits = re.sub(r'\D', '', phone_number)
-        
-        # If number starts with 0, replace with country code
-        if phone_digits.startswith('0'):
-            phone_digits = self.country_code + phone_digits[1:]
-        
-        # Ensure it starts with country code
-        if not phone_digits.startswith(self.country_code):
-            phone_digits = self.country_code + phone_digits
+        return format_phone(phone_number, self.country_code)
+    
+    def _client_quota(self, client_id: str) -> Optional[int]:
+        """Monthly message limit of a SkyBot Pro client from its plan"""
+        try:
+            client = self.storage.get_client(int(client_id))
+        except ValueError:
+            client = None
         
-        return phone_digits
+        if client is None:
+            logger.warning(f"Unknown client {client_id}: sends are not metered")
+            return None
+        if client.get("status") != "active":
+            return 0
+        return SERVICES.get(client["plan"], {}).get("quota")
     
-    def send_instant_message(self, phone_number: str, message: str) -> bool:
+    def send_instant_message(self, phone_number: str, message: str, client_id: Optional[str] = None,
+                             reserved: bool = False) -> bool:
         """
-        Send instant message using pywhatkit
+        Send instant message through the configured transport
         
         Args:
             phone_number: Recipient's phone number
             message: Message to send
+            client_id: SkyBot Pro client to count the send against (rejected when over quota)
+            reserved: The caller already reserved this send on client_id's quota
+                (broadcasts); the send is only logged under the client
             
         Returns:
             bool: Success status
         """
+        client = client_id or ""
+        metered = client_id is not None and not reserved
+        if metered and not self.quota.try_consume(client_id):
+            logger.warning(f"Client {client_id} is over its monthly quota, not sending to {phone_number}")
+            MESSAGES.inc(type="text", result="over_quota", client=client)
+            return False
+        
         try:
-            formatted_number = self.format_phone_number(phone_number)
+            with metrics.span("normalize"):
+                formatted_number = self.format_phone_number(phone_number)
             
             # Send message immediately
-            kit.sendwhatmsg_instantly(
-                phone_no=f"+{formatted_number}",
-                message=message,
-                wait_time=self.wait_time,
-                tab_close=self.close_tab,
-                close_time=self.tab_close_delay
-            )
+            with metrics.span("transport"):
+                self.transport.send_text(formatted_number, message)
             
             logger.info(f"Message sent to {formatted_number}: {message[:50]}...")
             
             # Log the message
-            self.log_message(formatted_number, message, "instant")
+            with metrics.span("log"):
+                self.log_message(formatted_number, message, "instant", client_id)
             
+            MESSAGES.inc(type="text", result="sent", client=client)
             return True
             
         except Exception as e:
             logger.error(f"Failed to send message to {phone_number}: {str(e)}")
+            MESSAGES.inc(type="text", result="failed", client=client)
+            if metered:
+                self.quota.refund(client_id)
+            self._log_failure(phone_number, message, "instant", client_id)
             return False
     
-    def send_scheduled_message(self, phone_number: str, message: str, hour: int, minute: int) -> bool:
+    def send_scheduled_message(self, phone_number: str, message: str, hour: int, minute: int,
+                               repeat_daily: bool = False) -> bool:
         """
         Schedule a message for specific time
         
+        The job is stored by the scheduler and survives restarts; it fires
+        while start_background() is running.
+        
         Args:
             phone_number: Recipient's phone number
             message: Message to send
             hour: Hour (0-23)
             minute: Minute (0-59)
+            repeat_daily: Send again every day at the same time
             
         Returns:
             bool: Success status
@@ -163,62 +315,342 @@ class SkyWhatsAppBot:
             if target_time < now:
                 target_time += timedelta(days=1)
             
-            # Send scheduled message
-            kit.sendwhatmsg(
-                phone_no=f"+{formatted_number}",
-                message=message,
-                time_hour=hour,
-                time_min=minute,
-                wait_time=self.wait_time,
-                tab_close=self.close_tab,
-                close_time=self.tab_close_delay
-            )
+            # Suffix: a second message to the same number at the same time is its own job
+            task_id = f"{formatted_number}_{hour}_{minute}_{uuid.uuid4().hex[:8]}"
+            with metrics.span("schedule"):
+                self.scheduler.add(
+                    task_id,
+                    target_time,
+                    interval=DAY if repeat_daily else None,
+                    phone=formatted_number,
+                    message=message,
+                    time=f"{hour:02d}:{minute:02d}"
+                )
             
             logger.info(f"Scheduled message to {formatted_number} at {hour:02d}:{minute:02d}")
-            
-            # Schedule task for recurring if needed
-            task_id = f"{formatted_number}_{hour}_{minute}"
-            schedule.every().day.at(f"{hour:02d}:{minute:02d}").do(
-                self.send_instant_message, formatted_number, message
-            ).tag(task_id)
-            
-            self.scheduled_tasks.append({
-                "id": task_id,
-                "phone": formatted_number,
-                "message": message,
-                "time": f"{hour:02d}:{minute:02d}",
-                "scheduled_at": datetime.now().isoformat()
-            })
-            
             return True
             
         except Exception as e:
             logger.error(f"Failed to schedule message: {str(e)}")
             return False
     
-    def send_to_multiple_contacts(self, phone_numbers: List[str], message: str) -> Dict[str, bool]:
+    def send_to_multiple_contacts(self, phone_numbers: List[str], message: Union[str, Callable[[str], str]],
+                                  progress: Optional[Callable[[int, int, str, bool], None]] = None,
+                                  client_id: Optional[str] = None) -> Dict[str, bool]:
         """
         Send message to multiple contacts
         
+        Numbers are validated up front: invalid ones are skipped and
+        duplicates are sent once. Sends are paced by the dispatcher's token
+        bucket (send_rate) and failed recipients are retried with
+        exponential backoff.
+        
         Args:
             phone_numbers: List of phone numbers
-            message: Message to send
+            message: Message to send, or message(formatted_number) -> text
+            progress: Optional callback(done, total, phone, success)
+            client_id: SkyBot Pro client to count the sends against; recipients
+                beyond its remaining quota are not sent to
             
         Returns:
             Dict with results for each number
         """
-        results = {}
+        report = self._check_recipients(phone_numbers)
+        recipients = report["valid"]
+        
+        if client_id is not None:
+            granted = self.quota.reserve(client_id, len(recipients))
+            if granted < len(recipients):
+                logger.warning(f"Client {client_id} quota covers {granted} of {len(recipients)} recipients")
+            recipients = recipients[:granted]
+        
+        send = None
+        if client_id is not None:
+            # Reserved above; each send is still logged and counted under the client
+            send = functools.partial(self.send_instant_message, client_id=str(client_id), reserved=True)
+        sent = self.dispatcher.dispatch(recipients, message, progress, send=send)
+        
+        if client_id is not None:
+            failed = sum(1 for success in sent.values() if not success)
+            if failed:
+                self.quota.refund(client_id, failed)
         
-        for phone in phone_numbers:
-            success = self.send_instant_message(phone, message)
-            results[phone] = success
+        return {phone: sent.get(self.format_phone_number(phone), False) for phone in phone_numbers}
+    
+    def _check_recipients(self, phone_numbers: List[str]) -> Dict[str, List[str]]:
+        """Validate a recipient list and log what will be skipped"""
+        report = check_recipients(phone_numbers, self.country_code)
+        if report["invalid"]:
+            logger.warning(f"Skipping {len(report['invalid'])} invalid numbers: {report['invalid'][:10]}")
+        if report["duplicates"]:
+            logger.warning(f"Ignoring {len(report['duplicates'])} duplicate numbers: {report['duplicates'][:10]}")
+        return report
+    
+    def queue_message(self, phone_number: str, message: str, file_path: Optional[str] = None,
+                      client_id: Optional[str] = None) -> Optional[int]:
+        """
+        Queue a message for the background outbox worker
+        
+        Args:
+            phone_number: Recipient's phone number
+            message: Message (caption when file_path is set)
+            file_path: Optional image to attach
+            client_id: SkyBot Pro client to count the send against; over
+                quota, the message waits in the outbox until the next month
             
-            # Add delay between messages to avoid rate limiting
-            time.sleep(5)
+        Returns:
+            Outbox message id
+        """
+        message_id = self.outbox.enqueue(
+            self.format_phone_number(phone_number),
+            message,
+            kind="image" if file_path else "text",
+            attachment=file_path,
+            client_id=None if client_id is None else str(client_id)
+        )
+        if message_id:
+            QUEUED.inc(client=client_id or "")
+        return message_id
+    
+    def queue_messages(self, messages: List[Dict], client_id: Optional[str] = None) -> List[Optional[int]]:
+        """
+        Queue many individual messages in one outbox transaction
         
-        return results
+        Args:
+            messages: Dicts with "phone", "message" and optional "file_path"
+            client_id: SkyBot Pro client to count the sends against
+            
+        Returns:
+            Outbox message id per input
+        """
+        message_ids = self.outbox.enqueue_many([
+            {
+                "phone": self.format_phone_number(item["phone"]),
+                "message": item["message"],
+                "kind": "image" if item.get("file_path") else "text",
+                "attachment": item.get("file_path"),
+                "client_id": None if client_id is None else str(client_id)
+            }
+            for item in messages
+        ])
+        QUEUED.inc(sum(1 for message_id in message_ids if message_id), client=client_id or "")
+        return message_ids
     
-    def send_with_attachment(self, phone_number: str, message: str, file_path: str) -> bool:
+    def queue_broadcast(self, phone_numbers: List[str], message: Union[str, Callable[[str], str]],
+                        broadcast_id: Optional[str] = None, client_id: Optional[str] = None) -> int:
+        """
+        Queue the same message for many recipients
+        
+        Args:
+            phone_numbers: List of phone numbers
+            message: Message to send, or message(formatted_number) -> text
+            broadcast_id: Reusing an id skips recipients it already queued
+            client_id: SkyBot Pro client to count the sends against
+            
+        Returns:
+            Number of newly queued messages
+        """
+        broadcast_id = broadcast_id or datetime.now().strftime("%Y%m%d%H%M%S%f")
+        items = []
+        for formatted_number in self._check_recipients(phone_numbers)["valid"]:
+            items.append({
+                "phone": formatted_number,
+                "message": message(formatted_number) if callable(message) else message,
+                "dedupe_key": f"{broadcast_id}:{formatted_number}",
+                "client_id": None if client_id is None else str(client_id)
+            })
+        
+        queued = sum(1 for message_id in self.outbox.enqueue_many(items) if message_id)
+        QUEUED.inc(queued, client=client_id or "")
+        logger.info(f"Queued broadcast {broadcast_id}: {queued} messages")
+        return queued
+    
+    def personalize(self, message: str, contacts: List[Dict]) -> Union[str, Callable[[str], str]]:
+        """
+        Prepare a broadcast message for per-contact placeholders
+        
+        Args:
+            message: Text, may contain placeholders such as {name} or {group}
+            contacts: Recipient contact records
+            
+        Returns:
+            The text itself if it has no placeholders, otherwise a
+            callable mapping a formatted number to that contact's text
+        """
+        template = compile_template(message)
+        if template.is_static:
+            return message
+        
+        by_phone = {self.format_phone_number(contact["phone"]): contact for contact in contacts}
+        
+        def render(phone: str) -> str:
+            with metrics.span("render"):
+                return template.render(by_phone.get(phone))
+        return render
+    
+    def _deliver_queued(self, item: Dict, before_send: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Outbox worker callback: send one queued message
+        
+        Args:
+            item: Claimed outbox row
+            before_send: Called once the message is known to go out now (e.g.
+                a rate limiter's acquire), so deferred messages use no token
+        """
+        client_id = item.get("client_id")
+        if client_id is not None and self.quota.remaining(client_id) == 0:
+            raise DeferDelivery(self.quota.next_reset(), "monthly quota used up")
+        
+        if before_send:
+            before_send()
+        if item["kind"] == "image":
+            return self.send_with_attachment(item["phone"], item["message"], item["attachment"], client_id)
+        return self.send_instant_message(item["phone"], item["message"], client_id)
+    
+    def _run_scheduled_job(self, job: Dict, client_id: Optional[str] = None):
+        """Scheduler callback: hand a due job to the outbox (counted against client_id's quota)"""
+        self.queue_message(job["phone"], job["message"], client_id=client_id)
+    
+    def start_background(self):
+        """Start the outbox workers and the scheduler thread"""
+        self.start_outbox()
+        self.scheduler.start()
+        # Warm the GitHub status cache for the first status report
+        self.github.status()
+    
+    def start_outbox(self):
+        """Start draining the outbox in the background (rate limited like broadcasts)"""
+        # The rate token is taken inside _deliver_queued, after the quota check
+        self.outbox.start(
+            functools.partial(self._deliver_queued, before_send=self.dispatcher.bucket.acquire),
+            workers=self.send_workers
+        )
+    
+    def answer_incoming(self, source: Union[str, InboundSource] = "-", follow: bool = False) -> int:
+        """
+        Auto-reply to incoming messages
+        
+        Args:
+            source: InboundSource, or a file of incoming messages ("-" for stdin),
+                one JSON object or "<phone> <text>" per line
+            follow: Keep waiting for new lines in the file
+            
+        Returns:
+            Number of replies queued
+        """
+        if not isinstance(source, InboundSource):
+            source = FileSource(source, follow=follow)
+        
+        try:
+            replied = self.auto_replies.run(source)
+            logger.info(f"Answered {replied} incoming messages")
+            return replied
+        finally:
+            source.close()
+    
+    def start_fleet(self, workers: Optional[int] = None) -> "BroadcastFleet":
+        """
+        Deliver group broadcasts from a pool of worker processes
+        
+        Recipients are sharded by phone hash; each worker opens its own
+        transport session (a separate WhatsApp Web login per worker for
+        "web"). The fleet shares send_rate between its workers.
+        
+        Args:
+            workers: Worker processes (default: CPU count)
+        """
+        from fleet import BroadcastFleet
+        
+        if self.transport_kind is None:
+            raise ValueError("The fleet needs a transport name, not a Transport instance")
+        
+        options = {}
+        if self.transport_kind == "pywhatkit":
+            options = {"wait_time": self.wait_time, "close_tab": self.close_tab,
+                       "tab_close_delay": self.tab_close_delay}
+        elif self.transport_kind == "web":
+            options = {"wait_time": self.wait_time,
+                       "profile_dir": os.path.join(self.data_dir, "whatsapp_session")}
+        
+        self.fleet = BroadcastFleet(
+            workers,
+            transport=self.transport_kind,
+            transport_options=options,
+            rate=self.send_rate,
+            burst=self.send_burst,
+            max_retries=self.send_retries
+        )
+        return self.fleet
+    
+    def analytics(self, client_id: Optional[str] = None) -> Dict:
+        """
+        Send counters and per-stage latency since start (needs SKYBOT_METRICS=1)
+        
+        Args:
+            client_id: Only count this SkyBot Pro client's messages
+            
+        Returns:
+            Dict with "messages" ({type: {result: count}}), "queued" and
+            "stages" ({stage: count/mean/p50/p99 seconds, across all clients})
+        """
+        client = None if client_id is None else str(client_id)
+        messages: Dict[str, Dict[str, int]] = {}
+        for (kind, result, key), count in MESSAGES.values().items():
+            if client is None or key == client:
+                by_result = messages.setdefault(kind, {})
+                by_result[result] = by_result.get(result, 0) + int(count)
+        
+        queued = sum(int(count) for (key,), count in QUEUED.values().items() if client is None or key == client)
+        return {
+            "enabled": metrics.enabled(),
+            "messages": messages,
+            "queued": queued,
+            "stages": metrics.stage_summary()
+        }
+    
+    def message_analytics(self):
+        """The bot's MessageAnalytics (log compacted under data_dir/analytics)"""
+        if self._message_analytics is None:
+            from analytics import MessageAnalytics
+            
+            self._message_analytics = MessageAnalytics(
+                self.storage,
+                os.path.join(self.data_dir, "analytics"),
+                normalize=self.format_phone_number
+            )
+        return self._message_analytics
+    
+    def message_report(self, client_id: Optional[str] = None, start: Optional[str] = None,
+                       end: Optional[str] = None, top: int = 10) -> Dict:
+        """
+        Message history report for the "Analytics" plan feature
+        
+        Args:
+            client_id: Only this SkyBot Pro client's messages
+            start: First day (YYYY-MM-DD)
+            end: Last day (YYYY-MM-DD)
+            top: Number of top recipients to list
+            
+        Returns:
+            Dict with summary, sends by hour/type/group/client, success rate
+            by type and top recipients
+        """
+        return self.message_analytics().report(start, end, client_id, top)
+    
+    def close(self):
+        """Stop background work and close storage and the transport"""
+        if metrics.enabled():
+            metrics.dump(os.path.join(self.data_dir, "metrics.prom"))
+        if self.fleet is not None:
+            self.fleet.close()
+        self.scheduler.close()
+        self.outbox.close()
+        self.quota.close()
+        self.storage.close()
+        self.transport.close()
+    
+    def send_with_attachment(self, phone_number: str, message: str, file_path: str,
+                             client_id: Optional[str] = None) -> bool:
         """
         Send message with file attachment
         
@@ -226,64 +658,81 @@ class SkyWhatsAppBot:
             phone_number: Recipient's phone number
             message: Message to send
             file_path: Path to file
+            client_id: SkyBot Pro client to count the send against (rejected when over quota)
             
         Returns:
             bool: Success status
         """
+        client = client_id or ""
         try:
             formatted_number = self.format_phone_number(phone_number)
             
             # Check if file exists
             if not os.path.exists(file_path):
                 logger.error(f"File not found: {file_path}")
+                self._log_failure(phone_number, message, "image", client_id)
+                return False
+            
+            if client_id is not None and not self.quota.try_consume(client_id):
+                logger.warning(f"Client {client_id} is over its monthly quota, not sending to {phone_number}")
+                MESSAGES.inc(type="image", result="over_quota", client=client)
                 return False
             
             # Send image with caption
-            kit.sendwhats_image(
-                receiver=f"+{formatted_number}",
-                img_path=file_path,
-                caption=message,
-                wait_time=self.wait_time,
-                tab_close=self.close_tab,
-                close_time=self.tab_close_delay
-            )
+            try:
+                with metrics.span("transport"):
+                    self.transport.send_image(formatted_number, file_path, message)
+            except Exception:
+                if client_id is not None:
+                    self.quota.refund(client_id)
+                raise
             
             logger.info(f"Sent attachment to {formatted_number}: {file_path}")
+            with metrics.span("log"):
+                self.log_message(formatted_number, message, "image", client_id)
+            MESSAGES.inc(type="image", result="sent", client=client)
             return True
             
         except Exception as e:
             logger.error(f"Failed to send attachment: {str(e)}")
+            MESSAGES.inc(type="image", result="failed", client=client)
+            self._log_failure(phone_number, message, "image", client_id)
             return False
     
-    def log_message(self, phone_number: str, message: str, msg_type: str):
+    def log_message(self, phone_number: str, message: str, msg_type: str, client_id: Optional[str] = None,
+                    status: str = "sent"):
         """
-        Log sent message
+        Log a send attempt
         
         Args:
             phone_number: Recipient's number
             message: Message content
             msg_type: Type of message
+            client_id: SkyBot Pro client the message was sent for
+            status: "sent" or "failed"
         """
         log_entry = {
             "timestamp": datetime.now().isoformat(),
             "phone": phone_number,
             "message": message,
             "type": msg_type,
-            "status": "sent"
+            "status": status
         }
+        if client_id is not None:
+            log_entry["client"] = str(client_id)
         
-        # Append to log file
-        log_file = "message_log.json"
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-        else:
-            logs = []
-        
-        logs.append(log_entry)
-        
-        with open(log_file, 'w') as f:
-            json.dump(logs, f, indent=4)
+        self.storage.log_message(log_entry)
+    
+    def _log_failure(self, phone_number: str, message: str, msg_type: str, client_id: Optional[str]):
+        """Log a failed attempt (so success rates count it); never raises"""
+        try:
+            try:
+                phone_number = self.format_phone_number(phone_number)
+            except Exception:
+                pass  # Invalid numbers are logged as given
+            self.log_message(phone_number, message, msg_type, client_id, status="failed")
+        except Exception as e:
+            logger.error(f"Failed to log failed send to {phone_number}: {str(e)}")
     
     def add_contact(self, name: str, phone_number: str, group: str = "general"):
         """
@@ -297,16 +746,6 @@ class SkyWhatsAppBot:
         try:
             formatted_number = self.format_phone_number(phone_number)
             
-            with open(self.contacts_file, 'r') as f:
-                contacts = json.load(f)
-            
-            # Check if contact already exists
-            for contact in contacts:
-                if contact["phone"] == formatted_number:
-                    logger.warning(f"Contact already exists: {formatted_number}")
-                    return False
-            
-            # Add new contact
             new_contact = {
                 "name": name,
                 "phone": formatted_number,
@@ -315,10 +754,10 @@ class SkyWhatsAppBot:
                 "added_at": datetime.now().isoformat()
             }
             
-            contacts.append(new_contact)
-            
-            with open(self.contacts_file, 'w') as f:
-                json.dump(contacts, f, indent=4)
+            # Duplicate check is an indexed lookup in the storage backend
+            if not self.storage.add_contact(new_contact):
+                logger.warning(f"Contact already exists: {formatted_number}")
+                return False
             
             logger.info(f"Added contact: {name} ({formatted_number})")
             return True
@@ -327,23 +766,40 @@ class SkyWhatsAppBot:
             logger.error(f"Failed to add contact: {str(e)}")
             return False
     
-    def broadcast_to_group(self, group: str, message: str) -> Dict[str, bool]:
+    def import_contacts(self, file_path: str, group: str = "general",
+                        progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[str, int]:
+        """
+        Bulk import contacts from a CSV or XLSX file
+        
+        Args:
+            file_path: File with a "phone" column (and optional "name", "group")
+            group: Group for rows that don't name one
+            progress: Optional callback with running totals per batch
+            
+        Returns:
+            Dict with rows / added / invalid / duplicates counts
+        """
+        return bulk_io.import_contacts(self.storage, file_path, self.country_code, group, progress=progress)
+    
+    def export_contacts(self, file_path: str) -> int:
+        """Export all contacts to a CSV or XLSX file; returns row count"""
+        return bulk_io.export_contacts(self.storage, file_path)
+    
+    def broadcast_to_group(self, group: str, message: str,
+                           progress: Optional[Callable[[int, int, str, bool], None]] = None) -> Dict[str, bool]:
         """
         Broadcast message to specific group
         
         Args:
             group: Group name
             message: Message to broadcast
+            progress: Optional callback(done, total, phone, success)
             
         Returns:
             Dict with results
         """
         try:
-            with open(self.contacts_file, 'r') as f:
-                contacts = json.load(f)
-            
-            # Filter contacts by group
-            group_contacts = [c for c in contacts if c.get("group") == group]
+            group_contacts = self.storage.contacts_in_group(group)
             
             if not group_contacts:
                 logger.warning(f"No contacts found in group: {group}")
@@ -352,8 +808,17 @@ class SkyWhatsAppBot:
             # Get phone numbers
             phone_numbers = [contact["phone"] for contact in group_contacts]
             
-            # Send to all contacts in group
-            results = self.send_to_multiple_contacts(phone_numbers, message)
+            if self.fleet is not None:
+                # Worker processes render, send and log their own shard
+                by_phone = {self.format_phone_number(contact["phone"]): contact for contact in group_contacts}
+                recipients = [(phone, by_phone.get(phone)) for phone in self._check_recipients(phone_numbers)["valid"]]
+                sent = self.fleet.broadcast(recipients, message, progress, log=self.storage.log_messages)
+                results = {phone: sent.get(self.format_phone_number(phone), False) for phone in phone_numbers}
+            else:
+                # Send to all contacts in group, filling in {name} etc. per contact
+                results = self.send_to_multiple_contacts(
+                    phone_numbers, self.personalize(message, group_contacts), progress
+                )
             
             logger.info(f"Broadcast to group '{group}': {len(results)} contacts")
             return results
@@ -362,25 +827,38 @@ class SkyWhatsAppBot:
             logger.error(f"Failed to broadcast to group: {str(e)}")
             return {}
     
-    def check_github_status(self):
+    def check_github_status(self, block: bool = False) -> str:
         """
         Check GitHub repository status
+        
+        Served from a TTL cache that is revalidated in the background, so
+        this normally returns without touching the network.
+        
+        Args:
+            block: Wait (up to the request timeout) when the cache is stale
         """
-        try:
-            # Extract username and repo from URL
-            url = "https://api.github.com/repos/Sky95360/Sky_b.o.t"
-            
-            response = requests.get(url)
-            
-            if response.status_code == 200:
-                repo_data = response.json()
-                status_msg = f"GitHub Status: ✅ Online\nRepository: {repo_data['full_name']}\nStars: {repo_data['stargazers_count']}\nLast Updated: {repo_data['updated_at']}"
-                return status_msg
-            else:
-                return "GitHub Status: ❌ Cannot access repository"
-                
-        except Exception as e:
-            return f"GitHub Status: ❌ Error: {str(e)}"
+        return self.github.status(block)
+    
+    def build_status_message(self, github_status: Optional[str] = None) -> str:
+        """
+        Build the status report text
+        
+        Args:
+            github_status: Pre-fetched GitHub status (fetched now if None)
+        """
+        if github_status is None:
+            github_status = self.check_github_status()
+        
+        return self.templates.render(
+            "status_report",
+            your_number=self.your_number,
+            country_code=self.country_code,
+            github_url=self.github_url,
+            local_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            contact_count=self.get_contact_count(),
+            today_count=self.get_today_message_count(),
+            github_status=github_status
+        )
     
     def send_bot_status(self, phone_number: str):
         """
@@ -390,20 +868,7 @@ class SkyWhatsAppBot:
             formatted_number = self.format_phone_number(phone_number)
             
             # Create status message
-            status_message = f"""🤖 *Sky Bot Status Report* 🤖
-
-📞 Bot Phone: {self.your_number}
-🌍 Country Code: +{self.country_code}
-🔗 GitHub: {self.github_url}
-🕒 Local Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-📊 Total Contacts: {self.get_contact_count()}
-📨 Messages Sent Today: {self.get_today_message_count()}
-🔧 Bot Version: 1.0.0
-✅ Status: Operational
-
-{self.check_github_status()}
-
-_Sky Bot - Automated WhatsApp Assistant_"""
+            status_message = self.build_status_message()
             
             # Send status
             self.send_instant_message(formatted_number, status_message)
@@ -416,31 +881,16 @@ _Sky Bot - Automated WhatsApp Assistant_"""
         Get total number of contacts
         """
         try:
-            with open(self.contacts_file, 'r') as f:
-                contacts = json.load(f)
-            return len(contacts)
+            return self.storage.contact_count()
         except:
             return 0
     
     def get_today_message_count(self) -> int:
         """
-        Get number of messages sent today
+        Get number of messages sent today (failed attempts are logged but not counted)
         """
         try:
-            log_file = "message_log.json"
-            if not os.path.exists(log_file):
-                return 0
-            
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-            
-            today = datetime.now().date()
-            today_logs = [
-                log for log in logs 
-                if datetime.fromisoformat(log["timestamp"]).date() == today
-            ]
-            
-            return len(today_logs)
+            return self.storage.message_count(status="sent")
         except:
             return 0
     
@@ -455,6 +905,9 @@ _Sky Bot - Automated WhatsApp Assistant_"""
         print(f"GitHub: {self.github_url}")
         print("=" * 50)
         
+        # Sends from the menu are queued and delivered in the background
+        self.start_background()
+        
         while True:
             print("\n" + "=" * 30)
             print("📱 MAIN MENU")
@@ -468,23 +921,28 @@ _Sky Bot - Automated WhatsApp Assistant_"""
             print("7. Send Bot Status")
             print("8. View Statistics")
             print("9. Check GitHub Status")
-            print("10. Exit")
+            print("10. Import Contacts (CSV/XLSX)")
+            print("11. Export Contacts (CSV/XLSX)")
+            print("12. Auto-Replies")
+            print("13. Exit")
             print("=" * 30)
             
-            choice = input("Select option (1-10): ").strip()
+            choice = input("Select option (1-13): ").strip()
             
             if choice == "1":
                 phone = input("Enter phone number: ").strip()
                 message = input("Enter message: ").strip()
-                self.send_instant_message(phone, message)
+                message_id = self.queue_message(phone, message)
+                print(f"📤 Message queued (#{message_id})")
                 
             elif choice == "2":
                 phone = input("Enter phone number: ").strip()
                 message = input("Enter message: ").strip()
                 time_input = input("Enter time (HH:MM): ").strip()
+                repeat = input("Repeat daily? (y/N): ").strip().lower() == "y"
                 try:
                     hour, minute = map(int, time_input.split(":"))
-                    self.send_scheduled_message(phone, message, hour, minute)
+                    self.send_scheduled_message(phone, message, hour, minute, repeat)
                 except:
                     print("Invalid time format!")
                     
@@ -492,14 +950,18 @@ _Sky Bot - Automated WhatsApp Assistant_"""
                 phones_input = input("Enter phone numbers (comma-separated): ").strip()
                 phones = [p.strip() for p in phones_input.split(",")]
                 message = input("Enter message: ").strip()
-                results = self.send_to_multiple_contacts(phones, message)
-                print(f"Sent to {sum(results.values())}/{len(phones)} contacts")
+                queued = self.queue_broadcast(phones, message)
+                print(f"📤 Queued for {queued}/{len(phones)} contacts")
                 
             elif choice == "4":
                 phone = input("Enter phone number: ").strip()
                 message = input("Enter message: ").strip()
                 file_path = input("Enter file path: ").strip()
-                self.send_with_attachment(phone, message, file_path)
+                if os.path.exists(file_path):
+                    message_id = self.queue_message(phone, message, file_path)
+                    print(f"📤 Message queued (#{message_id})")
+                else:
+                    print(f"File not found: {file_path}")
                 
             elif choice == "5":
                 name = input("Enter contact name: ").strip()
@@ -509,57 +971,129 @@ _Sky Bot - Automated WhatsApp Assistant_"""
                 
             elif choice == "6":
                 group = input("Enter group name: ").strip()
-                message = input("Enter message: ").strip()
-                results = self.broadcast_to_group(group, message)
-                print(f"Broadcasted to {len(results)} contacts in group '{group}'")
+                message = input("Enter message ({name} is replaced per contact): ").strip()
+                group_contacts = self.storage.contacts_in_group(group)
+                phones = [contact["phone"] for contact in group_contacts]
+                queued = self.queue_broadcast(phones, self.personalize(message, group_contacts))
+                print(f"📤 Queued for {queued} contacts in group '{group}'")
                 
             elif choice == "7":
                 phone = input("Enter phone number for status: ").strip()
-                self.send_bot_status(phone)
+                message_id = self.queue_message(phone, self.build_status_message())
+                print(f"📤 Status queued (#{message_id})")
                 
             elif choice == "8":
                 print(f"\n📊 Bot Statistics:")
                 print(f"Total Contacts: {self.get_contact_count()}")
                 print(f"Messages Sent Today: {self.get_today_message_count()}")
-                print(f"Scheduled Tasks: {len(self.scheduled_tasks)}")
+                print(f"Scheduled Tasks: {len(self.scheduler)}")
+                outbox = self.outbox.counts()
+                print(f"Outbox: {outbox['pending']} pending, {outbox['in_flight']} sending, "
+                      f"{outbox['sent']} sent, {outbox['failed']} failed")
+                for stage, timing in self.analytics()["stages"].items():
+                    print(f"  {stage}: {timing['count']} calls, mean {timing['mean'] * 1000:.1f} ms, "
+                          f"p99 {timing['p99'] * 1000:.1f} ms")
                 
             elif choice == "9":
-                status = self.check_github_status()
+                status = self.check_github_status(block=True)
                 print(f"\n{status}")
                 
             elif choice == "10":
+                file_path = input("Enter file path: ").strip()
+                group = input("Enter group (default: general): ").strip() or "general"
+                try:
+                    totals = self.import_contacts(
+                        file_path, group,
+                        progress=lambda t: print(f"  {t['rows']} rows read, {t['added']} added", end="\r")
+                    )
+                    print(f"\n✅ Added {totals['added']} contacts "
+                          f"({totals['duplicates']} duplicates, {totals['invalid']} invalid)")
+                except Exception as e:
+                    print(f"❌ Import failed: {str(e)}")
+                
+            elif choice == "11":
+                file_path = input("Export to (e.g. contacts.csv): ").strip() or "contacts.csv"
+                try:
+                    print(f"✅ Exported {self.export_contacts(file_path)} contacts to {file_path}")
+                except Exception as e:
+                    print(f"❌ Export failed: {str(e)}")
+                
+            elif choice == "12":
+                print("a. Add keyword rule  b. Add regex rule  c. Answer messages from file")
+                action = input("Choose (a/b/c): ").strip().lower()
+                try:
+                    if action in ("a", "b"):
+                        pattern = input("Keyword/phrase: " if action == "a" else "Regex: ").strip()
+                        reply = input("Reply ({phone}, {text} and named groups allowed): ").strip()
+                        self.auto_replies.add_rule(pattern, reply, "keyword" if action == "a" else "regex")
+                        print("✅ Rule added")
+                    elif action == "c":
+                        file_path = input("Incoming messages file: ").strip()
+                        print(f"📤 Queued {self.answer_incoming(file_path)} replies")
+                except Exception as e:
+                    print(f"❌ Auto-reply failed: {str(e)}")
+                
+            elif choice == "13":
+                self.close()
                 print("Goodbye! 👋")
                 break
                 
             else:
                 print("Invalid option!")
 
+# Packages each transport needs, checked before start without importing them
+REQUIREMENTS = {
+    "pywhatkit": ["pywhatkit", "requests"],
+    "web": ["selenium", "requests"],
+    "mock": [],
+}
+
+def missing_requirements(transport: str = "pywhatkit") -> List[str]:
+    """Packages the transport needs that aren't installed (find_spec only locates them)"""
+    from importlib.util import find_spec
+    
+    return [name for name in REQUIREMENTS.get(transport, []) if find_spec(name) is None]
+
 # Example usage and demonstration
-def main():
-    """Main function to run the bot"""
-    bot = SkyWhatsAppBot()
+def main(transport: str = "pywhatkit", self_test: bool = False):
+    """
+    Main function to run the bot
+    
+    Args:
+        transport: "pywhatkit", "web" or "mock"
+        self_test: Send a test message to your own number before the menu
+            (opens WhatsApp Web and takes 20 s or more, so it is opt-in)
+    """
+    bot = SkyWhatsAppBot(transport=transport)
     
     print("\n" + "=" * 50)
     print("INITIALIZING SKY WHATSAPP BOT")
     print("=" * 50)
     
-    # Example: Send welcome message to yourself
-    print("\nSending test message to yourself...")
-    bot.send_instant_message(bot.your_number, f"🤖 Sky Bot Activated!\nGitHub: {bot.github_url}\nTime: {datetime.now().strftime('%H:%M:%S')}")
+    if self_test:
+        # Example: Send welcome message to yourself
+        print("\nSending test message to yourself...")
+        bot.send_instant_message(bot.your_number, f"🤖 Sky Bot Activated!\nGitHub: {bot.github_url}\nTime: {datetime.now().strftime('%H:%M:%S')}")
     
     # Start interactive menu
     bot.menu()
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Sky WhatsApp Bot")
+    parser.add_argument("--transport", default="pywhatkit", choices=sorted(REQUIREMENTS))
+    parser.add_argument("--self-test", action="store_true",
+                        help="Send a test message to your own number at startup (or set SKYBOT_SELF_TEST=1)")
+    args = parser.parse_args()
+    
     # Check requirements
-    try:
-        import pywhatkit
-        import schedule
-        print("✓ All dependencies are installed")
-    except ImportError as e:
-        print(f"✗ Missing dependency: {e}")
+    missing = missing_requirements(args.transport)
+    if missing:
+        print(f"✗ Missing dependencies: {', '.join(missing)}")
         print("\nInstall missing packages:")
-        print("pip install pywhatkit schedule requests pandas")
+        print(f"pip install {' '.join(missing)}")
         exit(1)
+    print("✓ All dependencies are installed")
     
-    main()
+    main(args.transport, self_test=args.self_test or os.environ.get("SKYBOT_SELF_TEST", "") not in ("", "0"))
@@ -3,31 +3,86 @@ SkyBot Pro - WhatsApp Business Assistant
 Made for small businesses to get paid
 """
 
-import json
-import os
 from datetime import datetime
 
+from storage import open_storage
+from client_registry import ClientRegistry
+from billing import BillingEngine
+from outbox import Outbox
+from templates import TemplateStore
+import bulk_io
+
+# Plans; "quota" is messages per month (None = unlimited), enforced by Sky.py
+SERVICES = {
+    "basic": {
+        "price": 500,
+        "quota": 100,
+        "features": ["Auto-replies", "100 messages/month", "1 admin"]
+    },
+    "pro": {
+        "price": 1500,
+        "quota": None,
+        "features": ["Auto-replies", "Unlimited messages", "3 admins", "Analytics"]
+    },
+    "enterprise": {
+        "price": 3000,
+        "quota": None,
+        "features": ["Everything in Pro", "Custom integrations", "Priority support"]
+    }
+}
+
+WELCOME_TEMPLATE = """Hello {contact}! 👋
+
+Welcome to {business_name}'s WhatsApp Service!
+
+✅ Your {plan} plan is activated
+✅ Price: R{price}/month
+✅ Features included:
+{features}
+📞 Support: {support_number}
+📅 Next billing: {next_billing}
+
+Thank you for choosing us!"""
+
+SALES_PITCH_TEMPLATE = """Hello! I'm from {business_name}. 
+
+We help businesses like yours manage WhatsApp professionally:
+
+✅ Auto-reply to customers 24/7
+✅ Send bulk announcements
+✅ Organize customer chats
+✅ Affordable plans from R{monthly_price}/month
+
+Would you like a FREE demo?"""
+
 class SkyBotPro:
-    def __init__(self):
+    def __init__(self, storage="sqlite"):
         self.business_name = "Your Business Name"
         self.whatsapp_number = "0748529340"
         
         # Business features
-        self.clients = []
+        self.storage = open_storage(storage, clients_file="clients.json")
         self.monthly_price = 500  # R500 per month
-        self.services = {
-            "basic": {
-                "price": 500,
-                "features": ["Auto-replies", "100 messages/month", "1 admin"]
-            },
-            "pro": {
-                "price": 1500,
-                "features": ["Auto-replies", "Unlimited messages", "3 admins", "Analytics"]
-            },
-            "enterprise": {
-                "price": 3000,
-                "features": ["Everything in Pro", "Custom integrations", "Priority support"]
-            }
+        self.services = SERVICES
+        
+        # Indexed view of the clients with running income totals
+        self.registry = ClientRegistry(self.storage, self.services)
+        
+        # Monthly invoices; messages go to the outbox that Sky.py delivers from
+        self.billing = BillingEngine(
+            self.registry,
+            "billing.db",
+            sender={"business_name": self.business_name, "support_number": self.whatsapp_number}
+        )
+        self.outbox_file = "outbox.db"
+        
+        # Message templates (compiled once, rendered per client)
+        self.templates = TemplateStore("messages.json")
+        self.templates.register("client_welcome", WELCOME_TEMPLATE, category="welcome")
+        self.templates.register("sales_pitch", SALES_PITCH_TEMPLATE, category="sales")
+        self.plan_features = {
+            plan: "".join(f"   • {feature}\n" for feature in details["features"])
+            for plan, details in self.services.items()
         }
         
         print("=" * 60)
@@ -41,7 +96,6 @@ class SkyBotPro:
     def add_client(self, business_name, contact_person, phone, plan="basic"):
         """Add a new business client"""
         client = {
-            "id": len(self.clients) + 1,
             "business": business_name,
             "contact": contact_person,
             "phone": phone,
@@ -51,8 +105,9 @@ class SkyBotPro:
             "status": "active"
         }
         
-        self.clients.append(client)
-        self.save_clients()
+        # Storage assigns the id (never reused, even after a client is removed)
+        client = self.registry.add(client)
+        self.billing.track(client)
         
         print(f"✅ Added client: {business_name}")
         print(f"   Plan: {plan} - R{client['price']}/month")
@@ -66,67 +121,138 @@ class SkyBotPro:
         print("\n" + "=" * 60)
         print("📝 WELCOME MESSAGE FOR CLIENT:")
         print("=" * 60)
-        message = f"""Hello {client['contact']}! 👋
-
-Welcome to {self.business_name}'s WhatsApp Service!
-
-✅ Your {client['plan']} plan is activated
-✅ Price: R{client['price']}/month
-✅ Features included:
-"""
-        
-        for feature in self.services[client['plan']]["features"]:
-            message += f"   • {feature}\n"
-        
-        message += f"""
-📞 Support: {self.whatsapp_number}
-📅 Next billing: 30 days from now
-
-Thank you for choosing us!"""
+        message = self.templates.render(
+            "client_welcome",
+            client,
+            business_name=self.business_name,
+            features=self.plan_features[client['plan']],
+            support_number=self.whatsapp_number,
+            next_billing=self.billing.next_due(client) or "30 days from now"
+        )
         
         print(message)
         print("=" * 60)
         print("\n📱 Send this message to your client on WhatsApp!")
     
-    def save_clients(self):
-        """Save clients to file"""
-        with open("clients.json", "w") as f:
-            json.dump(self.clients, f, indent=4)
-    
     def load_clients(self):
-        """Load clients from file"""
-        if os.path.exists("clients.json"):
-            with open("clients.json", "r") as f:
-                self.clients = json.load(f)
+        """Reload the client registry from storage (after outside changes)"""
+        self.registry.reload()
+        self.billing.reload()
     
-    def show_clients(self):
-        """Show all clients"""
-        self.load_clients()
+    def show_clients(self, page=1, page_size=20, plan=None, status=None):
+        """
+        Show one page of clients
         
-        if not self.clients:
+        Args:
+            page: 1-based page number
+            page_size: Clients per page
+            plan: Only this plan
+            status: Only this status (e.g. "active")
+            
+        Returns:
+            The page from ClientRegistry.page
+        """
+        report = self.registry.page(page, page_size, plan=plan, status=status)
+        
+        if not report["total"]:
             print("📭 No clients yet")
-            return
+            return report
         
         print("\n" + "=" * 60)
-        print("📊 CLIENT LIST")
+        print(f"📊 CLIENT LIST (page {report['page']}/{report['pages']})")
         print("=" * 60)
         
-        total_income = 0
-        
-        for client in self.clients:
-            print(f"\n🏢 {client['business']}")
+        for client in report["clients"]:
+            print(f"\n🏢 #{client['id']} {client['business']}")
             print(f"   👤 {client['contact']}")
             print(f"   📞 {client['phone']}")
             print(f"   📋 Plan: {client['plan'].upper()}")
             print(f"   💰 R{client['price']}/month")
             print(f"   📅 Joined: {client['join_date']}")
             print(f"   🔄 Status: {client['status']}")
-            total_income += client['price']
         
         print("\n" + "=" * 60)
-        print(f"💰 TOTAL MONTHLY INCOME: R{total_income}")
-        print(f"👥 TOTAL CLIENTS: {len(self.clients)}")
+        print(f"💰 TOTAL MONTHLY INCOME: R{self.registry.monthly_income()}")
+        print(f"👥 TOTAL CLIENTS: {len(self.registry)}")
         print("=" * 60)
+        return report
+    
+    def browse_clients(self, page_size=20):
+        """Page through the client list from the menu"""
+        page = 1
+        while True:
+            report = self.show_clients(page, page_size)
+            if report["pages"] <= 1:
+                return
+            choice = input("[n]ext, [p]revious, page number or Enter to go back: ").strip().lower()
+            if choice == "n":
+                page = min(page + 1, report["pages"])
+            elif choice == "p":
+                page = max(page - 1, 1)
+            elif choice.isdigit():
+                page = min(max(int(choice), 1), report["pages"])
+            else:
+                return
+    
+    def income_report(self):
+        """Show monthly income per plan and client sign-ups per month"""
+        by_plan = self.registry.income_by_plan()
+        
+        print("\n" + "=" * 60)
+        print("📊 INCOME REPORT")
+        print("=" * 60)
+        for plan in self.services:
+            totals = by_plan.get(plan, {"clients": 0, "income": 0})
+            print(f"{plan.upper():<12} {totals['clients']:>6} active × R{self.services[plan]['price']} = R{totals['income']}")
+        print("-" * 40)
+        print(f"💰 MONTHLY INCOME: R{self.registry.monthly_income()}")
+        print(f"💰 YEARLY INCOME: R{self.registry.monthly_income() * 12}")
+        print(f"👥 Active clients: {self.registry.count(status='active')} of {len(self.registry)}")
+        
+        months = self.registry.months()
+        if months:
+            print("\n📅 New clients per month (last 6):")
+            for month, count in list(months.items())[-6:]:
+                print(f"   {month or 'unknown'}: {count}")
+        print("=" * 60)
+    
+    def run_billing(self, window_days=7, remind_days=3):
+        """Create invoices for clients due in the next `window_days` and queue them with reminders"""
+        outbox = Outbox(self.outbox_file, recover=False)
+        try:
+            totals = self.billing.run(outbox, window_days=window_days, remind_days=remind_days)
+        finally:
+            outbox.close()
+        
+        outstanding = self.billing.outstanding()
+        print("\n" + "=" * 60)
+        print("🧾 BILLING RUN")
+        print("=" * 60)
+        print(f"Invoices created: {totals['invoiced']} (R{totals['amount']})")
+        print(f"Reminders: {totals['reminded']}")
+        print(f"Messages queued: {totals['queued']} (sent by the Sky bot's outbox)")
+        print(f"Unpaid: {outstanding['open']} invoices, R{outstanding['amount']} "
+              f"({outstanding['overdue']} overdue, R{outstanding['overdue_amount']})")
+        print("=" * 60)
+        return totals
+    
+    def mark_invoice_paid(self, invoice_id):
+        if self.billing.mark_paid(invoice_id):
+            print(f"✅ Invoice #{invoice_id} marked paid")
+            return True
+        print(f"❌ No open invoice #{invoice_id}")
+        return False
+    
+    def change_plan(self, client_id, plan):
+        """Move a client to another plan"""
+        if plan not in self.services:
+            print(f"❌ Unknown plan: {plan}")
+            return False
+        if not self.registry.change_plan(client_id, plan):
+            print(f"❌ No client with id {client_id}")
+            return False
+        print(f"✅ Client #{client_id} is now on {plan.upper()} (R{self.services[plan]['price']}/month)")
+        return True
     
     def calculate_income(self):
         """Calculate potential income"""
@@ -134,23 +260,39 @@ Thank you for choosing us!"""
         print("💰 INCOME CALCULATOR")
         print("=" * 60)
         
-        basic_clients = int(input("How many BASIC clients (R500/month)? ") or "0")
-        pro_clients = int(input("How many PRO clients (R1500/month)? ") or "0")
-        enterprise_clients = int(input("How many ENTERPRISE clients (R3000/month)? ") or "0")
+        counts = {}
+        for plan, details in self.services.items():
+            counts[plan] = int(input(f"How many {plan.upper()} clients (R{details['price']}/month)? ") or "0")
         
-        total_income = (basic_clients * 500) + (pro_clients * 1500) + (enterprise_clients * 3000)
+        total_income = sum(counts[plan] * self.services[plan]["price"] for plan in counts)
         
         print("\n" + "=" * 60)
         print("📈 INCOME PROJECTION")
         print("=" * 60)
-        print(f"Basic clients: {basic_clients} × R500 = R{basic_clients * 500}")
-        print(f"Pro clients: {pro_clients} × R1500 = R{pro_clients * 1500}")
-        print(f"Enterprise clients: {enterprise_clients} × R3000 = R{enterprise_clients * 3000}")
+        for plan, count in counts.items():
+            price = self.services[plan]["price"]
+            print(f"{plan.capitalize()} clients: {count} × R{price} = R{count * price}")
         print("-" * 40)
         print(f"💰 MONTHLY INCOME: R{total_income}")
         print(f"💰 YEARLY INCOME: R{total_income * 12}")
         print("=" * 60)
     
+    def import_clients(self, file_path):
+        """Bulk import clients from a CSV or XLSX file"""
+        totals = bulk_io.import_clients(
+            self.storage, file_path, self.services,
+            progress=lambda t: print(f"   {t['rows']} rows read, {t['added']} added", end="\r")
+        )
+        self.load_clients()
+        print(f"\n✅ Imported {totals['added']} clients ({totals['duplicates']} duplicates skipped)")
+        return totals
+    
+    def export_clients(self, file_path):
+        """Export all clients to a CSV or XLSX file"""
+        count = bulk_io.export_clients(self.storage, file_path)
+        print(f"✅ Exported {count} clients to {file_path}")
+        return count
+    
     def show_services(self):
         """Show available services"""
         print("\n" + "=" * 60)
@@ -168,16 +310,11 @@ Thank you for choosing us!"""
         print("🎯 SALES PITCH TEMPLATE")
         print("=" * 60)
         
-        pitch = f"""Hello! I'm from {self.business_name}. 
-
-We help businesses like yours manage WhatsApp professionally:
-
-✅ Auto-reply to customers 24/7
-✅ Send bulk announcements
-✅ Organize customer chats
-✅ Affordable plans from R500/month
-
-Would you like a FREE demo?"""
+        pitch = self.templates.render(
+            "sales_pitch",
+            business_name=self.business_name,
+            monthly_price=self.monthly_price
+        )
         
         print(pitch)
         print("\n" + "=" * 60)
@@ -197,10 +334,15 @@ Would you like a FREE demo?"""
             print("5. 🎯 Generate Sales Pitch")
             print("6. 📝 Create Client Welcome Message")
             print("7. 📊 View Income Report")
+            print("8. 📥 Import Clients (CSV/XLSX)")
+            print("9. 📤 Export Clients (CSV/XLSX)")
+            print("10. 🔄 Change Client Plan")
+            print("11. 🧾 Run Billing (invoices + reminders)")
+            print("12. 💳 Mark Invoice Paid")
             print("0. ❌ Exit")
             print("=" * 40)
             
-            choice = input("Choose (0-7): ").strip()
+            choice = input("Choose (0-12): ").strip()
             
             if choice == "1":
                 print("\n" + "=" * 40)
@@ -219,7 +361,7 @@ Would you like a FREE demo?"""
                     self.add_client(business, contact, phone, "basic")
             
             elif choice == "2":
-                self.show_clients()
+                self.browse_clients()
             
             elif choice == "3":
                 self.show_services()
@@ -232,29 +374,66 @@ Would you like a FREE demo?"""
             
             elif choice == "6":
                 # Create welcome message for existing client
-                self.load_clients()
-                if self.clients:
+                if len(self.registry):
                     print("\nSelect client for welcome message:")
-                    for i, client in enumerate(self.clients, 1):
-                        print(f"{i}. {client['business']}")
+                    for client in self.registry.page(1, 20)["clients"]:
+                        print(f"{client['id']}. {client['business']}")
+                    if len(self.registry) > 20:
+                        print(f"... {len(self.registry) - 20} more (see option 2 for ids)")
                     
                     try:
-                        idx = int(input("Client number: ").strip()) - 1
-                        if 0 <= idx < len(self.clients):
-                            self.generate_welcome_message(self.clients[idx])
-                    except:
+                        client = self.registry.get(int(input("Client id: ").strip()))
+                        if client:
+                            self.generate_welcome_message(client)
+                        else:
+                            print("❌ No client with that id")
+                    except ValueError:
                         print("❌ Invalid selection")
                 else:
                     print("❌ No clients yet")
             
             elif choice == "7":
-                self.show_clients()  # Shows income report
+                self.income_report()
+            
+            elif choice == "8":
+                file_path = input("File path: ").strip()
+                try:
+                    self.import_clients(file_path)
+                except Exception as e:
+                    print(f"❌ Import failed: {e}")
+            
+            elif choice == "9":
+                file_path = input("Export to (e.g. clients.csv): ").strip() or "clients.csv"
+                try:
+                    self.export_clients(file_path)
+                except Exception as e:
+                    print(f"❌ Export failed: {e}")
+            
+            elif choice == "10":
+                try:
+                    client_id = int(input("Client id: ").strip())
+                except ValueError:
+                    print("❌ Invalid client id")
+                    continue
+                plan = input("New plan (basic/pro/enterprise): ").strip().lower()
+                self.change_plan(client_id, plan)
+            
+            elif choice == "11":
+                self.run_billing()
+            
+            elif choice == "12":
+                try:
+                    self.mark_invoice_paid(int(input("Invoice number: ").strip()))
+                except ValueError:
+                    print("❌ Invalid invoice number")
             
             elif choice == "0":
                 print("\n" + "=" * 40)
                 print("💼 Good luck with your business!")
                 print(f"📞 Contact: {self.whatsapp_number}")
                 print("=" * 40)
+                self.billing.close()
+                self.storage.close()
                 break
             
             else:
@@ -0,0 +1,340 @@
+"""
+Sky Bot - Message analytics
+Compacts the message log into Parquet files partitioned by day and answers
+the "Analytics" plan questions with vectorized pandas aggregations
+"""
+
+import os
+import shutil
+import threading
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# Columns kept in the Parquet files (message text is left in the log)
+CATEGORY_COLUMNS = ["phone", "type", "status", "client"]
+BREAKDOWNS = ("client", "group", "hour", "type", "day", "status")
+# Log statuses that are send attempts (the simple bot logs "created" for manual sends)
+ATTEMPT_STATUSES = ["sent", "failed"]
+
+
+def _categorical(series: "pd.Series") -> "pd.Series":
+    """Dictionary-encode with string categories (an all-empty column would otherwise get float ones)"""
+    series = series.astype("category")
+    return series.cat.rename_categories(series.cat.categories.astype(str))
+
+
+def _concat(frames: List["pd.DataFrame"]) -> "pd.DataFrame":
+    """Concatenate frames keeping categorical columns categorical (plain concat would fall back to object)"""
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return _empty_frame()
+    if len(frames) == 1:
+        return frames[0]
+
+    # New values are appended to the first (largest) frame's categories so its
+    # codes stay valid and concat only copies them
+    for column in CATEGORY_COLUMNS:
+        categories = frames[0][column].cat.categories
+        for frame in frames[1:]:
+            new = frame[column].cat.categories.difference(categories)
+            if len(new):
+                categories = categories.append(new)
+        frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _empty_frame() -> "pd.DataFrame":
+    frame = pd.DataFrame({"timestamp": pd.Series([], dtype="datetime64[ns]")})
+    for column in CATEGORY_COLUMNS:
+        frame[column] = pd.Series([], dtype="category")
+    return frame
+
+
+def _to_frame(entries: List[Dict]) -> "pd.DataFrame":
+    """Log entries -> typed frame (timestamps parsed, strings dictionary-encoded)"""
+    if not entries:
+        return _empty_frame()
+    frame = pd.DataFrame.from_records(entries, columns=["timestamp"] + CATEGORY_COLUMNS)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], format="ISO8601", errors="coerce")
+    for column in CATEGORY_COLUMNS:
+        frame[column] = _categorical(frame[column])
+    return frame
+
+
+class MessageAnalytics:
+    def __init__(self, storage: StorageBackend, data_dir: str = "analytics",
+                 normalize: Optional[Callable[[str], str]] = None):
+        """
+        Initialize analytics over a bot's message log
+
+        Finished days are written to data_dir/day=YYYY-MM-DD/ and read back
+        column-wise; a day is rewritten when storage has more rows for it than
+        its partition (late entries), and the current day is always read live.
+
+        Args:
+            storage: Backend holding the message log and contacts
+            data_dir: Where the day partitions are kept
+            normalize: Maps a contact's phone to the form used in the log
+                (for the per-group breakdown)
+        """
+        self.storage = storage
+        self.data_dir = data_dir
+        self.normalize = normalize or (lambda phone: phone)
+
+        self._lock = threading.Lock()
+        self._history: Optional["pd.DataFrame"] = None
+        self._history_days: List[str] = []
+        self._history_key = None
+        # Rows in each compacted partition (from the Parquet footer, kept once read)
+        self._partition_rows: Dict[str, int] = {}
+        self._groups_cache = None
+
+        os.makedirs(data_dir, exist_ok=True)
+
+    def _partition_dir(self, day: str) -> str:
+        return os.path.join(self.data_dir, f"day={day}")
+
+    def compacted_days(self) -> List[str]:
+        """Days already written to Parquet, oldest first"""
+        return sorted(
+            name[4:] for name in os.listdir(self.data_dir)
+            if name.startswith("day=") and os.path.exists(os.path.join(self.data_dir, name, "part-0.parquet"))
+        )
+
+    def _rows_in(self, day: str) -> int:
+        """Rows in a compacted day's partition"""
+        rows = self._partition_rows.get(day)
+        if rows is None:
+            rows = pq.read_metadata(os.path.join(self._partition_dir(day), "part-0.parquet")).num_rows
+            self._partition_rows[day] = rows
+        return rows
+
+    def compact(self, until: Optional[str] = None) -> int:
+        """
+        Write finished days that aren't compacted yet, or that got entries
+        after they were compacted
+
+        Args:
+            until: Compact days before this one (YYYY-MM-DD, default today,
+                which is still being written to)
+
+        Returns:
+            Number of days written
+        """
+        until = until or datetime.now().strftime("%Y-%m-%d")
+        done = set(self.compacted_days())
+        written = 0
+
+        for day, count in self.storage.message_day_counts().items():
+            if day >= until or (day in done and self._rows_in(day) >= count):
+                continue
+            frame = _to_frame(list(self.storage.messages_on(day)))
+            partition = self._partition_dir(day)
+            tmp_dir = partition + ".tmp"
+            os.makedirs(tmp_dir, exist_ok=True)
+            # Plain strings on disk (Parquet dictionary-encodes them itself); pandas'
+            # per-file categorical index widths can't be read back as one table
+            frame.astype({column: object for column in CATEGORY_COLUMNS}).to_parquet(
+                os.path.join(tmp_dir, "part-0.parquet"), index=False
+            )
+            shutil.rmtree(partition, ignore_errors=True)
+            os.replace(tmp_dir, partition)
+            self._partition_rows[day] = len(frame)
+            written += 1
+
+        if written:
+            logger.info(f"Compacted {written} days of message log into {self.data_dir}")
+        return written
+
+    def _compacted_frame(self) -> "pd.DataFrame":
+        """All compacted days, read once and kept until a day is compacted or rewritten"""
+        days = self.compacted_days()
+        key = [(day, self._rows_in(day)) for day in days]
+        with self._lock:
+            if self._history is None or key != self._history_key:
+                if days:
+                    frame = pd.read_parquet(
+                        [os.path.join(self._partition_dir(day), "part-0.parquet") for day in days],
+                        read_dictionary=CATEGORY_COLUMNS
+                    )
+                    for column in CATEGORY_COLUMNS:
+                        frame[column] = _categorical(frame[column])
+                else:
+                    frame = _empty_frame()
+                self._history, self._history_days, self._history_key = frame, days, key
+            return self._history
+
+    def frame(self, start: Optional[str] = None, end: Optional[str] = None,
+              client: Optional[str] = None) -> "pd.DataFrame":
+        """
+        Log entries as a DataFrame (timestamp, phone, type, status, client)
+
+        Args:
+            start: First day to include (YYYY-MM-DD)
+            end: Last day to include (YYYY-MM-DD)
+            client: Only this SkyBot Pro client's messages
+        """
+        self.compact()
+        history = self._compacted_frame()
+        compacted = set(self._history_days)
+
+        since = max(filter(None, [start, self._history_days[-1] if self._history_days else None]), default=None)
+        live_days = [day for day in self.storage.message_days(since)
+                     if day not in compacted and (end is None or day <= end)]
+        live = [_to_frame(list(self.storage.messages_on(day))) for day in live_days]
+        frame = _concat([history] + live) if live else history
+
+        mask = None
+        if start is not None:
+            mask = frame["timestamp"] >= pd.Timestamp(start)
+        if end is not None:
+            before_end = frame["timestamp"] < pd.Timestamp(end) + pd.Timedelta(days=1)
+            mask = before_end if mask is None else mask & before_end
+        if client is not None:
+            is_client = frame["client"] == str(client)
+            mask = is_client if mask is None else mask & is_client
+        return frame if mask is None else frame[mask]
+
+    def _groups(self, phones: "pd.Series") -> "pd.Series":
+        """Contact group per log row (categorical map: one lookup per distinct phone)"""
+        groups = self._group_map()
+        return phones.map(lambda phone: groups.get(phone, "unknown"))
+
+    def _group_map(self) -> Dict[str, str]:
+        """phone -> group, rebuilt only when the number of contacts changes"""
+        count = self.storage.contact_count()
+        with self._lock:
+            if self._groups_cache is None or self._groups_cache[0] != count:
+                groups = {self.normalize(contact["phone"]): contact.get("group") or "general"
+                          for contact in self.storage.iter_contacts()}
+                self._groups_cache = (count, groups)
+            return self._groups_cache[1]
+
+    def _key(self, frame: "pd.DataFrame", by: str) -> "pd.Series":
+        if by not in BREAKDOWNS:
+            raise ValueError(f"Unknown breakdown: {by} (use one of {', '.join(BREAKDOWNS)})")
+        if by == "hour":
+            return frame["timestamp"].dt.hour
+        if by == "day":
+            return frame["timestamp"].dt.normalize()
+        if by == "group":
+            return self._groups(frame["phone"])
+        return frame[by]
+
+    # Each query has a public form that reads the period and a _form that
+    # works on a frame already read (report() reads it once for all of them)
+
+    def sends_by(self, by: str, start: Optional[str] = None, end: Optional[str] = None,
+                 client: Optional[str] = None, status: Optional[str] = "sent") -> Dict:
+        """
+        Message counts per client, group, hour, type, day or status
+
+        Args:
+            by: Breakdown ("client", "group", "hour", "type", "day", "status")
+            start, end: Day range (YYYY-MM-DD, inclusive)
+            client: Only this client's messages
+            status: Only entries with this status (None counts all)
+
+        Returns:
+            {key: count}, largest first ("-" is messages without a client)
+        """
+        return self._sends_by(self.frame(start, end, client), by, status)
+
+    def _sends_by(self, frame: "pd.DataFrame", by: str, status: Optional[str] = "sent") -> Dict:
+        if status is not None and by != "status":
+            frame = frame[frame["status"] == status]
+        counts = self._key(frame, by).value_counts(sort=True, dropna=False)
+        return {_plain(key): int(count) for key, count in counts.items() if count}
+
+    def success_rate(self, by: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                     client: Optional[str] = None):
+        """
+        Share of send attempts that succeeded (status "sent" among "sent" and "failed")
+
+        Args:
+            by: Optional breakdown (see sends_by)
+
+        Returns:
+            A single rate, or {key: rate} when `by` is given
+        """
+        return self._success_rate(self.frame(start, end, client), by)
+
+    def _success_rate(self, frame: "pd.DataFrame", by: Optional[str] = None):
+        # Other statuses (e.g. "created" by the simple bot) aren't send attempts
+        frame = frame[frame["status"].isin(ATTEMPT_STATUSES)]
+        sent = frame["status"] == "sent"
+        if by is None:
+            return float(sent.mean()) if len(frame) else 0.0
+        rates = sent.groupby(self._key(frame, by), observed=True, dropna=False).mean()
+        return {_plain(key): float(rate) for key, rate in rates.items()}
+
+    def top_recipients(self, limit: int = 10, start: Optional[str] = None, end: Optional[str] = None,
+                       client: Optional[str] = None) -> List[Dict]:
+        """Most messaged numbers: [{"phone": ..., "messages": ...}]"""
+        return self._top_recipients(self.frame(start, end, client), limit)
+
+    def _top_recipients(self, frame: "pd.DataFrame", limit: int = 10) -> List[Dict]:
+        counts = frame["phone"].value_counts(sort=True).head(limit)
+        return [{"phone": phone, "messages": int(count)} for phone, count in counts.items() if count]
+
+    def summary(self, start: Optional[str] = None, end: Optional[str] = None,
+                client: Optional[str] = None) -> Dict:
+        """Totals for a period: messages, sent, failed, success rate, recipients, busiest hour"""
+        return self._summary(self.frame(start, end, client))
+
+    def _summary(self, frame: "pd.DataFrame") -> Dict:
+        if not len(frame):
+            return {"messages": 0, "sent": 0, "failed": 0, "success_rate": 0.0, "recipients": 0,
+                    "busiest_hour": None, "first": None, "last": None}
+
+        status = frame["status"]
+        sent = int((status == "sent").sum())
+        failed = int((status == "failed").sum())
+        hours = frame["timestamp"].dt.hour.value_counts()
+        return {
+            "messages": len(frame),
+            "sent": sent,
+            "failed": failed,
+            "success_rate": sent / (sent + failed) if sent + failed else 0.0,
+            "recipients": int(frame["phone"].nunique()),
+            "busiest_hour": int(hours.idxmax()) if len(hours) else None,
+            "first": frame["timestamp"].min().isoformat(),
+            "last": frame["timestamp"].max().isoformat(),
+        }
+
+    def report(self, start: Optional[str] = None, end: Optional[str] = None, client: Optional[str] = None,
+               top: int = 10) -> Dict:
+        """
+        Everything the "Analytics" plan shows, from one read of the period
+
+        Returns:
+            Dict with summary, sends by hour/type/group/client, success rate
+            by type and top recipients
+        """
+        frame = self.frame(start, end, client)
+        return {
+            "summary": self._summary(frame),
+            "by_hour": self._sends_by(frame, "hour"),
+            "by_type": self._sends_by(frame, "type"),
+            "by_group": self._sends_by(frame, "group"),
+            "by_client": self._sends_by(frame, "client"),
+            "success_by_type": self._success_rate(frame, "type"),
+            "top_recipients": self._top_recipients(frame, top)
+        }
+
+
+def _plain(value):
+    """numpy scalars -> Python values for JSON; missing values (no client) become "-" """
+    if pd.isna(value):
+        return "-"
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    return value.item() if hasattr(value, "item") else value
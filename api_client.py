@@ -0,0 +1,161 @@
+"""
+Sky Bot - HTTP API client
+Thin client for api_server.py over a pooled keep-alive session
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class SkyApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class SkyApiClient:
+    def __init__(self, base_url: str = "http://127.0.0.1:8080", token: Optional[str] = None,
+                 pool_size: int = 8, timeout: float = 10.0, busy_retries: int = 3):
+        """
+        Initialize the client
+
+        Args:
+            base_url: Server address
+            token: Bearer token if the server requires one
+            pool_size: Keep-alive connections kept open (use one client per process)
+            timeout: Connect/read timeout per request
+            busy_retries: Retries when the server answers 429/503, honouring Retry-After
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.busy_retries = busy_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None,
+                 params: Optional[Dict] = None) -> Dict:
+        for attempt in range(self.busy_retries + 1):
+            response = self.session.request(method, self.base_url + path, json=payload, params=params,
+                                            timeout=self.timeout)
+            if response.status_code in (429, 503) and attempt < self.busy_retries:
+                time.sleep(float(response.headers.get("Retry-After", 1)))
+                continue
+            break
+
+        data = response.json() if response.content else {}
+        if response.status_code >= 400:
+            raise SkyApiError(response.status_code, data.get("error", response.reason))
+        return data
+
+    def health(self) -> bool:
+        return self._request("GET", "/health").get("status") == "ok"
+
+    def stats(self) -> Dict:
+        return self._request("GET", "/stats")
+
+    def analytics(self, client_id: Optional[str] = None) -> Dict:
+        """Send counters and per-stage latency (the server needs SKYBOT_METRICS=1)"""
+        return self._request("GET", "/analytics", params={"client_id": client_id} if client_id else None)
+
+    def message_report(self, client_id: Optional[str] = None, start: Optional[str] = None,
+                       end: Optional[str] = None, top: int = 10) -> Dict:
+        """Message history report (summary, breakdowns, top recipients) for a period"""
+        params = {"client_id": client_id, "start": start, "end": end, "top": top}
+        return self._request("GET", "/analytics/messages",
+                             params={name: value for name, value in params.items() if value is not None})
+
+    def send(self, phone: str, message: str, file_path: Optional[str] = None,
+             client_id: Optional[str] = None) -> Optional[int]:
+        """Queue one message; returns its outbox id (file_path is relative to the server's uploads dir)"""
+        payload = {"phone": phone, "message": message}
+        if file_path:
+            payload["file_path"] = file_path
+        if client_id is not None:
+            payload["client_id"] = client_id
+        return self._request("POST", "/messages", payload)["id"]
+
+    def send_batch(self, messages: List[Dict], client_id: Optional[str] = None,
+                   batch_size: int = 1000) -> List[Optional[int]]:
+        """
+        Queue many messages, `batch_size` per request
+
+        Args:
+            messages: Dicts with "phone" and "message"
+            client_id: SkyBot Pro client to count the sends against
+
+        Returns:
+            Outbox id per message (None where it was a duplicate)
+        """
+        ids = []
+        for start in range(0, len(messages), batch_size):
+            payload = {"messages": messages[start:start + batch_size]}
+            if client_id is not None:
+                payload["client_id"] = client_id
+            ids.extend(self._request("POST", "/messages/batch", payload)["ids"])
+        return ids
+
+    def broadcast(self, message: str, phones: Optional[List[str]] = None, group: Optional[str] = None,
+                  broadcast_id: Optional[str] = None, client_id: Optional[str] = None) -> int:
+        """Queue a broadcast to a list of phones or a contact group; returns the number queued"""
+        payload = {"message": message}
+        if group is not None:
+            payload["group"] = group
+        else:
+            payload["phones"] = phones or []
+        if broadcast_id:
+            payload["broadcast_id"] = broadcast_id
+        if client_id is not None:
+            payload["client_id"] = client_id
+        return self._request("POST", "/broadcast", payload)["queued"]
+
+    def schedule(self, phone: str, message: str, hour: int, minute: int, repeat_daily: bool = False):
+        self._request("POST", "/schedule", {
+            "phone": phone, "message": message, "hour": hour, "minute": minute, "repeat_daily": repeat_daily
+        })
+
+    def scheduled_jobs(self) -> List[Dict]:
+        return self._request("GET", "/schedule")["jobs"]
+
+    def contacts(self, group: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """One page of contacts (the server caps limit at 1000)"""
+        params = {"limit": limit, "offset": offset}
+        if group:
+            params["group"] = group
+        return self._request("GET", "/contacts", params=params)["contacts"]
+
+    def iter_contacts(self, group: Optional[str] = None, page_size: int = 500):
+        """Every contact, fetched a page at a time"""
+        offset = 0
+        while True:
+            page = self.contacts(group, page_size, offset)
+            yield from page
+            if len(page) < page_size:
+                return
+            offset += len(page)
+
+    def add_contacts(self, contacts: List[Dict]) -> int:
+        """Add contacts ({name, phone, group}); returns how many were new"""
+        return self._request("POST", "/contacts", {"contacts": contacts})["added"]
+
+    def clients(self, plan: Optional[str] = None) -> List[Dict]:
+        return self._request("GET", "/clients", params={"plan": plan} if plan else None)["clients"]
+
+    def add_client(self, business: str, phone: str, contact: str = "", plan: str = "basic") -> Dict:
+        return self._request("POST", "/clients", {
+            "business": business, "phone": phone, "contact": contact, "plan": plan
+        })["client"]
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,472 @@
+"""
+Sky Bot - HTTP/JSON API
+asyncio HTTP/1.1 server (keep-alive, bounded concurrency) that lets other
+services send, schedule and broadcast messages and manage contacts and clients
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from typing import Callable, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+from Sky import SkyWhatsAppBot
+from SkyBot_Pro import SERVICES
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 64 * 1024
+
+# GET /contacts page size (default and largest allowed)
+DEFAULT_PAGE = 100
+MAX_PAGE = 1000
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str, close: bool = False):
+        """
+        Args:
+            status: HTTP status
+            message: Error text for the JSON body
+            close: Drop the connection after replying (request could not be read fully)
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.close = close
+
+
+class ApiServer:
+    def __init__(self, bot: SkyWhatsAppBot, host: str = "127.0.0.1", port: int = 8080,
+                 token: Optional[str] = None, max_inflight: int = 64, max_queue: int = 100000,
+                 max_body: int = 4 * 1024 * 1024, idle_timeout: float = 30.0, max_threads: int = 8,
+                 uploads_dir: Optional[str] = None, require_token: bool = True):
+        """
+        Initialize the server
+
+        Args:
+            bot: Bot whose storage, outbox and scheduler the API drives
+            host: Interface to listen on (localhost by default)
+            port: TCP port
+            token: Requests need "Authorization: Bearer <token>"
+            max_inflight: Requests processed at once; more get 503 + Retry-After
+            max_queue: Pending outbox messages above which new sends get 429
+            max_body: Largest accepted request body in bytes
+            idle_timeout: Seconds a keep-alive connection may sit idle
+            max_threads: Threads for blocking bot calls
+            uploads_dir: Directory attachments ("file_path") may be taken from;
+                None refuses attachments
+            require_token: Refuse to start without a token (only turn this off
+                for tests on a private socket)
+        """
+        if require_token and not token:
+            raise ValueError("The API needs a token (any local process or web page can reach it)")
+
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.token = token
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.max_body = max_body
+        self.idle_timeout = idle_timeout
+        self.uploads_dir = os.path.realpath(uploads_dir) if uploads_dir else None
+
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="sky-api")
+        self._inflight = 0
+        self._queue_depth = (0.0, 0)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+        self.routes: Dict[Tuple[str, str], Callable] = {
+            ("GET", "/health"): self.health,
+            ("GET", "/stats"): self.stats,
+            ("GET", "/analytics"): self.analytics,
+            ("GET", "/analytics/messages"): self.message_report,
+            ("GET", "/metrics"): self.prometheus,
+            ("POST", "/messages"): self.send_message,
+            ("POST", "/messages/batch"): self.send_batch,
+            ("POST", "/broadcast"): self.broadcast,
+            ("POST", "/schedule"): self.schedule,
+            ("GET", "/schedule"): self.scheduled_jobs,
+            ("GET", "/contacts"): self.contacts,
+            ("POST", "/contacts"): self.add_contacts,
+            ("GET", "/clients"): self.clients,
+            ("POST", "/clients"): self.add_client,
+        }
+
+    async def _run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    # Endpoints: each takes the parsed request and returns a JSON-able payload
+
+    async def health(self, request: Dict):
+        return {"status": "ok"}
+
+    async def stats(self, request: Dict):
+        def collect():
+            return {
+                "contacts": self.bot.get_contact_count(),
+                "messages_today": self.bot.get_today_message_count(),
+                "scheduled": len(self.bot.scheduler),
+                "outbox": self.bot.outbox.counts(),
+            }
+        return await self._run(collect)
+
+    async def analytics(self, request: Dict):
+        return self.bot.analytics(request["query"].get("client_id"))
+
+    async def message_report(self, request: Dict):
+        query = request["query"]
+        return await self._run(
+            self.bot.message_report, query.get("client_id"), query.get("start"), query.get("end"),
+            int(query.get("top", 10))
+        )
+
+    async def prometheus(self, request: Dict):
+        """Prometheus scrape endpoint (plain text, not JSON)"""
+        return metrics.render_prometheus()
+
+    async def _check_queue(self, adding: int):
+        """Back-pressure: refuse new sends while the outbox is too far behind"""
+        checked_at, pending = self._queue_depth
+        if time.monotonic() - checked_at > 1.0:
+            pending = (await self._run(self.bot.outbox.counts))["pending"]
+            self._queue_depth = (time.monotonic(), pending)
+        if pending + adding > self.max_queue:
+            raise ApiError(HTTPStatus.TOO_MANY_REQUESTS, f"Outbox is full ({pending} pending)")
+        self._queue_depth = (self._queue_depth[0], pending + adding)
+
+    def _attachment(self, file_path) -> Optional[str]:
+        """Resolve an attachment name to a file inside uploads_dir; anything else is refused"""
+        if file_path is None:
+            return None
+        if self.uploads_dir is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Attachments are disabled on this server")
+        if not isinstance(file_path, str):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "file_path must be a string")
+        path = os.path.realpath(os.path.join(self.uploads_dir, file_path))
+        if os.path.commonpath([self.uploads_dir, path]) != self.uploads_dir or not os.path.isfile(path):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"No such upload: {file_path}")
+        return path
+
+    async def send_message(self, request: Dict):
+        body = _require(request, "phone", "message")
+        _require_text(body, "phone", "message")
+        file_path = self._attachment(body.get("file_path"))
+        await self._check_queue(1)
+        message_id = await self._run(
+            self.bot.queue_message, body["phone"], body["message"], file_path,
+            client_id=body.get("client_id")
+        )
+        return {"id": message_id}
+
+    async def send_batch(self, request: Dict):
+        body = _require(request, "messages")
+        messages = body["messages"]
+        if not isinstance(messages, list) or not all(isinstance(m, dict) and isinstance(m.get("phone"), str)
+                                                     and isinstance(m.get("message"), str) for m in messages):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "messages must be a list of {phone, message} strings")
+        messages = [
+            {"phone": m["phone"], "message": m["message"], "file_path": self._attachment(m.get("file_path"))}
+            for m in messages
+        ]
+        await self._check_queue(len(messages))
+        ids = await self._run(self.bot.queue_messages, messages, client_id=body.get("client_id"))
+        return {"ids": ids, "queued": sum(1 for message_id in ids if message_id)}
+
+    async def broadcast(self, request: Dict):
+        body = _require(request, "message")
+        _require_text(body, "message")
+        if "group" in body:
+            contacts = await self._run(self.bot.storage.contacts_in_group, body["group"])
+            phones = [contact["phone"] for contact in contacts]
+            message = await self._run(self.bot.personalize, body["message"], contacts)
+        elif isinstance(body.get("phones"), list) and all(isinstance(phone, str) for phone in body["phones"]):
+            phones, message = body["phones"], body["message"]
+        else:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Give a group or a list of phone strings")
+
+        await self._check_queue(len(phones))
+        queued = await self._run(self.bot.queue_broadcast, phones, message, body.get("broadcast_id"),
+                                 client_id=body.get("client_id"))
+        return {"queued": queued}
+
+    async def schedule(self, request: Dict):
+        body = _require(request, "phone", "message", "hour", "minute")
+        ok = await self._run(
+            self.bot.send_scheduled_message, body["phone"], body["message"],
+            int(body["hour"]), int(body["minute"]), bool(body.get("repeat_daily", False))
+        )
+        if not ok:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Could not schedule message")
+        return {"scheduled": True}
+
+    async def scheduled_jobs(self, request: Dict):
+        return {"jobs": await self._run(self.bot.scheduler.jobs)}
+
+    async def contacts(self, request: Dict):
+        """One page of contacts (?limit=&offset=, optionally &group=)"""
+        query = request["query"]
+        group = query.get("group") or None
+        limit = min(int(query.get("limit", DEFAULT_PAGE)), MAX_PAGE)
+        offset = int(query.get("offset", 0))
+        if limit < 1 or offset < 0:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "limit must be positive and offset not negative")
+
+        def page():
+            return {
+                "contacts": self.bot.storage.contacts_page(offset, limit, group),
+                "total": self.bot.storage.contact_count(group),
+                "limit": limit,
+                "offset": offset
+            }
+        return await self._run(page)
+
+    async def add_contacts(self, request: Dict):
+        body = request["json"] or {}
+        if not isinstance(body, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+        contacts = body.get("contacts", [body] if "phone" in body else None)
+        if not contacts:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Give a contact or a list of contacts")
+        if not isinstance(contacts, list) or not all(
+                isinstance(contact, dict) and isinstance(contact.get("phone"), str) for contact in contacts):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "contacts must be a list of {phone, name, group} objects")
+
+        def add():
+            added_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+            return self.bot.storage.add_contacts([
+                {
+                    "name": contact.get("name", contact["phone"]),
+                    "phone": self.bot.format_phone_number(contact["phone"]),
+                    "country_code": self.bot.country_code,
+                    "group": contact.get("group", "general"),
+                    "added_at": added_at
+                }
+                for contact in contacts
+            ])
+        return {"added": await self._run(add)}
+
+    async def clients(self, request: Dict):
+        plan = request["query"].get("plan")
+        if plan:
+            clients = await self._run(self.bot.storage.clients_by_plan, plan)
+        else:
+            clients = await self._run(self.bot.storage.all_clients)
+        return {"clients": clients}
+
+    async def add_client(self, request: Dict):
+        body = _require(request, "business", "phone")
+        _require_text(body, "business", "phone")
+        plan = body.get("plan", "basic")
+        if plan not in SERVICES:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown plan: {plan}")
+        client = await self._run(self.bot.storage.add_client, {
+            "business": body["business"],
+            "contact": body.get("contact", ""),
+            "phone": body["phone"],
+            "plan": plan,
+            "price": SERVICES[plan]["price"],
+            "join_date": time.strftime("%Y-%m-%d"),
+            "status": "active"
+        })
+        return {"client": client}
+
+    # HTTP plumbing
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Dict]:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Headers too large", close=True)
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line", close=True)
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Bad Content-Length", close=True)
+        if length > self.max_body:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large", close=True)
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), self.idle_timeout) if length else b""
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Body shorter than Content-Length", close=True)
+
+        url = urlsplit(target)
+        return {
+            "method": method.upper(),
+            "path": url.path.rstrip("/") or "/",
+            "query": {name: values[-1] for name, values in parse_qs(url.query).items()},
+            "version": version,
+            "headers": headers,
+            "body": body,
+        }
+
+    async def _dispatch(self, request: Dict) -> Tuple[int, Union[Dict, str]]:
+        if self.token and not hmac.compare_digest(request["headers"].get("authorization", "").encode(),
+                                                  f"Bearer {self.token}".encode()):
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Missing or wrong token")
+
+        handler = self.routes.get((request["method"], request["path"]))
+        if handler is None:
+            if any(path == request["path"] for _, path in self.routes):
+                raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "Method not allowed")
+            raise ApiError(HTTPStatus.NOT_FOUND, "Not found")
+
+        # Only JSON bodies: a cross-site form post can't send application/json without a preflight
+        if request["body"]:
+            content_type = request["headers"].get("content-type", "").split(";")[0].strip().lower()
+            if content_type != "application/json":
+                raise ApiError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Content-Type must be application/json")
+        try:
+            request["json"] = json.loads(request["body"]) if request["body"] else None
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+
+        if self._inflight >= self.max_inflight:
+            raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "Server busy")
+        self._inflight += 1
+        try:
+            return HTTPStatus.OK, await handler(request)
+        except (KeyError, ValueError, TypeError) as e:
+            # Wrong or missing fields in the request (e.g. a non-numeric hour)
+            message = f"Missing field {e}" if isinstance(e, KeyError) else str(e)
+            raise ApiError(HTTPStatus.BAD_REQUEST, message)
+        finally:
+            self._inflight -= 1
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    connection = request["headers"].get("connection", "").lower()
+                    keep_alive = connection != "close" and (request["version"] != "HTTP/1.0"
+                                                            or connection == "keep-alive")
+                    status, payload = await self._dispatch(request)
+                except ApiError as e:
+                    status, payload = e.status, {"error": e.message}
+                    keep_alive = keep_alive and not e.close
+                except Exception as e:
+                    logger.error(f"API request failed: {str(e)}")
+                    status, payload, keep_alive = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}, False
+
+                writer.write(_response(status, payload, keep_alive))
+                # Waiting for the socket to drain stops a slow reader from piling up responses
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"API listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+
+def _require(request: Dict, *fields) -> Dict:
+    body = request["json"]
+    if not isinstance(body, dict):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Expected a JSON object")
+    missing = [field for field in fields if field not in body]
+    if missing:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Missing fields: {', '.join(missing)}")
+    return body
+
+
+def _require_text(body: Dict, *fields):
+    wrong = [field for field in fields if not isinstance(body[field], str)]
+    if wrong:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Must be strings: {', '.join(wrong)}")
+
+
+def _response(status: int, payload: Union[Dict, str], keep_alive: bool) -> bytes:
+    if isinstance(payload, str):
+        body, content_type = payload.encode(), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload, default=str).encode(), "application/json"
+    headers = [
+        f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        "Connection: keep-alive" if keep_alive else "Connection: close",
+    ]
+    if status == HTTPStatus.SERVICE_UNAVAILABLE or status == HTTPStatus.TOO_MANY_REQUESTS:
+        headers.append("Retry-After: 1")
+    return ("\r\n".join(headers) + "\r\n\r\n").encode() + body
+
+
+def main():
+    """Run the API for the default bot, delivering queued messages in the background"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sky Bot HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--token", default=os.environ.get("SKYBOT_API_TOKEN"),
+                        help="Bearer token clients must send (default: $SKYBOT_API_TOKEN, else a random one)")
+    parser.add_argument("--uploads-dir", help="Directory attachments may be sent from (default: none)")
+    parser.add_argument("--transport", default="pywhatkit", help="pywhatkit, web or mock")
+    args = parser.parse_args()
+
+    token = args.token
+    if not token:
+        import secrets
+
+        token = secrets.token_urlsafe(24)
+        print(f"API token (set SKYBOT_API_TOKEN to choose one): {token}")
+
+    bot = SkyWhatsAppBot(transport=args.transport)
+    bot.start_background()
+    server = ApiServer(bot, args.host, args.port, token=token, uploads_dir=args.uploads_dir)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bot.close()
+
+
+if __name__ == "__main__":
+    main()
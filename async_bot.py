@@ -0,0 +1,153 @@
+"""
+Sky Bot - asyncio API
+Async front end for SkyWhatsAppBot: blocking work (transport sends, storage,
+HTTP) runs on a thread pool so one event loop can drive many conversations
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Union
+
+from Sky import SkyWhatsAppBot
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSkyWhatsAppBot:
+    def __init__(self, bot: Optional[SkyWhatsAppBot] = None, max_threads: Optional[int] = None, **bot_options):
+        """
+        Initialize the async bot
+
+        Args:
+            bot: Existing bot to wrap (a new SkyWhatsAppBot(**bot_options) otherwise)
+            max_threads: Thread pool size for blocking calls
+        """
+        self.bot = bot or SkyWhatsAppBot(**bot_options)
+        self.dispatcher = self.bot.dispatcher
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_threads or self.bot.send_workers + 4,
+            thread_name_prefix="sky-async"
+        )
+        # Concurrent sends are capped by what the transport can take
+        self._send_slots: Optional[asyncio.Semaphore] = None
+
+    async def _run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def _acquire_token(self):
+        while True:
+            wait = self.dispatcher.bucket.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    async def send_instant_message(self, phone_number: str, message: str) -> bool:
+        """Async send_instant_message (not rate limited, like the sync call)"""
+        return await self._run(self.bot.send_instant_message, phone_number, message)
+
+    async def _send_with_retry(self, phone: str, message: str, client_id: Optional[str] = None) -> bool:
+        if self._send_slots is None:
+            self._send_slots = asyncio.Semaphore(self.bot.send_workers)
+
+        for attempt in range(self.dispatcher.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self.dispatcher.retry_delay(attempt))
+                logger.info(f"Retrying {phone} (attempt {attempt + 1})")
+
+            # Slot first, then token (as dispatch.py's workers do): tasks queued on
+            # the semaphore must not hold tokens, or they all fire when slots free up
+            async with self._send_slots:
+                await self._acquire_token()
+                # The broadcast reserved the quota; the send is logged under the client
+                if await self._run(self.bot.send_instant_message, phone, message, client_id, client_id is not None):
+                    return True
+
+        return False
+
+    async def send_to_multiple_contacts(self, phone_numbers: List[str], message: Union[str, Callable[[str], str]],
+                                        progress: Optional[Callable[[int, int, str, bool], None]] = None,
+                                        client_id: Optional[str] = None) -> Dict[str, bool]:
+        """
+        Async send_to_multiple_contacts
+
+        Shares the bot's token bucket, so sync and async sends together stay
+        within send_rate. Recipients are checked like the sync call: invalid
+        numbers are skipped and numbers that format the same are sent once.
+
+        Args:
+            phone_numbers: List of phone numbers
+            message: Message to send, or message(formatted_number) -> text
+            progress: Optional callback(done, total, phone, success)
+            client_id: SkyBot Pro client to count the sends against; recipients
+                beyond its remaining quota are not sent to
+
+        Returns:
+            Dict with results for each number
+        """
+        recipients = (await self._run(self.bot._check_recipients, phone_numbers))["valid"]
+
+        if client_id is not None:
+            granted = await self._run(self.bot.quota.reserve, client_id, len(recipients))
+            if granted < len(recipients):
+                logger.warning(f"Client {client_id} quota covers {granted} of {len(recipients)} recipients")
+            recipients = recipients[:granted]
+
+        sent = dict.fromkeys(recipients, False)
+        done = 0
+
+        async def deliver(phone: str):
+            nonlocal done
+            text = message(phone) if callable(message) else message
+            sent[phone] = await self._send_with_retry(phone, text, None if client_id is None else str(client_id))
+            done += 1
+            if progress:
+                progress(done, len(recipients), phone, sent[phone])
+
+        await asyncio.gather(*(deliver(phone) for phone in recipients))
+
+        if client_id is not None:
+            failed = sum(1 for success in sent.values() if not success)
+            if failed:
+                await self._run(self.bot.quota.refund, client_id, failed)
+
+        return {phone: sent.get(self.bot.format_phone_number(phone), False) for phone in phone_numbers}
+
+    async def broadcast_to_group(self, group: str, message: str,
+                                 progress: Optional[Callable[[int, int, str, bool], None]] = None) -> Dict[str, bool]:
+        """Async broadcast_to_group"""
+        try:
+            contacts = await self._run(self.bot.storage.contacts_in_group, group)
+        except Exception as e:
+            logger.error(f"Failed to broadcast to group: {str(e)}")
+            return {}
+
+        if not contacts:
+            logger.warning(f"No contacts found in group: {group}")
+            return {}
+
+        results = await self.send_to_multiple_contacts(
+            [c["phone"] for c in contacts], self.bot.personalize(message, contacts), progress
+        )
+        logger.info(f"Broadcast to group '{group}': {len(results)} contacts")
+        return results
+
+    async def check_github_status(self) -> str:
+        return await self._run(self.bot.check_github_status)
+
+    async def send_bot_status(self, phone_number: str) -> bool:
+        """Async send_bot_status"""
+        try:
+            github_status = await self.check_github_status()
+            # Reads contact and message counts from storage: keep it off the event loop
+            status_message = await self._run(self.bot.build_status_message, github_status)
+            return await self.send_instant_message(phone_number, status_message)
+        except Exception as e:
+            logger.error(f"Failed to send status: {str(e)}")
+            return False
+
+    async def close(self):
+        """Wait for running calls and release the thread pool"""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
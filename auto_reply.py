@@ -0,0 +1,398 @@
+"""
+Sky Bot - Auto-reply engine
+Matches incoming messages against per-client keyword/regex rules and
+answers through the bot's normal send path
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from templates import compile_template
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLIENT = "default"
+
+_words = re.compile(r"\w+")
+_named_group = re.compile(r"\(\?P<\w+>")
+_quantifiers = "*+?{"
+
+
+def _literal_prefix(pattern: str) -> str:
+    """
+    Plain-text start of a regex ("order" for "order #[0-9]+"), or "" when
+    the pattern has a top-level "|" or starts with a special character
+    """
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return ""
+        i += 1
+
+    end = 0
+    while end < len(pattern) and (pattern[end].isalnum() or pattern[end] == " "):
+        end += 1
+    if end < len(pattern) and pattern[end] in _quantifiers:
+        # The last letter belongs to the quantifier ("orders?")
+        end -= 1
+    return pattern[:end]
+
+
+class RuleSet:
+    def __init__(self, rules: List[Dict]):
+        """
+        Compile one client's rules
+
+        Each rule is {"match": "keyword" | "regex" | "default", "pattern": ..., "reply": ...}.
+
+        - keyword: whole words or phrases, case-insensitive ("price list").
+          All keywords go into one phrase index, so a message costs one
+          lookup per word whatever the number of rules.
+        - regex: all patterns are joined into one alternation, factored by
+          their literal start ("order...", "book...") so a message is scanned
+          once and each branch is only tried where its prefix occurs.
+          Patterns using backreferences or inline flags can't be joined and
+          are tried one by one after it.
+        - default: reply used when nothing else matches.
+
+        Keyword rules win over regex rules; among keywords the rule listed
+        first wins, among regexes the match earliest in the message.
+
+        Args:
+            rules: Rule dicts in priority order
+        """
+        self.rules = rules
+        self.default: Optional[int] = None
+        self._phrases: Dict[str, int] = {}
+        self._max_words = 0
+        self._separate: List[Tuple[int, "re.Pattern"]] = []
+        self._patterns: Dict[int, "re.Pattern"] = {}
+
+        prefixed: Dict[str, List[str]] = {}
+        for index, rule in enumerate(rules):
+            kind = rule.get("match", "keyword")
+            pattern = rule.get("pattern", "")
+
+            if kind == "default":
+                if self.default is None:
+                    self.default = index
+            elif kind == "keyword":
+                words = _words.findall(pattern.lower())
+                if words:
+                    self._phrases.setdefault(" ".join(words), index)
+                    self._max_words = max(self._max_words, len(words))
+            elif kind == "regex":
+                try:
+                    self._patterns[index] = re.compile(pattern, re.IGNORECASE)
+                except re.error as e:
+                    logger.error(f"Skipping auto-reply rule {pattern!r}: {str(e)}")
+                    continue
+
+                joinable = _named_group.sub("(?:", pattern)
+                try:
+                    if "(?P=" in pattern or re.search(r"\\[1-9]", pattern):
+                        raise re.error("backreference")
+                    re.compile(f"(?:{joinable})")
+                    prefix = _literal_prefix(joinable)
+                    prefixed.setdefault(prefix.lower(), []).append(f"(?P<r{index}>{joinable[len(prefix):]})")
+                except re.error:
+                    self._separate.append((index, self._patterns[index]))
+            else:
+                logger.error(f"Unknown auto-reply rule type: {kind}")
+
+        combined = [
+            re.escape(prefix) + "(?:" + "|".join(branches) + ")" if prefix else "|".join(branches)
+            for prefix, branches in prefixed.items()
+        ]
+        self._combined = re.compile("|".join(combined), re.IGNORECASE) if combined else None
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _match_keyword(self, text: str) -> Optional[int]:
+        if not self._phrases:
+            return None
+
+        words = _words.findall(text.lower())
+        best = None
+        for start in range(len(words)):
+            for end in range(start + 1, min(start + self._max_words, len(words)) + 1):
+                index = self._phrases.get(" ".join(words[start:end]))
+                if index is not None and (best is None or index < best):
+                    best = index
+        return best
+
+    def match(self, text: str) -> Optional[Tuple[int, Dict]]:
+        """
+        Find the rule for an incoming message
+
+        Returns:
+            (rule index, captured named groups) or None
+        """
+        index = self._match_keyword(text)
+        if index is not None:
+            return index, {}
+
+        hit = self._combined.search(text) if self._combined else None
+        position = hit.start() if hit else len(text) + 1
+        if hit:
+            index = int(hit.lastgroup[1:])
+
+        for separate_index, pattern in self._separate:
+            found = pattern.search(text)
+            if found and found.start() < position:
+                index, position = separate_index, found.start()
+
+        if index is not None:
+            # Re-run the winning rule alone to get its own named groups
+            found = self._patterns[index].search(text)
+            return index, found.groupdict() if found else {}
+
+        if self.default is not None:
+            return self.default, {}
+        return None
+
+
+class AutoReplyEngine:
+    def __init__(self, reply: Callable[..., object], rules_file: str = "auto_replies.json",
+                 cooldown: float = 60.0):
+        """
+        Initialize the engine
+
+        Rules live in `rules_file` as {"<client id>": [rule, ...]}; messages
+        without a client use the "default" set. The file is re-read when its
+        mtime changes.
+
+        Args:
+            reply: Sends a reply, reply(phone, text, client_id=...) (e.g.
+                bot.queue_message); client_id is the rule set's client, None
+                for the "default" set
+            rules_file: JSON rule file
+            cooldown: Seconds before the same reply goes to the same sender again
+        """
+        self.reply = reply
+        self.rules_file = rules_file
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._rules: Dict[str, List[Dict]] = {}
+        self._compiled: Dict[str, RuleSet] = {}
+        self._mtime = None
+        self._last_reply: Dict[Tuple[str, str, str], float] = {}
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.rules_file)
+        except OSError:
+            return
+
+        if mtime == self._mtime:
+            return
+
+        with open(self.rules_file, "r") as f:
+            self._rules = json.load(f)
+        self._compiled = {}
+        self._mtime = mtime
+
+    def _save(self):
+        tmp_file = self.rules_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self._rules, f, indent=2)
+        os.replace(tmp_file, self.rules_file)
+        self._mtime = os.path.getmtime(self.rules_file)
+
+    def rules(self, client: str = DEFAULT_CLIENT) -> List[Dict]:
+        """Rules for one client, in priority order"""
+        with self._lock:
+            self._refresh()
+            return list(self._rules.get(str(client), []))
+
+    def set_rules(self, client: str, rules: List[Dict]):
+        """Replace a client's rule set"""
+        with self._lock:
+            self._refresh()
+            self._rules[str(client)] = list(rules)
+            self._compiled.pop(str(client), None)
+            self._save()
+
+    def add_rule(self, pattern: str, reply: str, match: str = "keyword", client: str = DEFAULT_CLIENT):
+        """
+        Append a rule to a client's rule set
+
+        Args:
+            pattern: Keyword/phrase or regular expression ("" for a default rule)
+            reply: Reply text; may use {phone}, {text} and named regex groups
+            match: "keyword", "regex" or "default"
+            client: Client id
+        """
+        if match == "regex":
+            re.compile(pattern)
+
+        with self._lock:
+            self._refresh()
+            self._rules.setdefault(str(client), []).append({"match": match, "pattern": pattern, "reply": reply})
+            self._compiled.pop(str(client), None)
+            self._save()
+
+    def _rule_set(self, client: str) -> RuleSet:
+        with self._lock:
+            self._refresh()
+            rule_set = self._compiled.get(client)
+            if rule_set is None:
+                rule_set = self._compiled[client] = RuleSet(self._rules.get(client, []))
+            return rule_set
+
+    def find_reply(self, text: str, client: str = DEFAULT_CLIENT, phone: str = "") -> Optional[str]:
+        """
+        Reply text for a message, or None if no rule matches
+
+        Args:
+            text: Incoming message
+            client: Client whose rules apply
+            phone: Sender, available to replies as {phone}
+        """
+        rule_set = self._rule_set(str(client))
+        found = rule_set.match(text)
+        if found is None:
+            return None
+
+        index, groups = found
+        return compile_template(rule_set.rules[index]["reply"]).render(groups, phone=phone, text=text)
+
+    def handle(self, message: Dict) -> Optional[str]:
+        """
+        Answer one incoming message
+
+        Args:
+            message: {"phone": sender, "text": ..., "client": optional client id}
+
+        Returns:
+            The reply sent, or None
+        """
+        client = str(message.get("client") or DEFAULT_CLIENT)
+        phone = message["phone"]
+        text = message.get("text", "")
+
+        reply = self.find_reply(text, client, phone)
+        if reply is None:
+            return None
+
+        key = (client, phone, reply)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_reply.get(key, -self.cooldown) < self.cooldown:
+                return None
+            self._last_reply[key] = now
+            if len(self._last_reply) > 10000:
+                self._last_reply = {k: t for k, t in self._last_reply.items() if now - t < self.cooldown}
+
+        try:
+            self.reply(phone, reply, client_id=None if client == DEFAULT_CLIENT else client)
+        except Exception as e:
+            logger.error(f"Auto-reply to {phone} failed: {str(e)}")
+            return None
+
+        logger.info(f"Auto-replied to {phone} ({client})")
+        return reply
+
+    def run(self, source: "InboundSource", stop: Optional[threading.Event] = None) -> int:
+        """
+        Answer messages from a source until it is exhausted or `stop` is set
+
+        Returns:
+            Number of replies sent
+        """
+        replied = 0
+        for message in source.messages():
+            if stop is not None and stop.is_set():
+                break
+            if self.handle(message):
+                replied += 1
+        return replied
+
+
+class InboundSource:
+    """Where incoming messages come from"""
+
+    def messages(self) -> Iterator[Dict]:
+        """Yield {"phone", "text", "client"} dicts"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def parse_inbound_line(line: str) -> Optional[Dict]:
+    """
+    Parse one inbound line: a JSON object, or "<phone> <text>"
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    if line.startswith("{"):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            logger.error(f"Bad inbound line: {line[:80]}")
+            return None
+        return message if "phone" in message else None
+
+    phone, _, text = line.partition(" ")
+    return {"phone": phone, "text": text.strip()}
+
+
+class FileSource(InboundSource):
+    def __init__(self, path: str = "-", follow: bool = False, poll_interval: float = 0.5):
+        """
+        Incoming messages from a file or stdin, one per line (offline testing)
+
+        Args:
+            path: File path, or "-" for stdin
+            follow: Keep waiting for new lines like `tail -f`
+            poll_interval: Seconds between checks for new lines when following
+        """
+        self.path = path
+        self.follow = follow
+        self.poll_interval = poll_interval
+        self._closed = False
+
+    def messages(self) -> Iterator[Dict]:
+        stream = sys.stdin if self.path == "-" else open(self.path, "r", encoding="utf-8")
+        try:
+            while not self._closed:
+                line = stream.readline()
+                if not line:
+                    if not self.follow:
+                        return
+                    time.sleep(self.poll_interval)
+                    continue
+                message = parse_inbound_line(line)
+                if message:
+                    yield message
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def close(self):
+        self._closed = True
@@ -0,0 +1,78 @@
+"""
+Sky Bot - Auto-reply matching benchmark
+Throughput and per-message latency of RuleSet.match with thousands of rules
+
+Usage: python benchmarks/bench_auto_reply.py [keyword_rules] [regex_rules] [messages]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auto_reply import RuleSet
+
+WORDS = ["hello", "price", "order", "delivery", "hours", "refund", "menu", "booking", "special",
+         "today", "please", "thanks", "where", "when", "status", "cancel", "help", "open"]
+
+
+def make_rules(keywords: int, regexes: int):
+    rules = [
+        {"match": "keyword", "pattern": f"{random.choice(WORDS)} item{i}", "reply": f"Reply {i}"}
+        for i in range(keywords)
+    ]
+    rules += [
+        {"match": "regex", "pattern": rf"order\s*#?(?P<order>{i}\d{{3}})\b", "reply": "Order {order}"}
+        for i in range(regexes)
+    ]
+    rules.append({"match": "default", "pattern": "", "reply": "Thanks, we'll get back to you"})
+    return rules
+
+
+def make_messages(count: int, rules):
+    keywords = [rule["pattern"] for rule in rules if rule["match"] == "keyword"]
+    messages = []
+    for i in range(count):
+        words = random.choices(WORDS, k=random.randint(3, 15))
+        if i % 3 == 0 and keywords:
+            words.append(random.choice(keywords))
+        elif i % 3 == 1:
+            words.append(f"order #{random.randrange(10 ** 5)}")
+        messages.append(" ".join(words))
+    return messages
+
+
+def main():
+    keywords = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    regexes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else 50000
+    random.seed(42)
+
+    start = time.perf_counter()
+    rules = make_rules(keywords, regexes)
+    rule_set = RuleSet(rules)
+    print(f"Compiled {len(rule_set):,} rules in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    messages = make_messages(count, rules)
+    latencies = []
+    matched = 0
+    start = time.perf_counter()
+    for text in messages:
+        t = time.perf_counter()
+        found = rule_set.match(text)
+        latencies.append(time.perf_counter() - t)
+        if found and found[0] != rule_set.default:
+            matched += 1
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"Matched {matched:,}/{count:,} messages: {count / elapsed:,.0f} msgs/s, "
+          f"p50 {p50:.1f} µs, p99 {p99:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
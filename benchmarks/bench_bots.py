@@ -0,0 +1,308 @@
+"""
+Sky Bot - Bot benchmark suite
+Throughput, p50/p99 latency and peak RSS for SkyWhatsAppBot, SkyBotPro and
+SimpleWhatsAppBot on synthetic datasets, using the mock transport. Each
+(case, size) runs in a fresh process and temp directory so results can be
+compared across commits.
+
+Usage: python benchmarks/bench_bots.py [--sizes 1k,100k,1M] [--cases sky.send,pro.add_client]
+                                       [--storage sqlite|json] [--repeat 3] [--output results.json]
+"""
+
+import argparse
+import builtins
+import contextlib
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MESSAGE = "Hello from Sky Bot! Your weekly update is ready."
+
+
+def parse_size(text: str) -> int:
+    multipliers = {"k": 1000, "m": 1000000}
+    text = text.strip().lower()
+    if text[-1:] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+
+def make_contacts(count: int):
+    return [{"name": f"Contact {i}", "phone": f"2782{i:07d}", "group": "bench",
+             "added_at": "2024-01-01T00:00:00"} for i in range(count)]
+
+
+def make_clients(count: int):
+    from SkyBot_Pro import SERVICES
+
+    plans = ("basic", "pro", "enterprise")
+    return [{"business": f"Business {i}", "contact": f"Owner {i}", "phone": f"2783{i:07d}",
+             "plan": plans[i % 3], "price": SERVICES[plans[i % 3]]["price"], "join_date": "2024-01-01",
+             "status": "active"} for i in range(count)]
+
+
+def make_log(count: int):
+    today = datetime.now().isoformat()
+    return [{"timestamp": today, "phone": f"2782{i:07d}", "message": MESSAGE, "type": "instant",
+             "status": "sent"} for i in range(count)]
+
+
+class Timer:
+    """Per-call durations in a compact array (a list of floats would skew RSS at 1M)"""
+
+    def __init__(self):
+        self.samples = array("d")
+
+    @contextlib.contextmanager
+    def __call__(self):
+        start = time.perf_counter()
+        yield
+        self.samples.append(time.perf_counter() - start)
+
+
+def quiet():
+    """Silence the menus' prints while timing (the print cost itself is still paid)"""
+    return contextlib.redirect_stdout(open(os.devnull, "w"))
+
+
+# Cases: each builds its bot, seeds `size` records and returns (operations, timer)
+
+def sky_bot(storage: str):
+    from Sky import SkyWhatsAppBot
+
+    return SkyWhatsAppBot(storage=storage, transport="mock", data_dir=".",
+                          config={"send_rate": 1e9, "send_burst": 1e9, "send_retries": 0})
+
+
+def case_sky_send(size: int, storage: str, repeat: int):
+    bot, timer = sky_bot(storage), Timer()
+    phones = [contact["phone"] for contact in make_contacts(size)]
+    for phone in phones:
+        with timer():
+            bot.send_instant_message(phone, MESSAGE)
+    bot.close()
+    return size, timer
+
+
+def case_sky_broadcast(size: int, storage: str, repeat: int):
+    bot, timer = sky_bot(storage), Timer()
+    contacts = make_contacts(size)
+    bot.storage.add_contacts(contacts)
+    phones = [contact["phone"] for contact in contacts]
+    for _ in range(repeat):
+        with timer():
+            bot.send_to_multiple_contacts(phones, bot.personalize("Hi {name}! " + MESSAGE, contacts))
+    bot.close()
+    return size * repeat, timer
+
+
+def case_sky_log(size: int, storage: str, repeat: int):
+    bot, timer = sky_bot(storage), Timer()
+    for i in range(size):
+        with timer():
+            bot.log_message(f"2782{i:07d}", MESSAGE, "instant")
+    bot.close()
+    return size, timer
+
+
+def case_sky_stats(size: int, storage: str, repeat: int):
+    bot, timer = sky_bot(storage), Timer()
+    bot.storage.add_contacts(make_contacts(size))
+    bot.storage.log_messages(make_log(size))
+    # Throughput here is stats queries per second over `size` records
+    for _ in range(repeat):
+        with timer():
+            bot.get_contact_count()
+            bot.get_today_message_count()
+    bot.close()
+    return repeat, timer
+
+
+def case_pro_add_client(size: int, storage: str, repeat: int):
+    from SkyBot_Pro import SkyBotPro
+
+    with quiet():
+        pro = SkyBotPro(storage=storage)
+    timer = Timer()
+    with quiet():
+        for client in make_clients(size):
+            with timer():
+                pro.add_client(client["business"], client["contact"], client["phone"], client["plan"])
+    pro.storage.close()
+    return size, timer
+
+
+def case_pro_show_clients(size: int, storage: str, repeat: int):
+    from SkyBot_Pro import SkyBotPro
+
+    with quiet():
+        pro = SkyBotPro(storage=storage)
+    pro.registry.add_many(make_clients(size))
+    # Throughput here is report pages (with income totals) per second
+    timer = Timer()
+    with quiet():
+        for _ in range(repeat):
+            with timer():
+                pro.show_clients()
+    pro.storage.close()
+    return repeat, timer
+
+
+def case_simple_save_contact(size: int, storage: str, repeat: int):
+    from simple_whatsapp_bot import SimpleWhatsAppBot
+
+    with quiet():
+        bot = SimpleWhatsAppBot(storage=storage)
+    timer = Timer()
+    with quiet():
+        for contact in make_contacts(size):
+            with timer():
+                bot.save_contact(contact["name"], contact["phone"])
+    bot.storage.close()
+    return size, timer
+
+
+def case_simple_broadcast_message(size: int, storage: str, repeat: int):
+    import simple_whatsapp_bot
+
+    with quiet():
+        bot = simple_whatsapp_bot.SimpleWhatsAppBot(storage=storage)
+    bot.storage.add_contacts(make_contacts(size))
+
+    # The menu asks for the text and paces the printout for a human; skip both
+    builtins.input = lambda prompt="": MESSAGE
+    simple_whatsapp_bot.time.sleep = lambda seconds: None
+
+    timer = Timer()
+    with quiet():
+        for _ in range(repeat):
+            with timer():
+                bot.broadcast_message()
+    bot.storage.close()
+    return size * repeat, timer
+
+
+CASES = {
+    "sky.send": case_sky_send,
+    "sky.broadcast": case_sky_broadcast,
+    "sky.log": case_sky_log,
+    "sky.stats": case_sky_stats,
+    "pro.add_client": case_pro_add_client,
+    "pro.show_clients": case_pro_show_clients,
+    "simple.save_contact": case_simple_save_contact,
+    "simple.broadcast_message": case_simple_broadcast_message,
+}
+
+
+def peak_rss_mb() -> float:
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(sorted_samples, q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(q * len(sorted_samples)))]
+
+
+def run_case(name: str, size: int, storage: str, repeat: int) -> dict:
+    """Run one case in this process (called in the child)"""
+    logging.disable(logging.INFO)
+    os.chdir(tempfile.mkdtemp(prefix="skybench-"))
+
+    start = time.perf_counter()
+    operations, timer = CASES[name](size, storage, repeat)
+    wall = time.perf_counter() - start
+
+    samples = sorted(timer.samples)
+    busy = sum(samples)
+    return {
+        "case": name,
+        "size": size,
+        "storage": storage,
+        "operations": operations,
+        "calls": len(samples),
+        "seconds": round(busy, 4),
+        "wall_seconds": round(wall, 4),
+        "throughput": round(operations / busy, 1) if busy else None,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sky Bot benchmark suite (mock transport)")
+    parser.add_argument("--sizes", default="1k,100k,1M", help="Dataset sizes, e.g. 1k,100k,1M")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated: " + ", ".join(CASES))
+    parser.add_argument("--storage", default="sqlite", choices=("sqlite", "json"))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of the whole-dataset cases")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        name, size = args.run.rsplit(":", 1)
+        print(json.dumps(run_case(name, int(size), args.storage, args.repeat)))
+        return
+
+    names = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+
+    results = []
+    for size in (parse_size(size) for size in args.sizes.split(",")):
+        for name in names:
+            child = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run", f"{name}:{size}",
+                 "--storage", args.storage, "--repeat", str(args.repeat)],
+                capture_output=True, text=True
+            )
+            if child.returncode != 0:
+                print(f"{name} @ {size:,} failed:\n{child.stderr}", file=sys.stderr)
+                results.append({"case": name, "size": size, "storage": args.storage, "error": child.stderr[-2000:]})
+                continue
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{name:<26} {size:>9,}  {result['throughput'] or 0:>12,.0f} ops/s  "
+                  f"p50 {result['p50_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms  "
+                  f"rss {result['peak_rss_mb']:.0f} MB", file=sys.stderr)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
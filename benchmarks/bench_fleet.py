@@ -0,0 +1,42 @@
+"""
+Sky Bot - Broadcast fleet benchmark
+Throughput of BroadcastFleet with 1..N worker processes on the mock transport
+
+Usage: python benchmarks/bench_fleet.py [recipients] [max_workers] [latency_seconds]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fleet import BroadcastFleet
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+    recipients = [(f"2782{i:07d}", {"name": f"Contact {i}", "group": "bench"}) for i in range(count)]
+    print(f"{count:,} recipients, mock latency {latency * 1000:.1f} ms")
+
+    workers = 1
+    while workers <= max_workers:
+        fleet = BroadcastFleet(workers, transport="mock", transport_options={"latency": latency},
+                               rate=1e9, burst=1e6, max_retries=0)
+        fleet.broadcast(recipients[:workers * 10], "warm up {name}")
+
+        start = time.perf_counter()
+        results = fleet.broadcast(recipients, "Hello {name}, news for {group}!", log=lambda entries: None)
+        elapsed = time.perf_counter() - start
+        fleet.close()
+
+        print(f"{workers:>3} workers: {count / elapsed:>10,.0f} msgs/s  "
+              f"({sum(results.values()):,} sent in {elapsed:.2f} s)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Sky Bot - Cold start benchmark
+Time to import each entry point (and to run a CLI command) in a fresh
+interpreter, and which heavy third-party modules got pulled in on the way
+
+Usage: python benchmarks/bench_import.py [--repeat 10] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only load when the feature needing them runs
+HEAVY = ("pandas", "numpy", "pyarrow", "requests", "pywhatkit", "selenium", "openpyxl", "multiprocessing")
+
+TARGETS = {
+    "Sky": "import Sky",
+    "SkyBot_Pro": "import SkyBot_Pro",
+    "simple_whatsapp_bot": "import simple_whatsapp_bot",
+    "sky_cli": "import sky_cli",
+    "api_server": "import api_server",
+    # A cron-style run: interpreter start, imports, bot construction, JSON out
+    "sky_cli schedule list": "import sky_cli; sky_cli.main(['schedule', 'list'])",
+}
+
+PROBE = "; import sys, json; print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)), file=sys.stderr)"
+
+
+def run_once(code: str, workdir: str):
+    """Seconds for one fresh interpreter to run `code`, and the heavy modules it loaded"""
+    start = time.perf_counter()
+    child = subprocess.run(
+        [sys.executable, "-c", f"import sys; sys.path.insert(0, {ROOT!r}); " + code + PROBE.format(heavy=HEAVY)],
+        cwd=workdir, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if child.returncode != 0:
+        raise RuntimeError(child.stderr[-2000:])
+    return elapsed, json.loads(child.stderr.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sky Bot import-time benchmark")
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per target")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="skybench-")
+    baseline = statistics.median(run_once("pass", workdir)[0] for _ in range(args.repeat))
+    print(f"{'python -c pass':<24} {baseline * 1000:>8.1f} ms", file=sys.stderr)
+
+    results = []
+    for name, code in TARGETS.items():
+        # First run creates the data files / bytecode; time the warm-cache starts after it
+        run_once(code, workdir)
+        samples, heavy = [], []
+        for _ in range(args.repeat):
+            elapsed, heavy = run_once(code, workdir)
+            samples.append(elapsed)
+        median = statistics.median(samples)
+        results.append({
+            "target": name,
+            "median_ms": round(median * 1000, 1),
+            "over_baseline_ms": round((median - baseline) * 1000, 1),
+            "min_ms": round(min(samples) * 1000, 1),
+            "heavy_modules": heavy,
+        })
+        print(f"{name:<24} {median * 1000:>8.1f} ms  (+{(median - baseline) * 1000:.1f})  "
+              f"heavy: {', '.join(heavy) or '-'}", file=sys.stderr)
+
+    report = {"python": sys.version.split()[0], "baseline_ms": round(baseline * 1000, 1), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Sky Bot - Template render benchmark
+Compares compiled templates against str.format on synthetic contacts
+
+Usage: python benchmarks/bench_templates.py [contacts]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from templates import CompiledTemplate
+
+TEMPLATE = "Hello {name}! 👋 Your {group} update from Sky Bot is ready. Reply HELP for options."
+
+
+def make_contacts(count: int):
+    return [
+        {"name": f"Contact {i}", "phone": f"2771{i:07d}", "group": f"group{i % 10}",
+         "country_code": "27", "added_at": "2024-01-01T00:00:00"}
+        for i in range(count)
+    ]
+
+
+def timed(label: str, render, contacts):
+    start = time.perf_counter()
+    for contact in contacts:
+        render(contact)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(contacts) / elapsed:>12,.0f} msgs/s  ({elapsed * 1000:.1f} ms)")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    contacts = make_contacts(count)
+    print(f"Rendering {count:,} personalized messages")
+
+    compiled = CompiledTemplate(TEMPLATE)
+    timed("compiled template", compiled.render, contacts)
+    timed("str.format(**record)", lambda contact: TEMPLATE.format(**contact), contacts)
+    timed("parse + format per message", lambda contact: CompiledTemplate(TEMPLATE).render(contact), contacts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Sky Bot - SkyBot Pro billing
+Monthly invoices and payment reminders for clients. Due dates follow each
+client's join date; a due-date index finds who is due without scanning,
+and a billing run writes and queues a whole batch in one transaction.
+"""
+
+import sqlite3
+import threading
+import logging
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from client_registry import ClientRegistry
+from outbox import Outbox
+from phone_numbers import format_phone
+from templates import compile_template
+
+logger = logging.getLogger(__name__)
+
+# Matches the "Next billing: 30 days" promise in the welcome message
+CYCLE_DAYS = 30
+
+INVOICE_TEMPLATE = """Hello {contact}! 🧾
+
+Invoice #{invoice_id} from {business_name}
+
+📋 {plan} plan: R{amount}
+📅 Due: {due_date}
+
+Reply PAID once you have paid. Questions? {support_number}"""
+
+REMINDER_TEMPLATE = """Hello {contact}! ⏰
+
+Friendly reminder: invoice #{invoice_id} for R{amount} is {when}.
+
+Reply PAID once you have paid. Questions? {support_number}"""
+
+
+def _parse_day(value) -> Optional[date]:
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+class BillingEngine:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER NOT NULL,
+            due_date TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            plan TEXT,
+            status TEXT NOT NULL DEFAULT 'open',
+            created_at TEXT,
+            paid_at TEXT,
+            reminded_at TEXT,
+            enqueued INTEGER NOT NULL DEFAULT 0,
+            reminder_enqueued INTEGER NOT NULL DEFAULT 1,
+            UNIQUE (client_id, due_date)
+        );
+        CREATE INDEX IF NOT EXISTS idx_invoices_open ON invoices (status, due_date);
+    """
+
+    def __init__(self, clients: ClientRegistry, db_file: str = "billing.db", country_code: str = "27",
+                 sender: Optional[Dict] = None, cycle_days: int = CYCLE_DAYS,
+                 invoice_template: str = INVOICE_TEMPLATE, reminder_template: str = REMINDER_TEMPLATE):
+        """
+        Open the invoice database and index every client by next due date
+
+        Args:
+            clients: Client registry (plan, price and status are read at billing time)
+            db_file: SQLite file holding the invoices
+            country_code: For formatting client phone numbers
+            sender: Extra template fields, e.g. business_name and support_number
+            cycle_days: Days between invoices
+            invoice_template: Text of the invoice message
+            reminder_template: Text of the payment reminder
+        """
+        self.clients = clients
+        self.db_file = db_file
+        self.country_code = country_code
+        self.sender = dict(sender or {})
+        self.cycle_days = cycle_days
+        self.invoice_template = compile_template(invoice_template)
+        self.reminder_template = compile_template(reminder_template)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(invoices)")}
+        # Invoices from before the flags existed were queued in the run that created them
+        for column in ("enqueued", "reminder_enqueued"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE invoices ADD COLUMN {column} INTEGER NOT NULL DEFAULT 1")
+
+        self.reload()
+
+    # Due-date index: day -> client ids, plus the sorted days
+
+    def reload(self):
+        """Rebuild the due-date index (after a bulk import, say)"""
+        with self._lock:
+            last_billed = {
+                row["client_id"]: row["due_date"]
+                for row in self._conn.execute(
+                    "SELECT client_id, MAX(due_date) AS due_date FROM invoices GROUP BY client_id"
+                )
+            }
+            self._next_due: Dict[int, str] = {}
+            self._by_due: Dict[str, Set[int]] = {}
+            self._due_days: List[str] = []
+            for client in self.clients.all():
+                self._track(client, last_billed.get(client["id"]))
+
+    def _first_due(self, client: Dict, last_billed: Optional[str]) -> Optional[str]:
+        """Next cycle date after the last invoice; never-billed clients start at their next anniversary"""
+        if last_billed:
+            return (_parse_day(last_billed) + timedelta(days=self.cycle_days)).isoformat()
+
+        joined = _parse_day(client.get("join_date"))
+        if joined is None:
+            return None
+        today = date.today()
+        cycles = max(1, -(-(today - joined).days // self.cycle_days))
+        return (joined + timedelta(days=cycles * self.cycle_days)).isoformat()
+
+    def _track(self, client: Dict, last_billed: Optional[str] = None):
+        due = self._first_due(client, last_billed)
+        if due is not None:
+            self._set_due(client["id"], due)
+
+    def _set_due(self, client_id: int, due: str):
+        old = self._next_due.get(client_id)
+        if old is not None:
+            bucket = self._by_due[old]
+            bucket.discard(client_id)
+            if not bucket:
+                del self._by_due[old]
+                del self._due_days[bisect_right(self._due_days, old) - 1]
+
+        self._next_due[client_id] = due
+        if due not in self._by_due:
+            self._by_due[due] = set()
+            insort(self._due_days, due)
+        self._by_due[due].add(client_id)
+
+    def track(self, client: Dict):
+        """Start billing a newly added client"""
+        with self._lock:
+            self._track(client)
+
+    def next_due(self, client: Dict) -> Optional[str]:
+        """Next billing date of a client (YYYY-MM-DD)"""
+        with self._lock:
+            due = self._next_due.get(client.get("id"))
+        return due or self._first_due(client, None)
+
+    def due_between(self, start: Optional[str], end: str) -> List[int]:
+        """Ids of clients whose next invoice falls in [start, end] (start None: from the earliest)"""
+        with self._lock:
+            first = 0 if start is None else bisect_left(self._due_days, start)
+            days = self._due_days[first:bisect_right(self._due_days, end)]
+            return [client_id for day in days for client_id in sorted(self._by_due[day])]
+
+    # Billing run
+
+    def run(self, outbox: Optional[Outbox] = None, window_days: int = 7, remind_days: int = 3,
+            today: Optional[date] = None) -> Dict:
+        """
+        Invoice every client due within the window and remind unpaid ones
+
+        New invoices and reminders are written in one transaction and queued
+        in one outbox batch (dedupe keys make a repeated run a no-op). Each
+        invoice is flagged once its messages are in the outbox; messages a
+        crashed run never queued are queued by the next run.
+
+        Args:
+            outbox: Where to queue the messages (None: only create invoices)
+            window_days: Invoice clients whose due date is up to this many days ahead
+            remind_days: Remind open invoices due within this many days or
+                overdue, at most once per remind_days (never on the day they were sent)
+            today: Billing date (default today)
+
+        Returns:
+            {"invoiced": ..., "reminded": ..., "queued": ..., "amount": ...}
+        """
+        today = today or date.today()
+        horizon = (today + timedelta(days=window_days)).isoformat()
+        now = datetime.now().isoformat()
+        totals = {"invoiced": 0, "reminded": 0, "queued": 0, "amount": 0}
+
+        with self._lock:
+            due_ids = self.due_between(None, horizon)
+
+            with self._conn:
+                for client_id in due_ids:
+                    client = self.clients.get(client_id)
+                    due = self._next_due[client_id]
+                    if client is None or client.get("status") != "active":
+                        # Skip the cycle; billing resumes if the client is reactivated
+                        self._set_due(client_id, (_parse_day(due) + timedelta(days=self.cycle_days)).isoformat())
+                        continue
+
+                    while due <= horizon:
+                        cursor = self._conn.execute(
+                            "INSERT OR IGNORE INTO invoices "
+                            "(client_id, due_date, amount, plan, created_at, enqueued, reminder_enqueued) "
+                            "VALUES (?, ?, ?, ?, ?, 0, 1)",
+                            (client_id, due, client["price"], client["plan"], now)
+                        )
+                        if cursor.rowcount:
+                            totals["invoiced"] += 1
+                            totals["amount"] += client["price"]
+                        due = (_parse_day(due) + timedelta(days=self.cycle_days)).isoformat()
+                    self._set_due(client_id, due)
+
+                reminders = self._conn.execute(
+                    "SELECT * FROM invoices WHERE status = 'open' AND due_date <= ? "
+                    "AND (reminded_at IS NULL OR reminded_at <= ?) AND created_at < ?",
+                    ((today + timedelta(days=remind_days)).isoformat(),
+                     (today - timedelta(days=remind_days)).isoformat(), min(today.isoformat(), now))
+                ).fetchall()
+                reminded = []
+                for invoice in reminders:
+                    client = self.clients.get(invoice["client_id"])
+                    if client is None or client.get("status") != "active":
+                        continue
+                    reminded.append((today.isoformat(), invoice["id"]))
+                self._conn.executemany(
+                    "UPDATE invoices SET reminded_at = ?, reminder_enqueued = 0 WHERE id = ?", reminded
+                )
+                totals["reminded"] = len(reminded)
+
+            # Everything not yet handed to the outbox, including leftovers of a crashed run
+            messages, invoice_ids, reminder_ids = self._unqueued_messages()
+            if outbox is not None and messages:
+                totals["queued"] = sum(1 for message_id in outbox.enqueue_many(messages) if message_id)
+            with self._conn:
+                self._conn.executemany("UPDATE invoices SET enqueued = 1 WHERE id = ?", invoice_ids)
+                self._conn.executemany("UPDATE invoices SET reminder_enqueued = 1 WHERE id = ?", reminder_ids)
+
+        logger.info(f"Billing run: {totals['invoiced']} invoices (R{totals['amount']}), "
+                    f"{totals['reminded']} reminders, {totals['queued']} messages queued")
+        return totals
+
+    def _unqueued_messages(self):
+        """Messages of invoices and reminders not flagged as queued, and the ids to flag"""
+        messages, invoice_ids, reminder_ids = [], [], []
+        rows = self._conn.execute(
+            "SELECT * FROM invoices WHERE enqueued = 0 OR reminder_enqueued = 0 ORDER BY id"
+        ).fetchall()
+        for invoice in rows:
+            client = self.clients.get(invoice["client_id"])
+            due = invoice["due_date"]
+            if not invoice["enqueued"]:
+                invoice_ids.append((invoice["id"],))
+                if client is not None:
+                    messages.append(self._message(
+                        client, f"invoice:{invoice['id']}", self.invoice_template,
+                        invoice_id=invoice["id"], amount=invoice["amount"], due_date=due
+                    ))
+            if not invoice["reminder_enqueued"]:
+                reminder_ids.append((invoice["id"],))
+                day = invoice["reminded_at"]
+                if client is not None and invoice["status"] == "open":
+                    when = "overdue since " + due if due < day else "due on " + due
+                    messages.append(self._message(
+                        client, f"reminder:{invoice['id']}:{day}", self.reminder_template,
+                        invoice_id=invoice["id"], amount=invoice["amount"], due_date=due, when=when
+                    ))
+        return messages, invoice_ids, reminder_ids
+
+    def _message(self, client: Dict, dedupe_key: str, template, **fields) -> Dict:
+        # No client_id: billing messages don't count against the client's own quota
+        return {
+            "phone": format_phone(client["phone"], self.country_code),
+            "message": template.render(client, **self.sender, plan=client["plan"].upper(), **fields),
+            "dedupe_key": dedupe_key
+        }
+
+    # Invoices
+
+    def mark_paid(self, invoice_id: int) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE invoices SET status = 'paid', paid_at = ? WHERE id = ? AND status = 'open'",
+                (datetime.now().isoformat(), invoice_id)
+            ).rowcount == 1
+
+    def invoices(self, client_id: Optional[int] = None, status: Optional[str] = None) -> List[Dict]:
+        """Invoices, newest first, optionally for one client and/or status"""
+        conditions, params = [], []
+        if client_id is not None:
+            conditions.append("client_id = ?")
+            params.append(client_id)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(
+                f"SELECT * FROM invoices {where} ORDER BY due_date DESC, id DESC", params
+            )]
+
+    def outstanding(self, today: Optional[date] = None) -> Dict[str, int]:
+        """Open invoices and how many of them are overdue"""
+        today = (today or date.today()).isoformat()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS open, COALESCE(SUM(amount), 0) AS amount, "
+                "COALESCE(SUM(due_date < ?), 0) AS overdue, "
+                "COALESCE(SUM(CASE WHEN due_date < ? THEN amount ELSE 0 END), 0) AS overdue_amount "
+                "FROM invoices WHERE status = 'open'", (today, today)
+            ).fetchone()
+        return dict(row)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
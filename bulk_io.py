@@ -0,0 +1,224 @@
+"""
+Sky Bot - Bulk CSV/Excel import and export
+Files are streamed in chunks, so memory stays flat however large they are
+"""
+
+import csv
+import os
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from phone_numbers import normalize_phone_series, normalize_phones
+from storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+CONTACT_COLUMNS = ["name", "phone", "group", "country_code", "added_at"]
+CLIENT_COLUMNS = ["id", "business", "contact", "phone", "plan", "price", "join_date", "status"]
+
+ProgressCallback = Callable[[Dict[str, int]], None]
+
+
+def _is_excel(path) -> bool:
+    # Streams (e.g. stdin) are read as CSV
+    return isinstance(path, str) and os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm")
+
+
+def read_chunks(path: str, chunk_size: int = 5000):
+    """
+    Yield the rows of a CSV or XLSX file (or a CSV text stream) as DataFrames
+    of `chunk_size` rows
+
+    All values are read as strings; column names are lower-cased.
+    """
+    import pandas as pd
+
+    if not _is_excel(path):
+        for chunk in pd.read_csv(path, dtype=str, chunksize=chunk_size, keep_default_na=False,
+                                 skipinitialspace=True):
+            chunk.columns = [str(c).strip().lower() for c in chunk.columns]
+            yield chunk
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(c).strip().lower() if c is not None else "" for c in next(rows, [])]
+        batch = []
+        width = len(header)
+        for row in rows:
+            # Trailing empty cells may be missing from a row; pad (or trim) it to the header
+            values = ["" if v is None else str(v) for v in row[:width]]
+            batch.append(values + [""] * (width - len(values)))
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def import_contacts(storage: StorageBackend, path: str, country_code: str, default_group: str = "general",
+                    chunk_size: int = 5000, progress: Optional[ProgressCallback] = None) -> Dict[str, int]:
+    """
+    Stream contacts from a CSV/XLSX file into storage
+
+    Needs a "phone" column; "name" and "group" are optional. Numbers are
+    normalized per chunk, invalid ones are skipped, and each chunk is
+    committed as one batch. Duplicates (in the file or already stored) are
+    dropped by the storage index.
+
+    Args:
+        storage: Destination backend
+        path: .csv or .xlsx file
+        country_code: Default country code for local numbers
+        default_group: Group for rows without one
+        chunk_size: Rows per batch
+        progress: Called with running totals after each batch
+
+    Returns:
+        {"rows": ..., "added": ..., "invalid": ..., "duplicates": ...}
+    """
+    totals = {"rows": 0, "added": 0, "invalid": 0, "duplicates": 0}
+    added_at = datetime.now().isoformat()
+
+    for chunk in read_chunks(path, chunk_size):
+        if "phone" not in chunk.columns:
+            raise ValueError(f"{path} has no 'phone' column")
+
+        phones = normalize_phone_series(chunk["phone"], country_code)
+        valid = phones["valid"]
+
+        names = chunk["name"] if "name" in chunk.columns else chunk["phone"]
+        groups = chunk["group"].where(chunk["group"] != "", default_group) if "group" in chunk.columns else None
+
+        contacts = [
+            {
+                "name": name,
+                "phone": phone,
+                "country_code": country_code,
+                "group": group or default_group,
+                "added_at": added_at
+            }
+            for name, phone, group in zip(
+                names[valid], phones["phone"][valid],
+                groups[valid] if groups is not None else [default_group] * int(valid.sum())
+            )
+        ]
+
+        added = storage.add_contacts(contacts)
+        totals["rows"] += len(chunk)
+        totals["added"] += added
+        totals["invalid"] += int((~valid).sum())
+        totals["duplicates"] += len(contacts) - added
+
+        if progress:
+            progress(dict(totals))
+
+    logger.info(f"Imported contacts from {path}: {totals}")
+    return totals
+
+
+def import_clients(storage: StorageBackend, path: str, services: Dict[str, Dict], chunk_size: int = 5000,
+                   progress: Optional[ProgressCallback] = None, country_code: str = "27") -> Dict[str, int]:
+    """
+    Stream SkyBot Pro clients from a CSV/XLSX file into storage
+
+    Needs "business" and "phone" columns; "contact", "plan", "join_date" and
+    "status" are optional. Unknown plans become "basic" and the price comes
+    from `services`. Rows whose phone already belongs to a client are skipped;
+    numbers are compared normalized, so "071 234 5678" matches "+27712345678".
+    Phones are stored as given (billing formats them when sending).
+
+    Returns:
+        {"rows": ..., "added": ..., "duplicates": ...}
+    """
+    totals = {"rows": 0, "added": 0, "duplicates": 0}
+    stored = [client["phone"] or "" for client in storage.iter_clients()]
+    known_phones = {
+        formatted or phone.strip() for phone, formatted in zip(stored, normalize_phones(stored, country_code))
+    }
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    for chunk in read_chunks(path, chunk_size):
+        for column in ("business", "phone"):
+            if column not in chunk.columns:
+                raise ValueError(f"{path} has no '{column}' column")
+
+        phones = normalize_phone_series(chunk["phone"], country_code)
+        # Invalid numbers are still imported (as before); they dedupe on the raw text
+        keys = phones["phone"].where(phones["valid"], chunk["phone"].str.strip())
+
+        clients = []
+        for row, key in zip(chunk.to_dict("records"), keys):
+            phone = row["phone"].strip()
+            if key in known_phones:
+                totals["duplicates"] += 1
+                continue
+            known_phones.add(key)
+
+            plan = (row.get("plan") or "basic").strip().lower()
+            if plan not in services:
+                plan = "basic"
+            clients.append({
+                "business": row["business"],
+                "contact": row.get("contact", ""),
+                "phone": phone,
+                "plan": plan,
+                "price": services[plan]["price"],
+                "join_date": row.get("join_date") or today,
+                "status": row.get("status") or "active"
+            })
+
+        storage.add_clients(clients)
+        totals["rows"] += len(chunk)
+        totals["added"] += len(clients)
+
+        if progress:
+            progress(dict(totals))
+
+    logger.info(f"Imported clients from {path}: {totals}")
+    return totals
+
+
+def _write_rows(path: str, columns: List[str], records: Iterable[Dict]) -> int:
+    """Stream records to CSV or XLSX (write-only workbook); returns row count"""
+    count = 0
+
+    if _is_excel(path):
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(columns)
+        for record in records:
+            sheet.append([record.get(column) for column in columns])
+            count += 1
+        workbook.save(path)
+        return count
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for record in records:
+            writer.writerow([record.get(column, "") for column in columns])
+            count += 1
+    return count
+
+
+def export_contacts(storage: StorageBackend, path: str) -> int:
+    """Stream all contacts to a .csv or .xlsx file; returns row count"""
+    count = _write_rows(path, CONTACT_COLUMNS, storage.iter_contacts())
+    logger.info(f"Exported {count} contacts to {path}")
+    return count
+
+
+def export_clients(storage: StorageBackend, path: str) -> int:
+    """Stream all SkyBot Pro clients to a .csv or .xlsx file; returns row count"""
+    count = _write_rows(path, CLIENT_COLUMNS, storage.iter_clients())
+    logger.info(f"Exported {count} clients to {path}")
+    return count
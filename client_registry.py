@@ -0,0 +1,222 @@
+"""
+Sky Bot - SkyBot Pro client registry
+Clients are loaded once, indexed by id, plan, status and join month, and
+revenue totals are kept up to date on every change so reports never scan
+"""
+
+import threading
+import logging
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("plan", "status", "month")
+
+
+def _month(client: Dict) -> str:
+    return (client.get("join_date") or "")[:7]
+
+
+class ClientRegistry:
+    def __init__(self, storage: StorageBackend, services: Optional[Dict[str, Dict]] = None):
+        """
+        Initialize the registry
+
+        Args:
+            storage: Backend holding the clients (assigns their ids)
+            services: Plans by name; a plan change takes its price from here
+        """
+        self.storage = storage
+        self.services = services or {}
+
+        self._lock = threading.RLock()
+        self.reload()
+
+    def reload(self):
+        """(Re)build indexes and totals from storage, e.g. after a bulk import"""
+        with self._lock:
+            self._by_id: Dict[int, Dict] = {}
+            self._ids: List[int] = []
+            self._index: Dict[str, Dict[str, Dict[int, Dict]]] = {field: {} for field in INDEXED_FIELDS}
+            self._income = 0
+            self._income_by_plan: Dict[str, int] = {}
+            self._active_by_plan: Dict[str, int] = {}
+
+            for client in self.storage.iter_clients():
+                self._add_to_indexes(client)
+
+    # Index and totals maintenance (callers hold the lock)
+
+    def _keys(self, client: Dict) -> Dict[str, str]:
+        return {"plan": client.get("plan"), "status": client.get("status"), "month": _month(client)}
+
+    def _add_to_indexes(self, client: Dict):
+        client_id = client["id"]
+        if not self._ids or client_id > self._ids[-1]:
+            self._ids.append(client_id)
+        else:
+            self._ids.insert(bisect_left(self._ids, client_id), client_id)
+        self._file(client)
+
+    def _remove_from_indexes(self, client: Dict):
+        del self._ids[bisect_left(self._ids, client["id"])]
+        self._unfile(client)
+
+    def _file(self, client: Dict):
+        """Add a client to the field indexes and revenue totals"""
+        client_id = client["id"]
+        self._by_id[client_id] = client
+        for field, key in self._keys(client).items():
+            self._index[field].setdefault(key, {})[client_id] = client
+        self._count_revenue(client, 1)
+
+    def _unfile(self, client: Dict):
+        client_id = client["id"]
+        del self._by_id[client_id]
+        for field, key in self._keys(client).items():
+            bucket = self._index[field][key]
+            del bucket[client_id]
+            if not bucket:
+                del self._index[field][key]
+        self._count_revenue(client, -1)
+
+    def _count_revenue(self, client: Dict, sign: int):
+        if client.get("status") != "active":
+            return
+        plan = client.get("plan")
+        price = client.get("price") or 0
+        self._income += sign * price
+        self._income_by_plan[plan] = self._income_by_plan.get(plan, 0) + sign * price
+        self._active_by_plan[plan] = self._active_by_plan.get(plan, 0) + sign
+
+    # Changes (written through to storage)
+
+    def add(self, client: Dict) -> Dict:
+        """Store a new client; returns it with its assigned id"""
+        return self.add_many([client])[0]
+
+    def add_many(self, clients: List[Dict]) -> List[Dict]:
+        """Store many clients as one storage batch"""
+        with self._lock:
+            added = self.storage.add_clients(clients)
+            for client in added:
+                self._add_to_indexes(dict(client))
+            return added
+
+    def update(self, client_id: int, **fields) -> bool:
+        """
+        Change a client's fields (plan, price, status, ...)
+
+        Returns:
+            bool: False if the client doesn't exist
+        """
+        with self._lock:
+            client = self._by_id.get(client_id)
+            if client is None or not self.storage.update_client(client_id, **fields):
+                return False
+            self._unfile(client)
+            self._file(dict(client, **fields))
+            return True
+
+    def change_plan(self, client_id: int, plan: str) -> bool:
+        """Move a client to another plan at that plan's price"""
+        if plan not in self.services:
+            raise ValueError(f"Unknown plan: {plan}")
+        return self.update(client_id, plan=plan, price=self.services[plan]["price"])
+
+    def remove(self, client_id: int) -> bool:
+        """Delete a client (its id is not reused)"""
+        with self._lock:
+            client = self._by_id.get(client_id)
+            if client is None or not self.storage.remove_client(client_id):
+                return False
+            self._remove_from_indexes(client)
+            return True
+
+    # Lookups
+
+    def get(self, client_id: int) -> Optional[Dict]:
+        with self._lock:
+            client = self._by_id.get(client_id)
+            return dict(client) if client else None
+
+    def all(self) -> List[Dict]:
+        """All clients in id order"""
+        with self._lock:
+            return [dict(self._by_id[client_id]) for client_id in self._ids]
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def _matching(self, filters: Dict[str, str]):
+        """Ids of clients matching every filter, in id order, from the smallest index bucket"""
+        filters = {field: key for field, key in filters.items() if key is not None}
+        if not filters:
+            return self._ids, len(self._ids)
+
+        buckets = [self._index[field].get(key, {}) for field, key in filters.items()]
+        smallest = min(buckets, key=len)
+        # Buckets are nearly in id order (an update moves a client to the end), so this sort is cheap
+        ids = sorted(client_id for client_id in smallest if all(client_id in bucket for bucket in buckets))
+        return ids, len(ids)
+
+    def count(self, plan: Optional[str] = None, status: Optional[str] = None,
+              month: Optional[str] = None) -> int:
+        """Number of clients matching the filters (month is "YYYY-MM")"""
+        with self._lock:
+            filters = {"plan": plan, "status": status, "month": month}
+            given = [(field, key) for field, key in filters.items() if key is not None]
+            if not given:
+                return len(self._by_id)
+            if len(given) == 1:
+                field, key = given[0]
+                return len(self._index[field].get(key, {}))
+            return self._matching(filters)[1]
+
+    def page(self, page: int = 1, page_size: int = 20, plan: Optional[str] = None,
+             status: Optional[str] = None, month: Optional[str] = None) -> Dict:
+        """
+        One page of clients in id order
+
+        Args:
+            page: 1-based page number
+            page_size: Clients per page
+            plan, status, month: Optional filters (month is "YYYY-MM")
+
+        Returns:
+            {"clients": [...], "page": ..., "pages": ..., "total": ...}
+        """
+        page = max(1, page)
+        with self._lock:
+            ids, total = self._matching({"plan": plan, "status": status, "month": month})
+            start = (page - 1) * page_size
+            clients = [dict(self._by_id[client_id]) for client_id in ids[start:start + page_size]]
+        return {
+            "clients": clients,
+            "page": page,
+            "pages": max(1, -(-total // page_size)),
+            "total": total
+        }
+
+    def months(self) -> Dict[str, int]:
+        """Clients joined per month ("YYYY-MM" -> count)"""
+        with self._lock:
+            return {month: len(bucket) for month, bucket in sorted(self._index["month"].items())}
+
+    # Revenue (running totals, O(1))
+
+    def monthly_income(self) -> int:
+        """Sum of prices over active clients"""
+        return self._income
+
+    def income_by_plan(self) -> Dict[str, Dict[str, int]]:
+        """Active clients and monthly income per plan"""
+        with self._lock:
+            return {
+                plan: {"clients": self._active_by_plan.get(plan, 0), "income": income}
+                for plan, income in self._income_by_plan.items()
+                if self._active_by_plan.get(plan, 0)
+            }
@@ -0,0 +1,156 @@
+"""
+Sky Bot - In-memory contact store
+Contacts are loaded once, indexed by phone and group, and written back lazily
+"""
+
+import atexit
+import json
+import os
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ContactStore:
+    def __init__(self, contacts_file: str, normalize: Optional[Callable[[str], str]] = None,
+                 flush_delay: float = 1.0):
+        """
+        Initialize the store
+
+        Args:
+            contacts_file: JSON array file backing the store
+            normalize: Maps a phone number to its index key (defaults to as-is)
+            flush_delay: Seconds to wait for more changes before writing the file
+        """
+        self.contacts_file = contacts_file
+        self.normalize = normalize or (lambda phone: phone)
+        self.flush_delay = flush_delay
+
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._mtime = None
+
+        self._contacts: List[Dict] = []
+        self._by_phone: Dict[str, Dict] = {}
+        self._by_group: Dict[str, Dict[str, Dict]] = {}
+
+        self._load()
+
+        # Don't lose a pending write-behind when the process exits
+        atexit.register(self.flush)
+
+    def _index(self, contact: Dict):
+        key = self.normalize(contact["phone"])
+        self._by_phone[key] = contact
+        self._by_group.setdefault(contact.get("group", "general"), {})[key] = contact
+
+    def _load(self):
+        """(Re)build the indexes from the file on disk"""
+        self._contacts = []
+        self._by_phone = {}
+        self._by_group = {}
+
+        if os.path.exists(self.contacts_file):
+            with open(self.contacts_file, "r") as f:
+                self._contacts = json.load(f)
+            self._mtime = os.path.getmtime(self.contacts_file)
+        else:
+            self._mtime = None
+
+        for contact in self._contacts:
+            self._index(contact)
+
+    def _refresh(self):
+        """Pick up edits made to the file by someone else"""
+        try:
+            mtime = os.path.getmtime(self.contacts_file)
+        except OSError:
+            return
+
+        if mtime == self._mtime:
+            return
+
+        if self._dirty:
+            # Our pending write wins; it will overwrite the external change
+            logger.warning(f"{self.contacts_file} changed on disk while unsaved contacts are pending")
+            return
+
+        logger.info(f"Reloading {self.contacts_file} (changed on disk)")
+        self._load()
+
+    def _schedule_flush(self):
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending changes now (atomic replace of the contacts file)"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if not self._dirty:
+                return
+
+            tmp_file = self.contacts_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(self._contacts, f, indent=4)
+            os.replace(tmp_file, self.contacts_file)
+
+            self._mtime = os.path.getmtime(self.contacts_file)
+            self._dirty = False
+
+    def close(self):
+        """Flush pending changes and stop the write-behind timer"""
+        self.flush()
+
+    def add(self, contact: Dict) -> bool:
+        """
+        Add a contact unless its phone is already known
+
+        Args:
+            contact: Contact record with at least "phone"
+
+        Returns:
+            bool: False if the phone already exists
+        """
+        with self._lock:
+            self._refresh()
+
+            if self.normalize(contact["phone"]) in self._by_phone:
+                return False
+
+            self._contacts.append(contact)
+            self._index(contact)
+            self._schedule_flush()
+            return True
+
+    def get(self, phone_number: str) -> Optional[Dict]:
+        """Look a contact up by phone number"""
+        with self._lock:
+            self._refresh()
+            return self._by_phone.get(self.normalize(phone_number))
+
+    def by_group(self, group: str) -> List[Dict]:
+        """All contacts in a group"""
+        with self._lock:
+            self._refresh()
+            return list(self._by_group.get(group, {}).values())
+
+    def all(self) -> List[Dict]:
+        """All contacts in insertion order"""
+        with self._lock:
+            self._refresh()
+            return list(self._contacts)
+
+    def count(self) -> int:
+        """Number of contacts"""
+        with self._lock:
+            self._refresh()
+            return len(self._contacts)
@@ -0,0 +1,136 @@
+"""
+Sky Bot - Broadcast dispatch engine
+Rate-limited concurrent sending with per-recipient retries
+"""
+
+import random
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Token bucket rate limiter
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        Take `tokens` if available without blocking
+
+        Returns:
+            0 if the tokens were taken, otherwise seconds to wait before retrying
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1):
+        """Block until `tokens` are available and take them"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class BroadcastDispatcher:
+    def __init__(self, send: Callable[[str, str], bool], rate: float = 0.2, burst: float = 1,
+                 workers: int = 1, max_retries: int = 2, backoff_base: float = 2.0,
+                 backoff_max: float = 60.0):
+        """
+        Initialize the dispatcher
+
+        Args:
+            send: Sends one message, send(phone, message) -> bool
+            rate: Messages per second across all workers
+            burst: Messages that may go out back-to-back before the rate applies
+            workers: Concurrent senders
+            max_retries: Extra attempts per recipient after a failure
+            backoff_base: First retry delay in seconds, doubled on each retry
+            backoff_max: Upper bound for a single retry delay
+        """
+        self.send = send
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def retry_delay(self, attempt: int) -> float:
+        """Jittered exponential backoff before retry number `attempt` (1-based)"""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _send_with_retry(self, phone: str, message: str, send: Callable[[str, str], bool]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay(attempt))
+                logger.info(f"Retrying {phone} (attempt {attempt + 1})")
+
+            self.bucket.acquire()
+            try:
+                if send(phone, message):
+                    return True
+            except Exception as e:
+                logger.error(f"Send to {phone} raised: {str(e)}")
+
+        return False
+
+    def dispatch(self, phone_numbers: List[str], message: Union[str, Callable[[str], str]],
+                 progress: Optional[Callable[[int, int, str, bool], None]] = None,
+                 send: Optional[Callable[[str, str], bool]] = None) -> Dict[str, bool]:
+        """
+        Send a message to many recipients
+
+        Args:
+            phone_numbers: Recipients (duplicates are sent once)
+            message: Message to send, or message(phone) -> text for personalized sends
+            progress: Called as progress(done, total, phone, success) after each recipient
+            send: Sends one message for this dispatch only (default: the dispatcher's send)
+
+        Returns:
+            Dict with results for each number, in input order
+        """
+        recipients = list(dict.fromkeys(phone_numbers))
+        results = dict.fromkeys(recipients, False)
+        total = len(recipients)
+        done = 0
+        lock = threading.Lock()
+
+        def deliver(phone: str):
+            nonlocal done
+            text = message(phone) if callable(message) else message
+            success = self._send_with_retry(phone, text, send or self.send)
+            with lock:
+                results[phone] = success
+                done += 1
+                if progress:
+                    progress(done, total, phone, success)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            for future in [pool.submit(deliver, phone) for phone in recipients]:
+                future.result()
+
+        return results
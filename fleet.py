@@ -0,0 +1,226 @@
+"""
+Sky Bot - Broadcast worker fleet
+Shards a broadcast's recipients by phone hash across worker processes; each
+worker owns its own transport session and renders, sends and logs its shard
+"""
+
+import multiprocessing
+import os
+import queue
+import uuid
+import zlib
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dispatch import BroadcastDispatcher
+from templates import compile_template
+from transport import create_transport
+
+logger = logging.getLogger(__name__)
+
+Recipient = Tuple[str, Optional[Dict]]
+
+
+def shard_for(phone: str, shards: int) -> int:
+    """Stable shard of a formatted number (the same in every process and run)"""
+    return zlib.crc32(phone.encode()) % shards
+
+
+def _deliver_shard(transport, task: Dict, results: "multiprocessing.Queue") -> Dict:
+    """Send one shard in a worker; progress is reported as it goes"""
+    template = compile_template(task["message"])
+    records = dict(task["recipients"])
+    log_entries = []
+
+    def render(phone: str) -> str:
+        return template.render(records[phone])
+
+    def send(phone: str, text: str) -> bool:
+        # Every attempt is logged, as send_instant_message does for inline broadcasts
+        try:
+            transport.send_text(phone, text)
+            status = "sent"
+        except Exception:
+            status = "failed"
+            raise
+        finally:
+            log_entries.append({
+                "timestamp": datetime.now().isoformat(),
+                "phone": phone,
+                "message": text,
+                "type": "instant",
+                "status": status
+            })
+        return True
+
+    def progress(done: int, total: int, phone: str, success: bool):
+        if task["report_progress"]:
+            results.put(("progress", task["broadcast"], task["shard"], phone, success))
+
+    dispatcher = BroadcastDispatcher(
+        send,
+        rate=task["rate"],
+        burst=task["burst"],
+        workers=4 if transport.concurrent else 1,
+        max_retries=task["max_retries"]
+    )
+    sent = dispatcher.dispatch(
+        list(records),
+        task["message"] if template.is_static else render,
+        progress
+    )
+    return {"shard": task["shard"], "results": sent, "log": log_entries}
+
+
+def _worker_main(index: int, kind: str, options: Dict, tasks: "multiprocessing.Queue",
+                 results: "multiprocessing.Queue"):
+    """Worker process: open one transport session and serve shards until told to stop"""
+    transport = create_transport(kind, **options)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            try:
+                results.put(("done", task["broadcast"], index, _deliver_shard(transport, task, results)))
+            except Exception as e:
+                results.put(("error", task["broadcast"], index, str(e)))
+    finally:
+        transport.close()
+
+
+class BroadcastFleet:
+    def __init__(self, workers: Optional[int] = None, transport: str = "mock",
+                 transport_options: Optional[Dict] = None, rate: float = 0.2, burst: float = 1,
+                 max_retries: int = 2):
+        """
+        Start the worker processes
+
+        Args:
+            workers: Worker processes (default: CPU count)
+            transport: Transport kind each worker opens ("web" gets a browser
+                profile per worker: profile_dir + "_<n>", each logged in once)
+            transport_options: Passed to create_transport in every worker
+            rate: Messages per second for the whole fleet, split evenly across workers
+            burst: Back-to-back messages allowed for the whole fleet
+            max_retries: Extra attempts per recipient after a failure
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.transport = transport
+        self.transport_options = dict(transport_options or {})
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+
+        # spawn, not fork: the parent runs outbox/scheduler threads
+        self._context = multiprocessing.get_context("spawn")
+        self._results = self._context.Queue()
+        self._processes: List = [None] * self.workers
+        self._tasks: List = [None] * self.workers
+        for index in range(self.workers):
+            self._start_worker(index)
+
+    def _start_worker(self, index: int):
+        options = dict(self.transport_options)
+        if self.transport == "web":
+            options["profile_dir"] = f"{options.get('profile_dir', 'whatsapp_session')}_{index}"
+
+        self._tasks[index] = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self.transport, options, self._tasks[index], self._results),
+            name=f"sky-fleet-{index}",
+            daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+
+    def broadcast(self, recipients: List[Recipient], message: str,
+                  progress: Optional[Callable[[int, int, str, bool], None]] = None,
+                  log: Optional[Callable[[List[Dict]], None]] = None) -> Dict[str, bool]:
+        """
+        Deliver a broadcast across the fleet
+
+        Args:
+            recipients: (formatted number, contact record or None) pairs
+            message: Text or template ({name} etc. filled from the record)
+            progress: Called as progress(done, total, phone, success) after each recipient
+            log: Receives each worker's message log entries as one batch
+                (e.g. storage.log_messages)
+
+        Returns:
+            Dict with results for each number, in input order
+        """
+        records = dict(recipients)
+        results = dict.fromkeys(records, False)
+        # Events are tagged with this id; leftovers of an earlier broadcast are dropped
+        broadcast_id = uuid.uuid4().hex
+        shards: List[List[Recipient]] = [[] for _ in range(self.workers)]
+        for phone, record in records.items():
+            shards[shard_for(phone, self.workers)].append((phone, record))
+
+        pending = set()
+        for index, shard in enumerate(shards):
+            if not shard:
+                continue
+            if not self._processes[index].is_alive():
+                logger.warning(f"Fleet worker {index} died; restarting")
+                self._start_worker(index)
+            self._tasks[index].put({
+                "broadcast": broadcast_id,
+                "shard": index,
+                "message": message,
+                "recipients": shard,
+                "rate": self.rate / self.workers,
+                "burst": max(1, self.burst / self.workers),
+                "max_retries": self.max_retries,
+                "report_progress": progress is not None
+            })
+            pending.add(index)
+
+        done = 0
+        total = len(results)
+        while pending:
+            try:
+                event = self._results.get(timeout=1.0)
+            except queue.Empty:
+                for index in list(pending):
+                    if not self._processes[index].is_alive():
+                        logger.error(f"Fleet worker {index} died mid-broadcast; its shard is marked failed")
+                        pending.discard(index)
+                continue
+
+            kind, event_broadcast, index = event[:3]
+            if event_broadcast != broadcast_id:
+                continue
+
+            if kind == "progress":
+                _, _, _, phone, success = event
+                done += 1
+                if progress:
+                    progress(done, total, phone, success)
+            elif kind == "done":
+                shard = event[3]
+                results.update(shard["results"])
+                if log and shard["log"]:
+                    log(shard["log"])
+                pending.discard(index)
+            else:
+                logger.error(f"Fleet worker {index} failed: {event[3]}")
+                pending.discard(index)
+
+        sent = sum(results.values())
+        logger.info(f"Fleet broadcast: {sent}/{total} sent over {len([s for s in shards if s])} workers")
+        return results
+
+    def close(self):
+        """Stop the workers and close their sessions"""
+        for index, process in enumerate(self._processes):
+            if process is not None and process.is_alive():
+                self._tasks[index].put(None)
+        for process in self._processes:
+            if process is not None:
+                process.join(10)
+                if process.is_alive():
+                    process.terminate()
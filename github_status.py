@@ -0,0 +1,127 @@
+"""
+Sky Bot - GitHub repository status checker
+Cached, ETag-revalidated and refreshed in the background so status reports
+never wait on the network
+"""
+
+import threading
+import time
+import logging
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+# One pooled session shared by every checker in the process
+_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """Shared keep-alive session for GitHub API calls (requests is imported here, on first use)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+            _session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+            _session.headers.update({
+                "Accept": "application/vnd.github+json",
+                "User-Agent": "Sky_b.o.t",
+            })
+        return _session
+
+
+class GitHubStatusChecker:
+    def __init__(self, api_url: str = "https://api.github.com/repos/Sky95360/Sky_b.o.t",
+                 ttl: float = 300.0, timeout: float = 5.0):
+        """
+        Initialize the checker
+
+        Args:
+            api_url: Repository API URL (point at a local stub server in tests)
+            ttl: Seconds a fetched status counts as fresh
+            timeout: Connect/read timeout for the HTTP request
+        """
+        self.api_url = api_url
+        self.ttl = ttl
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._data: Optional[Dict] = None
+        self._etag: Optional[str] = None
+        self._fetched_at = 0.0
+        self._retry_after = 0.0
+        self._error: Optional[str] = None
+
+    def refresh(self):
+        """Fetch now, revalidating with If-None-Match when we have an ETag"""
+        headers = {"If-None-Match": self._etag} if self._etag else {}
+        try:
+            response = get_session().get(self.api_url, headers=headers, timeout=self.timeout)
+
+            with self._lock:
+                if response.status_code == 304:
+                    self._fetched_at = time.monotonic()
+                    self._error = None
+                elif response.status_code == 200:
+                    self._data = response.json()
+                    self._etag = response.headers.get("ETag")
+                    self._fetched_at = time.monotonic()
+                    self._error = None
+                else:
+                    self._error = "Cannot access repository"
+                    # Rate limited: hold off until GitHub's reset time
+                    if response.headers.get("X-RateLimit-Remaining") == "0":
+                        reset = float(response.headers.get("X-RateLimit-Reset", 0))
+                        self._retry_after = time.monotonic() + max(0.0, reset - time.time())
+
+        except Exception as e:
+            with self._lock:
+                self._error = f"Error: {str(e)}"
+
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing or time.monotonic() < self._retry_after:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="github-status", daemon=True).start()
+
+    def format_status(self) -> str:
+        """Status text from whatever is cached"""
+        with self._lock:
+            data, error = self._data, self._error
+
+        if data is not None:
+            return (f"GitHub Status: ✅ Online\nRepository: {data['full_name']}\n"
+                    f"Stars: {data['stargazers_count']}\nLast Updated: {data['updated_at']}")
+        if error:
+            return f"GitHub Status: ❌ {error}"
+        return "GitHub Status: ⏳ Checking..."
+
+    def status(self, block: bool = False) -> str:
+        """
+        Current status text
+
+        Fresh cache is returned as is. Stale cache is returned immediately
+        while a background refresh runs (stale-while-revalidate).
+
+        Args:
+            block: With no fresh data, wait for the refresh (bounded by timeout)
+        """
+        if time.monotonic() - self._fetched_at >= self.ttl:
+            if block and time.monotonic() >= self._retry_after:
+                self.refresh()
+            else:
+                self._refresh_in_background()
+        return self.format_status()
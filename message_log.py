@@ -0,0 +1,262 @@
+"""
+Sky Bot - Append-only message log
+Writes one JSON record per line into segment files that rotate by day and size
+"""
+
+import json
+import os
+import time
+import threading
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MessageLog:
+    def __init__(self, log_dir: str = "message_log", max_segment_bytes: int = 16 * 1024 * 1024,
+                 fsync_every: int = 32, fsync_interval: float = 1.0):
+        """
+        Initialize the message log
+
+        Args:
+            log_dir: Directory holding the .jsonl segment files
+            max_segment_bytes: Start a new segment once the current one reaches this size
+            fsync_every: Force data to disk after this many appends
+            fsync_interval: ...or when this many seconds passed since the last fsync
+        """
+        self.log_dir = log_dir
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.RLock()
+        self._file = None
+        self._segment_path = None
+        self._segment_day = None
+        self._segment_size = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._listeners: List[Callable[[Dict, Tuple[str, int]], None]] = []
+
+        os.makedirs(self.log_dir, exist_ok=True)
+
+    def _segment_name(self, day: str, seq: int) -> str:
+        return os.path.join(self.log_dir, f"{day}-{seq:04d}.jsonl")
+
+    def _open_segment(self, day: str, incoming: int):
+        """Return the open segment for `day`, rotating when the day changes or it is full"""
+        if self._file is not None and self._segment_day == day:
+            if self._segment_size + incoming <= self.max_segment_bytes or self._segment_size == 0:
+                return self._file
+
+        self._close_segment()
+
+        existing = self.segments(day)
+        if existing:
+            seq = int(os.path.basename(existing[-1])[11:15])
+            size = os.path.getsize(existing[-1])
+            if size and size + incoming > self.max_segment_bytes:
+                seq += 1
+        else:
+            seq = 0
+
+        self._segment_path = self._segment_name(day, seq)
+        self._segment_day = day
+        self._file = open(self._segment_path, "ab")
+        self._segment_size = self._file.tell()
+        return self._file
+
+    def _sync(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+        self._file = None
+        self._segment_path = None
+        self._segment_day = None
+        self._segment_size = 0
+
+    def append(self, entry: Dict):
+        """
+        Append one record to the log
+
+        Args:
+            entry: Log record; its "timestamp" decides which day segment it lands in
+        """
+        data = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        day = str(entry.get("timestamp", ""))[:10] or datetime.now().strftime("%Y-%m-%d")
+
+        with self._lock:
+            f = self._open_segment(day, len(data))
+            f.write(data)
+            self._segment_size += len(data)
+            self._unsynced += 1
+
+            position = (os.path.basename(self._segment_path), self._segment_size)
+            for listener in self._listeners:
+                listener(entry, position)
+
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def add_listener(self, listener: Callable[[Dict, Tuple[str, int]], None]):
+        """
+        Call `listener(entry, position)` after every append
+
+        `position` is (segment name, byte offset just past the record) and can
+        be handed back to iter_from() to resume reading after that record.
+        """
+        self._listeners.append(listener)
+
+    def hold(self) -> threading.RLock:
+        """Lock that blocks appends while a caller needs a stable view of the log"""
+        return self._lock
+
+    def flush(self):
+        """Force buffered records to disk"""
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        """Flush and close the current segment"""
+        with self._lock:
+            self._close_segment()
+
+    def segments(self, day: Optional[str] = None) -> List[str]:
+        """
+        List segment files in chronological order
+
+        Args:
+            day: Only return segments for this day (YYYY-MM-DD)
+        """
+        prefix = f"{day}-" if day else ""
+        names = [
+            name for name in os.listdir(self.log_dir)
+            if name.endswith(".jsonl") and name.startswith(prefix)
+        ]
+        return [os.path.join(self.log_dir, name) for name in sorted(names)]
+
+    def iter_records(self, day: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream records from the log
+
+        Args:
+            day: Only read segments for this day (YYYY-MM-DD)
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+        for path in self.segments(day):
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-write
+                        logger.warning(f"Skipping unreadable record in {path}")
+
+    def iter_from(self, position: Optional[Tuple[str, int]] = None) -> Iterator[Tuple[Dict, Tuple[str, int]]]:
+        """
+        Stream (record, position) pairs written after `position`
+
+        Args:
+            position: (segment name, byte offset) as passed to listeners;
+                None reads the whole log
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+        start_name, start_offset = position or ("", 0)
+
+        for path in self.segments():
+            name = os.path.basename(path)
+            if name < start_name:
+                continue
+
+            with open(path, "rb") as f:
+                if name == start_name:
+                    f.seek(start_offset)
+                offset = f.tell()
+                for line in f:
+                    offset += len(line)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping unreadable record in {path}")
+                        continue
+                    yield record, (name, offset)
+
+
+    def iter_after(self, offsets: Dict[str, int]) -> Iterator[Tuple[Dict, Tuple[str, int]]]:
+        """
+        Stream (record, position) pairs not yet covered by per-segment offsets
+
+        Records land in the segment of their own day, so an older-day record
+        can follow a newer one; a single position cannot describe what was
+        read, a high-water mark per segment can.
+
+        Args:
+            offsets: Segment name -> byte offset already read (missing: read all)
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+        for path in self.segments():
+            name = os.path.basename(path)
+            with open(path, "rb") as f:
+                f.seek(offsets.get(name, 0))
+                offset = f.tell()
+                for line in f:
+                    offset += len(line)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping unreadable record in {path}")
+                        continue
+                    yield record, (name, offset)
+
+
+def migrate_json_log(json_file: str, log: MessageLog) -> int:
+    """
+    One-time migration of the old JSON array log into a MessageLog
+
+    The original file is renamed to <json_file>.migrated afterwards, so this
+    is a no-op on every later start.
+
+    Args:
+        json_file: Path of the legacy message_log.json
+        log: Destination log
+
+    Returns:
+        Number of migrated records
+    """
+    if not os.path.exists(json_file):
+        return 0
+
+    try:
+        with open(json_file, "r") as f:
+            entries = json.load(f)
+    except ValueError as e:
+        logger.error(f"Cannot migrate {json_file}: {str(e)}")
+        return 0
+
+    for entry in entries:
+        log.append(entry)
+    log.flush()
+
+    os.replace(json_file, json_file + ".migrated")
+    logger.info(f"Migrated {len(entries)} records from {json_file} to {log.log_dir}/")
+    return len(entries)
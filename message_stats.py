@@ -0,0 +1,236 @@
+"""
+Sky Bot - Daily message counters
+Kept up to date from MessageLog appends so status reports never scan history.
+Checkpoints append the days that changed to a delta file; the full snapshot
+is only rewritten when the deltas are compacted.
+"""
+
+import json
+import os
+import threading
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from message_log import MessageLog
+
+logger = logging.getLogger(__name__)
+
+
+class MessageStats:
+    def __init__(self, log: MessageLog, snapshot_file: str = "message_stats.json",
+                 checkpoint_every: int = 100, compact_every: int = 100):
+        """
+        Initialize counters and attach them to the log
+
+        The snapshot remembers how far each log segment was counted, so
+        startup only replays records appended after the last checkpoint.
+
+        Args:
+            log: Message log to follow
+            snapshot_file: Where counters are checkpointed
+            checkpoint_every: Checkpoint the changed days after this many new records
+            compact_every: Fold the delta file into the snapshot after this many checkpoints
+        """
+        self.log = log
+        self.snapshot_file = snapshot_file
+        self.delta_file = snapshot_file + ".delta"
+        self.checkpoint_every = checkpoint_every
+        self.compact_every = compact_every
+
+        self._lock = threading.Lock()
+        self._since_checkpoint = 0
+        # Deltas only apply to the snapshot generation they were written after
+        self._generation = 0
+        self._deltas = 0
+        self._reset()
+
+        self._load_snapshot()
+        self._catch_up()
+        self.log.add_listener(self._on_append)
+
+    def _reset(self):
+        self.by_day: Dict[str, int] = defaultdict(int)
+        self.by_phone: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.by_type: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.by_status: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        # Segment name -> byte offset counted so far (records of an older day
+        # can be appended after newer ones, so one position is not enough)
+        self.offsets: Dict[str, int] = {}
+        self._changed_days: Set[str] = set()
+        self._changed_segments: Set[str] = set()
+
+    def _record(self, entry: Dict, position: Tuple[str, int]):
+        day = str(entry.get("timestamp", ""))[:10]
+        self.by_day[day] += 1
+        self.by_phone[day][entry.get("phone", "")] += 1
+        self.by_type[day][entry.get("type", "")] += 1
+        self.by_status[day][entry.get("status", "")] += 1
+        name, offset = position
+        if offset > self.offsets.get(name, 0):
+            self.offsets[name] = offset
+            self._changed_segments.add(name)
+        self._changed_days.add(day)
+
+    def _on_append(self, entry: Dict, position: Tuple[str, int]):
+        with self._lock:
+            self._record(entry, position)
+            self._since_checkpoint += 1
+            if self._since_checkpoint >= self.checkpoint_every:
+                self._write_delta()
+
+    def _catch_up(self):
+        """Replay log records written after the snapshot offsets"""
+        replayed = 0
+        for entry, position in self.log.iter_after(self.offsets):
+            self._record(entry, position)
+            replayed += 1
+
+        if replayed:
+            logger.info(f"Replayed {replayed} log records into message stats")
+            self._write_snapshot()
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_file):
+            return
+
+        try:
+            with open(self.snapshot_file, "r") as f:
+                data = json.load(f)
+            if "by_status" not in data:
+                # Written before status counts existed: recount from the log
+                logger.info(f"Rebuilding {self.snapshot_file} with per-status counts")
+                return
+
+            self._load_days(data)
+            self._generation = data.get("generation", 0)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable {self.snapshot_file}: {str(e)}")
+            self._reset()
+            return
+
+        self._load_deltas()
+
+    def _load_days(self, data: Dict):
+        """Replace the counters of every day in a snapshot or delta"""
+        for day, count in data["by_day"].items():
+            self.by_day[day] = count
+            self.by_phone.pop(day, None)
+            self.by_type.pop(day, None)
+            self.by_status.pop(day, None)
+        for day, counts in data["by_phone"].items():
+            self.by_phone[day].update(counts)
+        for day, counts in data["by_type"].items():
+            self.by_type[day].update(counts)
+        for day, counts in data["by_status"].items():
+            self.by_status[day].update(counts)
+        if "offsets" in data:
+            self.offsets.update(data["offsets"])
+        elif data.get("position"):
+            # Older snapshots: everything up to one (segment, offset) position
+            start_name, start_offset = data["position"]
+            for path in self.log.segments():
+                name = os.path.basename(path)
+                if name < start_name:
+                    self.offsets[name] = os.path.getsize(path)
+            self.offsets[start_name] = start_offset
+
+    def _load_deltas(self):
+        if not os.path.exists(self.delta_file):
+            return
+
+        with open(self.delta_file, "r") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    # Torn last line of an interrupted checkpoint: the log replay covers
+                    # it, and the next checkpoint compacts instead of appending after it
+                    self._deltas = self.compact_every
+                    break
+                if data.get("generation") == self._generation:
+                    self._load_days(data)
+                    self._deltas += 1
+
+    def _days(self, days, segments) -> Dict:
+        return {
+            "offsets": {name: self.offsets[name] for name in segments},
+            "by_day": {day: self.by_day[day] for day in days},
+            "by_phone": {day: self.by_phone[day] for day in days if day in self.by_phone},
+            "by_type": {day: self.by_type[day] for day in days if day in self.by_type},
+            "by_status": {day: self.by_status[day] for day in days if day in self.by_status},
+        }
+
+    def _write_delta(self):
+        """Append the days changed since the last checkpoint"""
+        if not self._changed_days:
+            return
+        if self._deltas >= self.compact_every:
+            self._write_snapshot()
+            return
+
+        data = self._days(sorted(self._changed_days), sorted(self._changed_segments))
+        data["generation"] = self._generation
+        with open(self.delta_file, "a") as f:
+            f.write(json.dumps(data) + "\n")
+        self._deltas += 1
+        self._changed_days = set()
+        self._changed_segments = set()
+        self._since_checkpoint = 0
+
+    def _write_snapshot(self):
+        """Rewrite the full snapshot and start a new, empty delta file"""
+        data = self._days(list(self.by_day), list(self.offsets))
+        data["generation"] = self._generation + 1
+
+        tmp_file = self.snapshot_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, self.snapshot_file)
+        # Deltas of the old generation are ignored from here even if this truncate never happens
+        self._generation += 1
+        open(self.delta_file, "w").close()
+        self._deltas = 0
+        self._changed_days = set()
+        self._changed_segments = set()
+        self._since_checkpoint = 0
+
+    def checkpoint(self):
+        """Write the changed days now"""
+        with self._lock:
+            self._write_delta()
+
+    def rebuild(self):
+        """Drop all counters and recount from the raw log"""
+        with self.log.hold(), self._lock:
+            self._reset()
+            self._catch_up()
+            self._write_snapshot()
+
+    @staticmethod
+    def _day(day: Optional[str]) -> str:
+        return day or datetime.now().strftime("%Y-%m-%d")
+
+    def count(self, day: Optional[str] = None, status: Optional[str] = None) -> int:
+        """
+        Messages logged on a day
+
+        Args:
+            day: YYYY-MM-DD, defaults to today
+            status: Only entries with this status ("sent", "failed", ...)
+        """
+        if status is not None:
+            counts = self.by_status.get(self._day(day))
+            return counts.get(status, 0) if counts else 0
+        return self.by_day.get(self._day(day), 0)
+
+    def count_for_phone(self, phone: str, day: Optional[str] = None) -> int:
+        """Messages logged to one recipient on a day (default today)"""
+        counts = self.by_phone.get(self._day(day))
+        return counts.get(phone, 0) if counts else 0
+
+    def count_for_type(self, msg_type: str, day: Optional[str] = None) -> int:
+        """Messages of one type ("instant", ...) logged on a day (default today)"""
+        counts = self.by_type.get(self._day(day))
+        return counts.get(msg_type, 0) if counts else 0
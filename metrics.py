@@ -0,0 +1,285 @@
+"""
+Sky Bot - Metrics and tracing
+Counters, latency histograms and per-stage spans, exported in Prometheus
+text format. Disabled by default (set SKYBOT_METRICS=1 or call enable());
+while disabled every call returns immediately.
+"""
+
+import os
+import threading
+import time
+import logging
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers in-memory stages (sub-millisecond) up to browser sends
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0)
+
+_enabled = os.environ.get("SKYBOT_METRICS", "") not in ("", "0")
+_registry: Dict[str, "_Metric"] = {}
+_registry_lock = threading.Lock()
+
+# Most recent finished spans, for tracing a slow send
+_traces: deque = deque(maxlen=1000)
+_local = threading.local()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _escape(value: str) -> str:
+    """Label value escaping required by the exposition format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Exact sample value (":g" would round counters past 1M to 6 digits)"""
+    if isinstance(value, int):
+        return str(value)
+    # Shortest string that round-trips; never drops digits
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _key(self, values: Dict) -> Tuple:
+        return tuple(str(values.get(label, "")) for label in self.labels)
+
+    def _label_text(self, key: Tuple, extra: str = "") -> str:
+        pairs = [f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if not _enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            return [(self.name + self._label_text(key), value) for key, value in self._values.items()]
+
+    def values(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        # Per label set: [bucket counts..., +Inf count], sum, count
+        self._values: Dict[Tuple, List] = {}
+
+    def observe(self, value: float, **labels):
+        if not _enabled:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> List[Tuple[str, float]]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                running = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    running += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append((f"{self.name}_bucket" + self._label_text(key, f'le="{le}"'), running))
+                lines.append((f"{self.name}_sum" + self._label_text(key), total))
+                lines.append((f"{self.name}_count" + self._label_text(key), count))
+        return lines
+
+    def summary(self) -> Dict[Tuple, Dict[str, float]]:
+        """count, mean and bucket-estimated p50/p99 per label set"""
+        result = {}
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        for key, counts, total, count in items:
+            if not count:
+                continue
+            result[key] = {
+                "count": count,
+                "mean": total / count,
+                "p50": self._quantile(counts, count, 0.5),
+                "p99": self._quantile(counts, count, 0.99),
+            }
+        return result
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> float:
+        target = q * count
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            if running >= target:
+                return bound if bound != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+    """Get or create a counter"""
+    return _register(Counter(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: Tuple[str, ...] = (),
+              buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """Get or create a histogram"""
+    return _register(Histogram(name, help_text, labels, buckets))
+
+
+STAGE_SECONDS = histogram("skybot_stage_seconds", "Time spent per send stage", ("stage",))
+
+
+class _Span:
+    __slots__ = ("stage", "labels", "start", "parent")
+
+    def __init__(self, stage: str, labels: Dict):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].stage if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        _local.stack.pop()
+        STAGE_SECONDS.observe(elapsed, stage=self.stage)
+        _traces.append({
+            "stage": self.stage,
+            "parent": self.parent,
+            "seconds": elapsed,
+            "error": exc_type.__name__ if exc_type else None,
+            **self.labels
+        })
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(stage: str, **labels):
+    """
+    Time a stage of the send path
+
+        with metrics.span("transport"):
+            transport.send_text(...)
+
+    Durations go to skybot_stage_seconds{stage=...} and the recent-trace
+    buffer; nested spans record their parent stage.
+    """
+    if not _enabled:
+        return _NO_SPAN
+    return _Span(stage, labels)
+
+
+def recent_traces(limit: int = 100) -> List[Dict]:
+    """Most recent finished spans, newest last"""
+    return list(_traces)[-limit:]
+
+
+def render_prometheus() -> str:
+    """All metrics in Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+
+    lines = []
+    for metric in metrics:
+        samples = metric.samples()
+        if not samples:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(f"{name} {_number(value)}" for name, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+def dump(path: str):
+    """Write the Prometheus text to a file (for node_exporter's textfile collector)"""
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_file, path)
+
+
+def stage_summary() -> Dict[str, Dict[str, float]]:
+    """Per-stage count, mean and p50/p99 seconds"""
+    return {key[0]: stats for key, stats in STAGE_SECONDS.summary().items()}
+
+
+def reset():
+    """Clear all recorded values (metrics stay registered)"""
+    with _registry_lock:
+        for metric in _registry.values():
+            with metric._lock:
+                metric._values.clear()
+    _traces.clear()
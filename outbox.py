@@ -0,0 +1,311 @@
+"""
+Sky Bot - Durable outbound message queue
+Messages are written to SQLite before sending and move through
+pending -> in_flight -> sent / failed, so a crash never loses track of a send.
+Delivery is at-least-once: a message whose send started but was never
+recorded is sent again after a restart unless resend_unconfirmed is off.
+"""
+
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+SENT = "sent"
+FAILED = "failed"
+
+
+class DeferDelivery(Exception):
+    """Raised by a deliver callback to put a message back without using an attempt"""
+
+    def __init__(self, until: float, reason: str = ""):
+        super().__init__(reason)
+        self.until = until
+        self.reason = reason
+
+
+class Outbox:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY,
+            dedupe_key TEXT UNIQUE,
+            phone TEXT NOT NULL,
+            message TEXT,
+            kind TEXT NOT NULL DEFAULT 'text',
+            attachment TEXT,
+            client_id TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            sending_at TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+    """
+
+    def __init__(self, db_file: str = "outbox.db", max_attempts: int = 3, retry_delay: float = 30.0,
+                 recover: bool = True, resend_unconfirmed: bool = True, poll_interval: float = 1.0):
+        """
+        Open (or create) the outbox
+
+        Messages left in_flight by a previous run are put back to pending,
+        so they are replayed by the next worker. A message is stamped
+        sending_at right before it is handed to the transport; if the run
+        died after that, it may already have gone out.
+
+        Args:
+            db_file: SQLite database file
+            max_attempts: Sends per message before it is marked failed
+            retry_delay: Delay before the first retry, doubled after each failure
+            recover: Replay in-flight messages; pass False when only queueing
+                into an outbox another process is delivering from
+            resend_unconfirmed: Replay messages whose send started but was not
+                recorded (may duplicate them); False marks them failed instead
+            poll_interval: Longest an idle worker sleeps before looking for
+                messages queued by other processes
+        """
+        self.db_file = db_file
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        if "client_id" not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN client_id TEXT")
+        if "sending_at" not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN sending_at TEXT")
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+        if recover:
+            self._recover(resend_unconfirmed)
+
+    def _recover(self, resend_unconfirmed: bool):
+        """Reconcile messages a previous run left in_flight"""
+        now = datetime.now().isoformat()
+        with self._conn:
+            # Claimed but never handed to the transport: safe to send
+            replayed = self._conn.execute(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE status = ? AND sending_at IS NULL",
+                (PENDING, now, IN_FLIGHT)
+            ).rowcount
+            if resend_unconfirmed:
+                unconfirmed = self._conn.execute(
+                    "UPDATE outbox SET status = ?, sending_at = NULL, updated_at = ? WHERE status = ?",
+                    (PENDING, now, IN_FLIGHT)
+                ).rowcount
+            else:
+                unconfirmed = self._conn.execute(
+                    "UPDATE outbox SET status = ?, last_error = ?, updated_at = ? WHERE status = ?",
+                    (FAILED, "unconfirmed: stopped while sending", now, IN_FLIGHT)
+                ).rowcount
+        if replayed:
+            logger.warning(f"Replaying {replayed} in-flight messages from the last run")
+        if unconfirmed:
+            action = "resending" if resend_unconfirmed else "marked failed"
+            logger.warning(f"{unconfirmed} messages were being sent when the last run stopped; {action}")
+
+    def enqueue(self, phone: str, message: str, kind: str = "text", attachment: Optional[str] = None,
+                dedupe_key: Optional[str] = None, client_id: Optional[str] = None) -> Optional[int]:
+        """
+        Queue one message
+
+        Args:
+            phone: Recipient
+            message: Text (caption for images)
+            kind: "text" or "image"
+            attachment: File path for images
+            dedupe_key: Enqueueing the same key twice is a no-op (e.g. a
+                broadcast id plus phone, so a restarted broadcast skips
+                recipients already queued)
+            client_id: SkyBot Pro client the message is sent for
+
+        Returns:
+            Message id, or None if dedupe_key was already queued
+        """
+        ids = self.enqueue_many([{
+            "phone": phone, "message": message, "kind": kind,
+            "attachment": attachment, "dedupe_key": dedupe_key, "client_id": client_id
+        }])
+        return ids[0]
+
+    def enqueue_many(self, items: List[Dict]) -> List[Optional[int]]:
+        """Queue many messages in one transaction (see enqueue for item keys)"""
+        now = datetime.now().isoformat()
+        ids = []
+        with self._lock, self._conn:
+            for item in items:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO outbox "
+                    "(dedupe_key, phone, message, kind, attachment, client_id, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (item.get("dedupe_key"), item["phone"], item.get("message"), item.get("kind", "text"),
+                     item.get("attachment"), item.get("client_id"), now, now)
+                )
+                ids.append(cursor.lastrowid if cursor.rowcount else None)
+        self._wakeup.set()
+        return ids
+
+    def claim(self, limit: int = 1) -> List[Dict]:
+        """Move up to `limit` due pending messages to in_flight and return them"""
+        with self._lock, self._conn:
+            rows = [dict(row) for row in self._conn.execute(
+                "SELECT * FROM outbox WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (PENDING, time.time(), limit)
+            )]
+            self._conn.executemany(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                [(IN_FLIGHT, datetime.now().isoformat(), row["id"]) for row in rows]
+            )
+        return rows
+
+    def mark_sending(self, message_id: int):
+        """Record that a claimed message is about to be handed to the transport"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET sending_at = ? WHERE id = ?", (datetime.now().isoformat(), message_id)
+            )
+
+    def mark_sent(self, message_id: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, last_error = NULL, sending_at = NULL, updated_at = ? WHERE id = ?",
+                (SENT, datetime.now().isoformat(), message_id)
+            )
+
+    def mark_failed(self, message_id: int, error: str = ""):
+        """Schedule a retry, or mark failed once max_attempts is reached"""
+        with self._lock, self._conn:
+            attempts = self._conn.execute(
+                "SELECT attempts FROM outbox WHERE id = ?", (message_id,)
+            ).fetchone()["attempts"]
+
+            if attempts >= self.max_attempts:
+                status, next_attempt_at = FAILED, 0
+            else:
+                status = PENDING
+                next_attempt_at = time.time() + self.retry_delay * 2 ** (attempts - 1)
+
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, next_attempt_at = ?, last_error = ?, sending_at = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (status, next_attempt_at, error, datetime.now().isoformat(), message_id)
+            )
+
+    def defer(self, message_id: int, until: float, reason: str = ""):
+        """Put a claimed message back to pending until `until`, refunding its attempt"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = MAX(0, attempts - 1), next_attempt_at = ?, "
+                "last_error = ?, sending_at = NULL, updated_at = ? WHERE id = ?",
+                (PENDING, until, reason, datetime.now().isoformat(), message_id)
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """Number of messages per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        counts = {PENDING: 0, IN_FLIGHT: 0, SENT: 0, FAILED: 0}
+        counts.update({status: n for status, n in rows})
+        return counts
+
+    def get(self, message_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM outbox WHERE id = ?", (message_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _next_due_in(self) -> float:
+        with self._lock:
+            due = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = ?", (PENDING,)
+            ).fetchone()[0]
+        # Other processes may queue at any time; look again after poll_interval
+        if due is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(0.0, due - time.time()))
+
+    def process(self, item: Dict, deliver: Callable[[Dict], bool]) -> bool:
+        """
+        Deliver one claimed message and record the outcome
+
+        Returns:
+            True if it was sent
+        """
+        try:
+            self.mark_sending(item["id"])
+            success = deliver(item)
+            error = "" if success else "send returned False"
+        except DeferDelivery as e:
+            self.defer(item["id"], e.until, e.reason)
+            return False
+        except Exception as e:
+            success, error = False, str(e)
+
+        if success:
+            self.mark_sent(item["id"])
+        else:
+            self.mark_failed(item["id"], error)
+        return success
+
+    def _work(self, deliver: Callable[[Dict], bool], before_send: Optional[Callable[[], None]]):
+        while not self._stopping.is_set():
+            batch = self.claim()
+            if not batch:
+                self._wakeup.clear()
+                self._wakeup.wait(self._next_due_in())
+                continue
+
+            for item in batch:
+                if before_send:
+                    before_send()
+                self.process(item, deliver)
+
+    def start(self, deliver: Callable[[Dict], bool], workers: int = 1,
+              before_send: Optional[Callable[[], None]] = None):
+        """
+        Start background threads that drain the outbox
+
+        Args:
+            deliver: Sends one queued item, returns success
+            workers: Number of draining threads
+            before_send: Called before every send (e.g. a rate limiter's acquire),
+                also for messages deliver then defers; a deliver that can defer
+                should rate limit itself after deciding to send
+        """
+        if self._workers:
+            return
+        self._stopping.clear()
+        for i in range(max(1, workers)):
+            worker = threading.Thread(
+                target=self._work, args=(deliver, before_send), name=f"outbox-{i}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the workers after their current message"""
+        self._stopping.set()
+        self._wakeup.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._conn.close()
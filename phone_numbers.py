@@ -0,0 +1,159 @@
+"""
+Sky Bot - Phone number normalization
+Single-number and vectorized (pandas) normalization to WhatsApp's
+country-code-plus-digits form, with validation and duplicate reporting
+"""
+
+import re
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# E.164 allows at most 15 digits; anything under 8 can't be a real mobile number
+MIN_DIGITS = 8
+MAX_DIGITS = 15
+
+# Bare digit strings this long are taken as already carrying a country code
+# (national numbers without the trunk 0 are at most 10 digits)
+INTERNATIONAL_MIN = 11
+
+# Below this many numbers the pandas setup costs more than it saves
+VECTORIZE_MIN = 2000
+
+_non_digits = re.compile(r"\D")
+
+
+@lru_cache(maxsize=65536)
+def format_phone(phone_number: str, country_code: str) -> str:
+    """
+    Format one phone number for WhatsApp
+
+    Numbers written internationally ("+44 ...", "0044 ...", or 11+ bare
+    digits such as an already formatted "447700900123") keep their own
+    country code. Local numbers ("0...") get `country_code` instead of the 0,
+    and shorter numbers without `country_code` in front get it prefixed.
+    Formatting an already formatted number returns it unchanged.
+
+    Args:
+        phone_number: Phone number as typed
+        country_code: Default country code, digits only
+
+    Returns:
+        Digits with country code
+    """
+    international = phone_number.lstrip().startswith("+")
+    digits = _non_digits.sub("", phone_number)
+
+    if digits.startswith("00"):
+        return digits[2:]
+    if international:
+        return digits
+    if digits.startswith("0"):
+        return country_code + digits[1:]
+    if not digits.startswith(country_code) and len(digits) < INTERNATIONAL_MIN:
+        return country_code + digits
+    return digits
+
+
+def is_valid_phone(formatted: str) -> bool:
+    """True if a formatted number has a plausible international length"""
+    return MIN_DIGITS <= len(formatted) <= MAX_DIGITS and not formatted.startswith("0")
+
+
+def normalize_phone_series(phones, country_code: str):
+    """
+    Vectorized format_phone over a pandas Series
+
+    Each distinct input is normalized once, so repeated numbers in large
+    imports cost nothing extra.
+
+    Args:
+        phones: pandas Series of raw numbers
+        country_code: Default country code
+
+    Returns:
+        DataFrame with columns input, phone, valid, duplicate
+    """
+    import pandas as pd
+
+    raw = phones.astype("string").fillna("")
+    codes, uniques = pd.factorize(raw)
+    uniques = pd.Series(uniques, dtype="string")
+
+    international = uniques.str.lstrip().str.startswith("+")
+    digits = uniques.str.replace(r"\D", "", regex=True)
+
+    double_zero = digits.str.startswith("00")
+    local = ~international & ~double_zero & digits.str.startswith("0")
+    missing_code = (~international & ~double_zero & ~local & ~digits.str.startswith(country_code)
+                    & (digits.str.len() < INTERNATIONAL_MIN))
+
+    formatted = digits.copy()
+    formatted[double_zero] = digits[double_zero].str[2:]
+    formatted[local] = country_code + digits[local].str[1:]
+    formatted[missing_code] = country_code + digits[missing_code]
+
+    lengths = formatted.str.len()
+    valid_unique = (lengths >= MIN_DIGITS) & (lengths <= MAX_DIGITS) & ~formatted.str.startswith("0")
+
+    result = pd.DataFrame({
+        "input": raw.values,
+        "phone": formatted.to_numpy()[codes],
+        "valid": valid_unique.to_numpy()[codes],
+    }, index=phones.index)
+    result["duplicate"] = result["valid"] & result["phone"].duplicated(keep="first")
+    return result
+
+
+def normalize_phones(phone_numbers: Iterable[str], country_code: str) -> List[Optional[str]]:
+    """
+    Normalize many numbers at once
+
+    Args:
+        phone_numbers: Raw numbers
+        country_code: Default country code
+
+    Returns:
+        Formatted number per input, None where the number is invalid
+    """
+    phone_numbers = list(phone_numbers)
+
+    if len(phone_numbers) < VECTORIZE_MIN:
+        formatted = [format_phone(phone, country_code) for phone in phone_numbers]
+        return [phone if is_valid_phone(phone) else None for phone in formatted]
+
+    import pandas as pd
+
+    result = normalize_phone_series(pd.Series(phone_numbers, dtype="string"), country_code)
+    return [phone if valid else None for phone, valid in zip(result["phone"], result["valid"])]
+
+
+def check_recipients(phone_numbers: Iterable[str], country_code: str) -> Dict[str, List[str]]:
+    """
+    Pre-flight check for a broadcast
+
+    Args:
+        phone_numbers: Raw recipient numbers
+        country_code: Default country code
+
+    Returns:
+        {"valid": unique formatted numbers in input order,
+         "invalid": raw inputs that failed validation,
+         "duplicates": raw inputs whose number was already listed}
+    """
+    phone_numbers = list(phone_numbers)
+    report = {"valid": [], "invalid": [], "duplicates": []}
+    seen = set()
+
+    for raw, formatted in zip(phone_numbers, normalize_phones(phone_numbers, country_code)):
+        if formatted is None:
+            report["invalid"].append(raw)
+        elif formatted in seen:
+            report["duplicates"].append(raw)
+        else:
+            seen.add(formatted)
+            report["valid"].append(formatted)
+
+    return report
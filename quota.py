@@ -0,0 +1,205 @@
+"""
+Sky Bot - Plan quota metering
+Per-client monthly message counters kept in memory and checkpointed to disk,
+so checking a quota never scans the message log
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Months of past usage kept in the usage file
+HISTORY_MONTHS = 12
+
+
+def _month_bounds(now: Optional[datetime] = None):
+    """Current month as "YYYY-MM" and the local timestamp the next one starts"""
+    now = now or datetime.now()
+    if now.month == 12:
+        next_month = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    else:
+        next_month = now.replace(month=now.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    return now.strftime("%Y-%m"), next_month.timestamp()
+
+
+class QuotaMeter:
+    def __init__(self, usage_file: str = "usage.json",
+                 limit_for: Optional[Callable[[str], Optional[int]]] = None, flush_delay: float = 1.0,
+                 limit_ttl: float = 60.0):
+        """
+        Initialize the meter
+
+        Args:
+            usage_file: JSON checkpoint of this month's counters (and recent months)
+            limit_for: Looks up a client's monthly limit when it is needed;
+                None means unlimited
+            flush_delay: Seconds to batch counter changes before writing
+            limit_ttl: Seconds a looked-up limit is reused, so a plan change made
+                by another process applies without a restart
+        """
+        self.usage_file = usage_file
+        self.limit_for = limit_for
+        self.flush_delay = flush_delay
+        self.limit_ttl = limit_ttl
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+
+        self._month, self._resets_at = _month_bounds()
+        self._used: Dict[str, int] = {}
+        self._history: Dict[str, Dict[str, int]] = {}
+        # client id -> (limit, monotonic expiry); limits given to set_limit never expire
+        self._limits: Dict[str, Tuple[Optional[int], float]] = {}
+
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.usage_file):
+            return
+
+        with open(self.usage_file, "r") as f:
+            snapshot = json.load(f)
+
+        self._history = snapshot.get("history", {})
+        if snapshot.get("month") == self._month:
+            self._used = snapshot.get("used", {})
+        elif snapshot.get("used"):
+            self._history[snapshot["month"]] = snapshot["used"]
+            self._dirty = True
+
+    def _roll_over(self):
+        """Start new counters when the month changes (caller holds the lock)"""
+        if time.time() < self._resets_at:
+            return
+
+        month, self._resets_at = _month_bounds()
+        if month == self._month:
+            return
+
+        if self._used:
+            self._history[self._month] = self._used
+            for old in sorted(self._history)[:-HISTORY_MONTHS]:
+                del self._history[old]
+        logger.info(f"Usage counters reset for {month}")
+        self._month, self._used = month, {}
+        self._schedule_flush()
+
+    def limit(self, client_id) -> Optional[int]:
+        """Monthly message limit for a client (None = unlimited)"""
+        client_id = str(client_id)
+        with self._lock:
+            cached = self._limits.get(client_id)
+            if cached is not None and time.monotonic() < cached[1]:
+                return cached[0]
+
+        limit = self.limit_for(client_id) if self.limit_for else None
+        with self._lock:
+            self._limits[client_id] = (limit, time.monotonic() + self.limit_ttl)
+        return limit
+
+    def set_limit(self, client_id, limit: Optional[int]):
+        """Set or change a client's limit (e.g. after a plan change); kept until changed again"""
+        with self._lock:
+            self._limits[str(client_id)] = (limit, float("inf"))
+
+    def invalidate(self, client_id=None):
+        """Forget a client's limit (or every limit) so the next check looks it up again"""
+        with self._lock:
+            if client_id is None:
+                self._limits.clear()
+            else:
+                self._limits.pop(str(client_id), None)
+
+    def reserve(self, client_id, count: int = 1) -> int:
+        """
+        Count up to `count` sends against a client's quota
+
+        Returns:
+            How many sends fit (0 when the quota is used up)
+        """
+        client_id = str(client_id)
+        limit = self.limit(client_id)
+
+        with self._lock:
+            self._roll_over()
+            used = self._used.get(client_id, 0)
+            granted = count if limit is None else max(0, min(count, limit - used))
+            if granted:
+                self._used[client_id] = used + granted
+                self._schedule_flush()
+            return granted
+
+    def try_consume(self, client_id) -> bool:
+        """Count one send; False if the client is over quota"""
+        return self.reserve(client_id, 1) == 1
+
+    def refund(self, client_id, count: int = 1):
+        """Give back reserved sends that did not go out"""
+        client_id = str(client_id)
+        with self._lock:
+            used = self._used.get(client_id, 0)
+            if used:
+                self._used[client_id] = max(0, used - count)
+                self._schedule_flush()
+
+    def used(self, client_id) -> int:
+        """Messages counted this month"""
+        with self._lock:
+            self._roll_over()
+            return self._used.get(str(client_id), 0)
+
+    def remaining(self, client_id) -> Optional[int]:
+        """Messages left this month (None = unlimited)"""
+        limit = self.limit(client_id)
+        if limit is None:
+            return None
+        return max(0, limit - self.used(client_id))
+
+    def history(self, month: str) -> Dict[str, int]:
+        """Per-client counts for a past month ("YYYY-MM")"""
+        with self._lock:
+            self._roll_over()
+            if month == self._month:
+                return dict(self._used)
+            return dict(self._history.get(month, {}))
+
+    def next_reset(self) -> float:
+        """Timestamp when the counters start over"""
+        return self._resets_at
+
+    def _schedule_flush(self):
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Checkpoint the counters now (atomic replace of the usage file)"""
+        # The file is written outside the counter lock so senders never wait on disk
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                snapshot = {"month": self._month, "used": dict(self._used), "history": dict(self._history)}
+                self._dirty = False
+
+            tmp_file = self.usage_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_file, self.usage_file)
+
+    def close(self):
+        """Write pending counts and stop the checkpoint timer"""
+        self.flush()
@@ -0,0 +1,207 @@
+"""
+Sky Bot - Persistent job scheduler
+Timed jobs live in a min-heap keyed on next fire time; a background thread
+sleeps until exactly the next job is due. Jobs are persisted row by row in
+SQLite, so adding one job never rewrites the others.
+"""
+
+import heapq
+import itertools
+import json
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+# Seconds before a one-shot job whose handoff failed is tried again
+RETRY_DELAY = 60
+
+
+class Scheduler:
+    def __init__(self, jobs_file: str = "scheduled_jobs.db", run_job: Optional[Callable[[Dict], None]] = None):
+        """
+        Initialize the scheduler and load saved jobs
+
+        Args:
+            jobs_file: SQLite file the jobs are persisted to
+            run_job: Called with the job dict when a job is due
+        """
+        self.jobs_file = jobs_file
+        self.run_job = run_job
+
+        self._conn = sqlite3.connect(jobs_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, job TEXT NOT NULL)")
+
+        self._jobs: Dict[str, Dict] = {}
+        self._heap: List = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _push(self, job: Dict):
+        heapq.heappush(self._heap, (job["next_run"], next(self._seq), job["id"]))
+
+    def _load(self):
+        for (data,) in self._conn.execute("SELECT job FROM jobs"):
+            job = json.loads(data)
+            self._jobs[job["id"]] = job
+            self._push(job)
+        if self._jobs:
+            logger.info(f"Loaded {len(self._jobs)} scheduled jobs")
+
+    def _save(self, jobs: List[Dict] = (), removed: List[str] = ()):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO jobs (id, job) VALUES (?, ?)",
+                [(job["id"], json.dumps(job)) for job in jobs]
+            )
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in removed])
+
+    @staticmethod
+    def _advance(job: Dict, now: float) -> float:
+        """Next fire time after `now` for a recurring job (missed runs are skipped)"""
+        next_run = job["next_run"]
+        interval = job["interval"]
+        while next_run <= now:
+            if interval % DAY == 0:
+                # Step in local calendar days so HH:MM survives DST changes
+                next_run = (datetime.fromtimestamp(next_run) + timedelta(days=interval // DAY)).timestamp()
+            else:
+                next_run += interval
+        return next_run
+
+    def add(self, job_id: str, run_at: datetime, interval: Optional[int] = None, **data) -> Dict:
+        """
+        Add or replace a job
+
+        Args:
+            job_id: Unique id; adding an existing id replaces that job
+            run_at: First fire time
+            interval: Repeat every N seconds (multiples of a day keep local time); None = one-shot
+            data: Extra fields handed to run_job (phone, message, ...)
+
+        Returns:
+            The stored job
+        """
+        job = dict(data, id=job_id, next_run=run_at.timestamp(), interval=interval,
+                   created_at=datetime.now().isoformat())
+        with self._cond:
+            self._jobs[job_id] = job
+            self._push(job)
+            self._save(jobs=[job])
+            self._cond.notify()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Remove a job; its heap entry is dropped lazily"""
+        with self._cond:
+            if self._jobs.pop(job_id, None) is None:
+                return False
+            self._save(removed=[job_id])
+            self._cond.notify()
+            return True
+
+    def jobs(self) -> List[Dict]:
+        """All jobs ordered by next fire time"""
+        with self._cond:
+            return sorted(self._jobs.values(), key=lambda job: job["next_run"])
+
+    def _pop_due(self, now: float) -> List[Dict]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            next_run, _, job_id = heapq.heappop(self._heap)
+            job = self._jobs.get(job_id)
+            # Skip entries for cancelled or rescheduled jobs
+            if job is None or job["next_run"] != next_run:
+                continue
+
+            due.append(dict(job))
+            if job["interval"]:
+                job["next_run"] = self._advance(job, now)
+                self._push(job)
+            # One-shot jobs stay stored until run_job has handed them off (see _finish)
+        return due
+
+    def _finish(self, job: Dict, success: bool):
+        """Drop a one-shot job once it ran, or retry it later if run_job failed"""
+        with self._cond:
+            current = self._jobs.get(job["id"])
+            # Cancelled or replaced while it ran
+            if current is None or current["next_run"] != job["next_run"]:
+                return
+            if success:
+                del self._jobs[job["id"]]
+                self._save(removed=[job["id"]])
+            else:
+                current["next_run"] = time.time() + RETRY_DELAY
+                self._push(current)
+                self._save(jobs=[current])
+                self._cond.notify()
+
+    def run_pending(self) -> int:
+        """Run every job that is due now; returns how many ran"""
+        with self._cond:
+            due = self._pop_due(time.time())
+            recurring = [self._jobs[job["id"]] for job in due if job["interval"]]
+            if recurring:
+                self._save(jobs=recurring)
+
+        for job in due:
+            try:
+                self.run_job(job)
+                success = True
+            except Exception as e:
+                logger.error(f"Scheduled job {job['id']} failed: {str(e)}")
+                success = False
+            if not job["interval"]:
+                self._finish(job, success)
+        return len(due)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    # Drop stale heads so the wait targets a live job
+                    while self._heap and (self._heap[0][2] not in self._jobs
+                                          or self._jobs[self._heap[0][2]]["next_run"] != self._heap[0][0]):
+                        heapq.heappop(self._heap)
+                    if self._heap and self._heap[0][0] <= time.time():
+                        break
+                    timeout = self._heap[0][0] - time.time() if self._heap else None
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+            self.run_pending()
+
+    def start(self):
+        """Run due jobs in a background thread"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self._conn.close()
@@ -1,22 +1,33 @@
 """
-Simpler WhatsApp Bot for Pydroid 3 - No SQLite needed
+Simpler WhatsApp Bot for Pydroid 3 - uses SQLite when available, JSON files otherwise
 """
 
-import json
 import os
+from collections import Counter
 from datetime import datetime
 import time
 
+from storage import open_storage
+
 class SimpleWhatsAppBot:
-    def __init__(self):
+    def __init__(self, storage="sqlite"):
         self.your_number = "0748529340"
         self.country_code = "27"
         self.github_url = "https://github.com/Sky95360/Sky_b.o.t"
         
-        # Files for storage
+        # Old pipe-delimited files, imported once into storage
         self.contacts_file = "contacts.txt"
         self.messages_file = "messages.txt"
         
+        self.storage = open_storage(
+            storage,
+            db_file="simple_bot.db",
+            contacts_file="simple_contacts.json",
+            log_dir="simple_message_log",
+            clients_file="simple_clients.json"
+        )
+        self._import_text_files()
+        
         print("=" * 50)
         print("🤖 SIMPLE WHATSAPP BOT")
         print("=" * 50)
@@ -24,28 +35,102 @@ class SimpleWhatsAppBot:
         print(f"GitHub: {self.github_url}")
         print("=" * 50)
     
+    def _import_text_files(self):
+        """Move contacts.txt / messages.txt into storage (one time)"""
+        self._import_text_file(self.contacts_file, self._import_contacts)
+        self._import_text_file(self.messages_file, self._import_messages)
+    
+    def _import_text_file(self, path, import_lines):
+        """
+        Import one text file, renamed to .importing while it runs
+        
+        A .importing file left by a crash is imported again on the next
+        start, skipping what already made it into storage.
+        """
+        importing = path + ".importing"
+        resuming = os.path.exists(importing)
+        if not resuming:
+            if not os.path.exists(path):
+                return
+            os.replace(path, importing)
+        
+        with open(importing, "r") as f:
+            import_lines(f, resuming)
+        os.replace(importing, path + ".migrated")
+        
+        if resuming and os.path.exists(path):
+            self._import_text_file(path, import_lines)
+    
+    def _import_contacts(self, lines, resuming):
+        # Contacts are keyed by phone, so a resumed import can't duplicate them
+        contacts = []
+        for line in lines:
+            # Names may contain "|"; phone and date never do
+            fields = line.strip().rsplit("|", 2)
+            if len(fields) != 3:
+                if line.strip():
+                    print(f"⚠️ Skipping malformed contact line: {line.strip()}")
+                continue
+            name, phone, date = fields
+            contacts.append({"name": name, "phone": phone, "added_at": date})
+        self.storage.add_contacts(contacts)
+    
+    def _import_messages(self, lines, resuming):
+        entries = []
+        for line in lines:
+            fields = line.rstrip("\n").split("|", 2)
+            if len(fields) != 3:
+                if line.strip():
+                    print(f"⚠️ Skipping malformed message line: {line.strip()}")
+                continue
+            date, phone, message = fields
+            entries.append({
+                "timestamp": date,
+                "phone": phone,
+                "message": message,
+                "type": "manual",
+                "status": "created"
+            })
+        
+        if resuming:
+            # Drop the rows an interrupted import already logged (counted, so repeated lines survive)
+            logged = Counter(
+                (entry["timestamp"], entry["phone"], entry["message"])
+                for day in {entry["timestamp"][:10] for entry in entries}
+                for entry in self.storage.messages_on(day)
+                if entry.get("type") == "manual"
+            )
+            remaining = []
+            for entry in entries:
+                key = (entry["timestamp"], entry["phone"], entry["message"])
+                if logged[key]:
+                    logged[key] -= 1
+                else:
+                    remaining.append(entry)
+            entries = remaining
+        
+        self.storage.log_messages(entries)
+    
     def save_contact(self, name, phone):
-        """Save contact to file"""
-        with open(self.contacts_file, "a") as f:
-            f.write(f"{name}|{phone}|{datetime.now()}\n")
-        print(f"✅ Contact saved: {name}")
+        """Save contact to storage"""
+        if self.storage.add_contact({"name": name, "phone": phone, "added_at": str(datetime.now())}):
+            print(f"✅ Contact saved: {name}")
+        else:
+            print(f"⚠️ Contact already saved: {phone}")
     
     def show_contacts(self):
         """Show all contacts"""
-        if not os.path.exists(self.contacts_file):
+        contacts = self.storage.all_contacts()
+        if not contacts:
             print("📭 No contacts yet")
             return
         
-        with open(self.contacts_file, "r") as f:
-            contacts = f.readlines()
-        
         print("📒 CONTACTS:")
         print("=" * 40)
         for i, contact in enumerate(contacts, 1):
-            name, phone, date = contact.strip().split("|")
-            print(f"{i}. {name}")
-            print(f"   📞 {phone}")
-            print(f"   📅 {date[:10]}")
+            print(f"{i}. {contact['name']}")
+            print(f"   📞 {contact['phone']}")
+            print(f"   📅 {(contact['added_at'] or '')[:10]}")
             print("-" * 30)
     
     def create_message(self):
@@ -65,9 +150,14 @@ class SimpleWhatsAppBot:
         print(f"3. Copy this message: {message}")
         print("=" * 40)
         
-        # Save to file
-        with open(self.messages_file, "a") as f:
-            f.write(f"{datetime.now()}|{phone}|{message}\n")
+        # Save to storage
+        self.storage.log_message({
+            "timestamp": datetime.now().isoformat(),
+            "phone": phone,
+            "message": message,
+            "type": "manual",
+            "status": "created"
+        })
         
         input("\nPress Enter to continue...")
     
@@ -78,19 +168,16 @@ class SimpleWhatsAppBot:
         
         message = input("Enter broadcast message: ").strip()
         
-        if not os.path.exists(self.contacts_file):
+        contacts = self.storage.all_contacts()
+        if not contacts:
             print("❌ No contacts to broadcast to")
             return
         
-        with open(self.contacts_file, "r") as f:
-            contacts = f.readlines()
-        
         print(f"\n📤 Broadcasting to {len(contacts)} contacts...")
         print("=" * 40)
         
         for contact in contacts:
-            name, phone, _ = contact.strip().split("|")
-            print(f"\nTo: {name} ({phone})")
+            print(f"\nTo: {contact['name']} ({contact['phone']})")
             print(f"Message: {message}")
             print("-" * 30)
             time.sleep(0.5)
@@ -106,15 +193,8 @@ class SimpleWhatsAppBot:
     
     def show_stats(self):
         """Show statistics"""
-        contact_count = 0
-        if os.path.exists(self.contacts_file):
-            with open(self.contacts_file, "r") as f:
-                contact_count = len(f.readlines())
-        
-        message_count = 0
-        if os.path.exists(self.messages_file):
-            with open(self.messages_file, "r") as f:
-                message_count = len(f.readlines())
+        contact_count = self.storage.contact_count()
+        message_count = self.storage.total_message_count()
         
         print("\n📊 STATISTICS")
         print("=" * 40)
@@ -166,12 +246,13 @@ class SimpleWhatsAppBot:
                 print("HELP")
                 print("=" * 40)
                 print("This bot helps you manage WhatsApp messages.")
-                print("It stores contacts and messages in files.")
+                print("It stores contacts and messages in a local database.")
                 print("You need to send messages manually in WhatsApp.")
                 print("=" * 40)
                 input("\nPress Enter to continue...")
             
             elif choice == "0":
+                self.storage.close()
                 print("\n👋 Goodbye!")
                 break
             
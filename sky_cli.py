@@ -0,0 +1,380 @@
+"""
+Sky Bot - Command line
+Non-interactive subcommands for scripts and cron jobs. Batches are read from
+files or stdin, results are printed as JSON on stdout, and everything the bots
+print for humans (banners, progress) goes to stderr.
+
+Usage:
+    python sky_cli.py send 0712345678 "Hello!"                 # queue one message
+    python sky_cli.py send --input messages.jsonl --now        # send a batch right away
+    cat phones.txt | python sky_cli.py broadcast "Hi {name}!" --input -
+    python sky_cli.py broadcast "Sale today" --group customers
+    python sky_cli.py import contacts.csv --group customers
+    python sky_cli.py import clients.xlsx --bot pro
+    python sky_cli.py clients report --plan pro --all
+    python sky_cli.py schedule list
+    python sky_cli.py --storage json --dir /srv/skybot --pretty clients report
+
+Batch input is JSON Lines ({"phone": ..., "message": ..., "file_path": ...});
+a line that is not a JSON object is read as a bare phone number. Files ending
+in .csv are read with their header row instead.
+
+Queued messages are delivered by a running bot (menu, API server or
+start_outbox()); --now sends from this process instead.
+
+Exit status: 0 on success, 1 if some sends failed, 2 on bad input.
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# Records per outbox/storage transaction
+BATCH_SIZE = 5000
+
+
+class CliError(Exception):
+    """Bad input; reported as {"error": ...} with exit status 2"""
+
+
+# Input
+
+def read_records(path: str) -> Iterator[Dict]:
+    """
+    Records from a batch file, or stdin for "-"
+
+    Args:
+        path: .csv file (header row), JSON Lines file, or "-"
+
+    Yields:
+        One dict per row/line (blank lines and # comments are skipped)
+    """
+    if path != "-" and not os.path.exists(path):
+        raise CliError(f"No such file: {path}")
+
+    with contextlib.nullcontext(sys.stdin) if path == "-" else open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f, skipinitialspace=True):
+                yield {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+            return
+
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if not line.startswith("{"):
+                yield {"phone": line}
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise CliError(f"{path}, line {number}: {e.msg}")
+
+
+def batches(records: Iterable[Dict], size: int = BATCH_SIZE) -> Iterator[List[Dict]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _messages(args) -> Iterator[Dict]:
+    """The send command's messages: the PHONE MESSAGE arguments or --input records"""
+    if args.input:
+        if args.phone:
+            raise CliError("Give PHONE MESSAGE or --input, not both")
+        records = read_records(args.input)
+    elif args.phone and args.message:
+        records = [{"phone": args.phone, "message": args.message}]
+    else:
+        raise CliError("Give PHONE MESSAGE or --input FILE")
+
+    for number, record in enumerate(records, 1):
+        if not record.get("phone") or not record.get("message"):
+            raise CliError(f"Message {number} needs a phone and a message")
+        yield record
+
+
+def _recipients(args, storage) -> List[Dict]:
+    """The broadcast command's recipients as contact-like dicts"""
+    chosen = [option for option in (args.input, args.group, args.all) if option]
+    if len(chosen) != 1:
+        raise CliError("Give exactly one of --input, --group or --all")
+    if args.input:
+        recipients = [record for record in read_records(args.input) if record.get("phone")]
+    elif args.group:
+        recipients = storage.contacts_in_group(args.group)
+    else:
+        recipients = list(storage.iter_contacts())
+    if not recipients:
+        raise CliError("No recipients")
+    return recipients
+
+
+# Bots (imported on use; their modules are slow to import)
+
+@contextlib.contextmanager
+def quiet():
+    """Send the bots' own prints to stderr so stdout stays JSON"""
+    with contextlib.redirect_stdout(sys.stderr):
+        yield
+
+
+def open_sky(args, delivering: bool = False):
+    from Sky import SkyWhatsAppBot
+
+    with quiet():
+        # Only a delivering process may replay another run's in-flight messages
+        return SkyWhatsAppBot(storage=args.storage, transport=args.transport if delivering else "mock",
+                              recover_outbox=delivering)
+
+
+def open_pro(args):
+    from SkyBot_Pro import SkyBotPro
+
+    with quiet():
+        return SkyBotPro(storage=args.storage)
+
+
+def open_simple(args):
+    from simple_whatsapp_bot import SimpleWhatsAppBot
+
+    with quiet():
+        return SimpleWhatsAppBot(storage=args.storage)
+
+
+def _send_report(results: List[Dict]) -> Dict:
+    failed = sum(1 for result in results if not result["sent"])
+    return {"sent": len(results) - failed, "failed": failed, "results": results}
+
+
+def _log_created(storage, records: Iterable[Dict]) -> int:
+    """Simple bot: record messages for manual sending, like its menu does"""
+    created = 0
+    for batch in batches(records):
+        now = datetime.now().isoformat()
+        storage.log_messages([
+            {"timestamp": now, "phone": record["phone"], "message": record["message"],
+             "type": "manual", "status": "created"}
+            for record in batch
+        ])
+        created += len(batch)
+    return created
+
+
+# Commands: each returns the JSON result
+
+def cmd_send(args) -> Dict:
+    messages = _messages(args)
+
+    if args.bot == "simple":
+        bot = open_simple(args)
+        try:
+            return {"created": _log_created(bot.storage, messages)}
+        finally:
+            bot.storage.close()
+
+    bot = open_sky(args, delivering=args.now)
+    try:
+        if args.at:
+            try:
+                hour, minute = (int(part) for part in args.at.split(":"))
+            except ValueError:
+                raise CliError(f"--at takes HH:MM, not {args.at}")
+            scheduled, failed = 0, []
+            for record in messages:
+                if bot.send_scheduled_message(record["phone"], record["message"], hour, minute, args.daily):
+                    scheduled += 1
+                else:
+                    failed.append(record["phone"])
+            return {"scheduled": scheduled, "at": f"{hour:02d}:{minute:02d}", "failed": failed}
+
+        if args.now:
+            results = []
+            with quiet():
+                for record in messages:
+                    if record.get("file_path"):
+                        sent = bot.send_with_attachment(record["phone"], record["message"], record["file_path"],
+                                                        args.client)
+                    else:
+                        sent = bot.send_instant_message(record["phone"], record["message"], args.client)
+                    results.append({"phone": record["phone"], "sent": sent})
+            return _send_report(results)
+
+        ids = []
+        for batch in batches(messages):
+            ids.extend(bot.queue_messages(batch, client_id=args.client))
+        return {"queued": sum(1 for message_id in ids if message_id), "ids": ids}
+    finally:
+        bot.close()
+
+
+def cmd_broadcast(args) -> Dict:
+    if args.bot == "simple":
+        bot = open_simple(args)
+        try:
+            recipients = _recipients(args, bot.storage)
+            return {"created": _log_created(
+                bot.storage, ({"phone": contact["phone"], "message": args.message} for contact in recipients)
+            )}
+        finally:
+            bot.storage.close()
+
+    bot = open_sky(args, delivering=args.now)
+    try:
+        recipients = _recipients(args, bot.storage)
+        phones = [contact["phone"] for contact in recipients]
+        message = bot.personalize(args.message, recipients)
+
+        if args.now:
+            with quiet():
+                sent = bot.send_to_multiple_contacts(phones, message, client_id=args.client)
+            return _send_report([{"phone": phone, "sent": ok} for phone, ok in sent.items()])
+
+        # Re-running with the same id only queues recipients it missed
+        broadcast_id = args.broadcast_id or datetime.now().strftime("%Y%m%d%H%M%S%f")
+        queued = bot.queue_broadcast(phones, message, broadcast_id, client_id=args.client)
+        return {"broadcast_id": broadcast_id, "recipients": len(phones), "queued": queued}
+    finally:
+        bot.close()
+
+
+def cmd_import(args) -> Dict:
+    path = sys.stdin if args.file == "-" else args.file
+    if args.file != "-" and not os.path.exists(args.file):
+        raise CliError(f"No such file: {args.file}")
+
+    if args.bot == "pro":
+        bot = open_pro(args)
+        try:
+            with quiet():
+                return bot.import_clients(path)
+        finally:
+            bot.billing.close()
+            bot.storage.close()
+
+    if args.bot == "simple":
+        import bulk_io
+
+        bot = open_simple(args)
+        try:
+            return bulk_io.import_contacts(bot.storage, path, bot.country_code, args.group)
+        finally:
+            bot.storage.close()
+
+    bot = open_sky(args)
+    try:
+        return bot.import_contacts(path, args.group)
+    finally:
+        bot.close()
+
+
+def cmd_clients_report(args) -> Dict:
+    bot = open_pro(args)
+    try:
+        registry = bot.registry
+        filters = {"plan": args.plan, "status": args.status, "month": args.month}
+        if args.all:
+            report = registry.page(1, max(1, registry.count(**filters)), **filters)
+        else:
+            report = registry.page(args.page, args.page_size, **filters)
+        report["income"] = {"monthly": registry.monthly_income(), "by_plan": registry.income_by_plan()}
+        return report
+    finally:
+        bot.billing.close()
+        bot.storage.close()
+
+
+def cmd_schedule_list(args) -> Dict:
+    bot = open_sky(args)
+    try:
+        jobs = [dict(job, next_run=datetime.fromtimestamp(job["next_run"]).isoformat(timespec="seconds"))
+                for job in bot.scheduler.jobs()]
+        return {"jobs": jobs}
+    finally:
+        bot.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sky", description="Sky Bot command line (JSON output)")
+    parser.add_argument("--storage", default="sqlite", choices=("sqlite", "json"))
+    parser.add_argument("--dir", help="Bot data directory (default: current directory)")
+    parser.add_argument("--pretty", action="store_true", help="Indent the JSON output")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    send = commands.add_parser("send", help="Queue, send or schedule messages")
+    send.add_argument("phone", nargs="?")
+    send.add_argument("message", nargs="?")
+    send.add_argument("--input", metavar="FILE", help="Batch of messages (JSON Lines or .csv, - for stdin)")
+    send.add_argument("--now", action="store_true", help="Send from this process instead of queueing")
+    send.add_argument("--transport", default="pywhatkit", help="With --now: pywhatkit, web or mock")
+    send.add_argument("--at", metavar="HH:MM", help="Schedule for this time instead")
+    send.add_argument("--daily", action="store_true", help="With --at: repeat every day")
+    send.add_argument("--client", help="SkyBot Pro client whose quota the sends count against")
+    send.add_argument("--bot", default="sky", choices=("sky", "simple"))
+    send.set_defaults(run=cmd_send)
+
+    broadcast = commands.add_parser("broadcast", help="Send one message (with {name} etc.) to many contacts")
+    broadcast.add_argument("message")
+    broadcast.add_argument("--input", metavar="FILE", help="Recipients (phones, JSON Lines or .csv, - for stdin)")
+    broadcast.add_argument("--group", help="Every contact in this group")
+    broadcast.add_argument("--all", action="store_true", help="Every contact")
+    broadcast.add_argument("--now", action="store_true", help="Send from this process instead of queueing")
+    broadcast.add_argument("--transport", default="pywhatkit", help="With --now: pywhatkit, web or mock")
+    broadcast.add_argument("--broadcast-id", help="Resume a queued broadcast (skips recipients already queued)")
+    broadcast.add_argument("--client", help="SkyBot Pro client whose quota the sends count against")
+    broadcast.add_argument("--bot", default="sky", choices=("sky", "simple"))
+    broadcast.set_defaults(run=cmd_broadcast)
+
+    imports = commands.add_parser("import", help="Import contacts (or --bot pro clients) from CSV/XLSX")
+    imports.add_argument("file", help="CSV or XLSX file, - for CSV on stdin")
+    imports.add_argument("--group", default="general", help="Group for rows without one")
+    imports.add_argument("--bot", default="sky", choices=("sky", "pro", "simple"))
+    imports.set_defaults(run=cmd_import)
+
+    clients = commands.add_parser("clients", help="SkyBot Pro clients").add_subparsers(dest="action", required=True)
+    report = clients.add_parser("report", help="Clients with income totals")
+    report.add_argument("--plan")
+    report.add_argument("--status")
+    report.add_argument("--month", metavar="YYYY-MM", help="Joined in this month")
+    report.add_argument("--page", type=int, default=1)
+    report.add_argument("--page-size", type=int, default=50)
+    report.add_argument("--all", action="store_true", help="Every matching client in one page")
+    report.set_defaults(run=cmd_clients_report)
+
+    schedule = commands.add_parser("schedule", help="Scheduled messages").add_subparsers(dest="action", required=True)
+    schedule.add_parser("list", help="Pending jobs, soonest first").set_defaults(run=cmd_schedule_list)
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.dir:
+        os.makedirs(args.dir, exist_ok=True)
+        os.chdir(args.dir)
+
+    try:
+        result = args.run(args)
+    except (CliError, ValueError, OSError) as e:
+        print(json.dumps({"error": str(e)}))
+        return 2
+
+    print(json.dumps(result, indent=2 if args.pretty else None, ensure_ascii=False, default=str))
+    return 1 if result.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,568 @@
+"""
+Sky Bot - Storage backends
+One interface for contacts, the message log and SkyBot Pro clients, with a
+SQLite (WAL) engine and a JSON-file fallback
+"""
+
+import json
+import os
+import threading
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from message_log import MessageLog, migrate_json_log
+from message_stats import MessageStats
+from contact_store import ContactStore
+
+try:
+    import sqlite3
+except ImportError:  # Some Pydroid/embedded builds ship without it
+    sqlite3 = None
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend:
+    """Interface shared by all storage engines"""
+
+    # Contacts
+    def add_contact(self, contact: Dict) -> bool:
+        """Add a contact; False if its phone already exists"""
+        raise NotImplementedError
+
+    def get_contact(self, phone: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def contacts_in_group(self, group: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def all_contacts(self) -> List[Dict]:
+        raise NotImplementedError
+
+    def contacts_page(self, offset: int = 0, limit: int = 100, group: Optional[str] = None) -> List[Dict]:
+        """`limit` contacts from `offset` in insertion order, optionally only one group"""
+        contacts = self.contacts_in_group(group) if group is not None else self.all_contacts()
+        return contacts[offset:offset + limit]
+
+    def contact_count(self, group: Optional[str] = None) -> int:
+        raise NotImplementedError
+
+    def add_contacts(self, contacts: List[Dict]) -> int:
+        """Add many contacts as one batch; returns how many were new"""
+        return sum(1 for contact in contacts if self.add_contact(contact))
+
+    def iter_contacts(self) -> Iterator[Dict]:
+        """Stream all contacts"""
+        return iter(self.all_contacts())
+
+    # Message log
+    def log_message(self, entry: Dict):
+        raise NotImplementedError
+
+    def log_messages(self, entries: List[Dict]):
+        """Log many entries as one batch"""
+        for entry in entries:
+            self.log_message(entry)
+
+    def messages_on(self, day: Optional[str] = None) -> Iterator[Dict]:
+        """Log entries for a day (YYYY-MM-DD, default today)"""
+        raise NotImplementedError
+
+    def message_count(self, day: Optional[str] = None, status: Optional[str] = None) -> int:
+        """Number of log entries for a day (default today), optionally only one status ("sent", ...)"""
+        raise NotImplementedError
+
+    def total_message_count(self) -> int:
+        """Number of log entries over all days"""
+        raise NotImplementedError
+
+    def message_days(self, since: Optional[str] = None) -> List[str]:
+        """Days (YYYY-MM-DD) that have log entries, oldest first, optionally from `since` on"""
+        raise NotImplementedError
+
+    def message_day_counts(self, since: Optional[str] = None) -> Dict[str, int]:
+        """Number of log entries per day (YYYY-MM-DD), optionally from `since` on"""
+        return {day: self.message_count(day) for day in self.message_days(since)}
+
+    # SkyBot Pro clients
+    def add_client(self, client: Dict) -> Dict:
+        """Store a client and return it with its assigned id"""
+        raise NotImplementedError
+
+    def add_clients(self, clients: List[Dict]) -> List[Dict]:
+        """Store many clients as one batch"""
+        return [self.add_client(client) for client in clients]
+
+    def get_client(self, client_id: int) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def update_client(self, client_id: int, **fields) -> bool:
+        raise NotImplementedError
+
+    def remove_client(self, client_id: int) -> bool:
+        """Delete a client; its id is never handed out again"""
+        raise NotImplementedError
+
+    def all_clients(self) -> List[Dict]:
+        raise NotImplementedError
+
+    def iter_clients(self) -> Iterator[Dict]:
+        """Stream all clients"""
+        return iter(self.all_clients())
+
+    def clients_by_plan(self, plan: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def monthly_income(self) -> int:
+        """Sum of prices over active clients"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _today(day: Optional[str]) -> str:
+        return day or datetime.now().strftime("%Y-%m-%d")
+
+
+class JSONBackend(StorageBackend):
+    """File-based engine: contacts.json, message_log/ segments and clients.json"""
+
+    def __init__(self, contacts_file: str = "contacts.json", log_dir: str = "message_log",
+                 clients_file: str = "clients.json", normalize: Optional[Callable[[str], str]] = None):
+        self.contacts = ContactStore(contacts_file, normalize=normalize)
+
+        self.message_log = MessageLog(log_dir)
+        migrate_json_log(log_dir + ".json", self.message_log)
+        self.message_stats = MessageStats(self.message_log, log_dir + "_stats.json")
+
+        self.clients_file = clients_file
+        self._clients_lock = threading.Lock()
+        self._clients: List[Dict] = []
+        if os.path.exists(self.clients_file):
+            with open(self.clients_file, "r") as f:
+                self._clients = json.load(f)
+
+        # Highest id ever assigned, kept beside clients.json so deleting the
+        # newest client doesn't free its id for reuse
+        self._next_id_file = clients_file + ".next_id"
+        self._next_id = max((c["id"] for c in self._clients), default=0) + 1
+        if os.path.exists(self._next_id_file):
+            with open(self._next_id_file, "r") as f:
+                self._next_id = max(self._next_id, int(f.read().strip() or 0))
+
+    def add_contact(self, contact: Dict) -> bool:
+        return self.contacts.add(contact)
+
+    def get_contact(self, phone: str) -> Optional[Dict]:
+        return self.contacts.get(phone)
+
+    def contacts_in_group(self, group: str) -> List[Dict]:
+        return self.contacts.by_group(group)
+
+    def all_contacts(self) -> List[Dict]:
+        return self.contacts.all()
+
+    def contact_count(self, group: Optional[str] = None) -> int:
+        if group is not None:
+            return len(self.contacts.by_group(group))
+        return self.contacts.count()
+
+    def log_message(self, entry: Dict):
+        self.message_log.append(entry)
+
+    def messages_on(self, day: Optional[str] = None) -> Iterator[Dict]:
+        return self.message_log.iter_records(self._today(day))
+
+    def message_count(self, day: Optional[str] = None, status: Optional[str] = None) -> int:
+        return self.message_stats.count(day, status)
+
+    def total_message_count(self) -> int:
+        return sum(self.message_stats.by_day.values())
+
+    def message_days(self, since: Optional[str] = None) -> List[str]:
+        return sorted(day for day, count in self.message_stats.by_day.items()
+                      if count and (since is None or day >= since))
+
+    def message_day_counts(self, since: Optional[str] = None) -> Dict[str, int]:
+        return {day: self.message_stats.by_day[day] for day in self.message_days(since)}
+
+    def _save_clients(self):
+        tmp_file = self.clients_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self._clients, f, indent=4)
+        os.replace(tmp_file, self.clients_file)
+        with open(self._next_id_file, "w") as f:
+            f.write(str(self._next_id))
+
+    def add_client(self, client: Dict) -> Dict:
+        return self.add_clients([client])[0]
+
+    def add_clients(self, clients: List[Dict]) -> List[Dict]:
+        with self._clients_lock:
+            added = []
+            for client in clients:
+                client = dict(client, id=self._next_id)
+                self._next_id += 1
+                self._clients.append(client)
+                added.append(client)
+            self._save_clients()
+            return added
+
+    def get_client(self, client_id: int) -> Optional[Dict]:
+        for client in self._clients:
+            if client["id"] == client_id:
+                return dict(client)
+        return None
+
+    def update_client(self, client_id: int, **fields) -> bool:
+        with self._clients_lock:
+            for client in self._clients:
+                if client["id"] == client_id:
+                    client.update(fields)
+                    self._save_clients()
+                    return True
+            return False
+
+    def remove_client(self, client_id: int) -> bool:
+        with self._clients_lock:
+            for index, client in enumerate(self._clients):
+                if client["id"] == client_id:
+                    del self._clients[index]
+                    self._save_clients()
+                    return True
+            return False
+
+    def all_clients(self) -> List[Dict]:
+        return list(self._clients)
+
+    def clients_by_plan(self, plan: str) -> List[Dict]:
+        return [c for c in self._clients if c["plan"] == plan]
+
+    def monthly_income(self) -> int:
+        return sum(c["price"] for c in self._clients if c.get("status") == "active")
+
+    def close(self):
+        self.contacts.close()
+        self.message_stats.checkpoint()
+        self.message_log.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite engine in WAL mode with indexes on phone, group, day and plan"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS contacts (
+            phone TEXT PRIMARY KEY,
+            name TEXT,
+            country_code TEXT,
+            "group" TEXT NOT NULL DEFAULT 'general',
+            added_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_contacts_group ON contacts ("group");
+
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            day TEXT NOT NULL,
+            phone TEXT,
+            message TEXT,
+            type TEXT,
+            status TEXT,
+            client TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_messages_day ON messages (day);
+        CREATE INDEX IF NOT EXISTS idx_messages_phone ON messages (phone, day);
+        CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages (timestamp);
+
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            business TEXT,
+            contact TEXT,
+            phone TEXT,
+            plan TEXT NOT NULL,
+            price INTEGER NOT NULL,
+            join_date TEXT,
+            status TEXT NOT NULL DEFAULT 'active'
+        );
+        CREATE INDEX IF NOT EXISTS idx_clients_plan ON clients (plan);
+        CREATE INDEX IF NOT EXISTS idx_clients_phone ON clients (phone);
+
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    CONTACT_FIELDS = ("phone", "name", "country_code", "group", "added_at")
+    CLIENT_FIELDS = ("business", "contact", "phone", "plan", "price", "join_date", "status")
+
+    def __init__(self, db_file: str = "skybot.db", normalize: Optional[Callable[[str], str]] = None):
+        if sqlite3 is None:
+            raise RuntimeError("sqlite3 is not available in this Python build")
+
+        self.db_file = db_file
+        self.normalize = normalize or (lambda phone: phone)
+        self.is_new = not os.path.exists(db_file)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        had_meta = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meta'"
+        ).fetchone() is not None
+        self._conn.executescript(self.SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(messages)")}
+        if "client" not in columns:
+            self._conn.execute("ALTER TABLE messages ADD COLUMN client TEXT")
+        if not self.is_new and not had_meta:
+            # Databases from before the marker existed finished their import when they were created
+            self._set_meta("legacy_imported", datetime.now().isoformat())
+
+        # Set once import_legacy committed; an interrupted import runs again
+        self.legacy_imported = self._get_meta("legacy_imported") is not None
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def add_contact(self, contact: Dict) -> bool:
+        row = [contact.get(field) for field in self.CONTACT_FIELDS]
+        row[0] = self.normalize(contact["phone"])
+        row[3] = contact.get("group") or "general"
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO contacts (phone, name, country_code, "group", added_at) '
+                'VALUES (?, ?, ?, ?, ?)', row
+            )
+            return cursor.rowcount == 1
+
+    def get_contact(self, phone: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM contacts WHERE phone = ?", (self.normalize(phone),))
+        return rows[0] if rows else None
+
+    def contacts_in_group(self, group: str) -> List[Dict]:
+        return self._query('SELECT * FROM contacts WHERE "group" = ? ORDER BY rowid', (group,))
+
+    def all_contacts(self) -> List[Dict]:
+        return self._query("SELECT * FROM contacts ORDER BY rowid")
+
+    def contacts_page(self, offset: int = 0, limit: int = 100, group: Optional[str] = None) -> List[Dict]:
+        if group is not None:
+            return self._query('SELECT * FROM contacts WHERE "group" = ? ORDER BY rowid LIMIT ? OFFSET ?',
+                               (group, limit, offset))
+        return self._query("SELECT * FROM contacts ORDER BY rowid LIMIT ? OFFSET ?", (limit, offset))
+
+    def contact_count(self, group: Optional[str] = None) -> int:
+        if group is not None:
+            return self._query('SELECT COUNT(*) AS n FROM contacts WHERE "group" = ?', (group,))[0]["n"]
+        return self._query("SELECT COUNT(*) AS n FROM contacts")[0]["n"]
+
+    def add_contacts(self, contacts: List[Dict]) -> int:
+        rows = [
+            (self.normalize(c["phone"]), c.get("name"), c.get("country_code"),
+             c.get("group") or "general", c.get("added_at"))
+            for c in contacts
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO contacts (phone, name, country_code, "group", added_at) '
+                'VALUES (?, ?, ?, ?, ?)', rows
+            )
+            return self._conn.total_changes - before
+
+    def _iter_table(self, sql: str, page_size: int = 1000) -> Iterator[Dict]:
+        """Keyset-paginated scan so the lock is only held per page"""
+        last = 0
+        while True:
+            rows = self._query(sql, (last, page_size))
+            if not rows:
+                return
+            for row in rows:
+                last = row.pop("_key")
+                yield row
+
+    def iter_contacts(self) -> Iterator[Dict]:
+        return self._iter_table("SELECT rowid AS _key, * FROM contacts WHERE rowid > ? ORDER BY rowid LIMIT ?")
+
+    def log_message(self, entry: Dict):
+        self.log_messages([entry])
+
+    def log_messages(self, entries: List[Dict]):
+        """Insert many log entries in one transaction"""
+        rows = [
+            (e["timestamp"], e["timestamp"][:10], e.get("phone"), e.get("message"),
+             e.get("type"), e.get("status"), e.get("client"))
+            for e in entries
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (timestamp, day, phone, message, type, status, client) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def messages_on(self, day: Optional[str] = None) -> Iterator[Dict]:
+        return iter(self._query(
+            "SELECT timestamp, phone, message, type, status, client FROM messages WHERE day = ? ORDER BY id",
+            (self._today(day),)
+        ))
+
+    def message_count(self, day: Optional[str] = None, status: Optional[str] = None) -> int:
+        if status is not None:
+            return self._query("SELECT COUNT(*) AS n FROM messages WHERE day = ? AND status = ?",
+                               (self._today(day), status))[0]["n"]
+        return self._query("SELECT COUNT(*) AS n FROM messages WHERE day = ?", (self._today(day),))[0]["n"]
+
+    def total_message_count(self) -> int:
+        return self._query("SELECT COUNT(*) AS n FROM messages")[0]["n"]
+
+    def message_days(self, since: Optional[str] = None) -> List[str]:
+        rows = self._query("SELECT DISTINCT day FROM messages WHERE day >= ? ORDER BY day", (since or "",))
+        return [row["day"] for row in rows]
+
+    def message_day_counts(self, since: Optional[str] = None) -> Dict[str, int]:
+        rows = self._query("SELECT day, COUNT(*) AS n FROM messages WHERE day >= ? GROUP BY day ORDER BY day",
+                           (since or "",))
+        return {row["day"]: row["n"] for row in rows}
+
+    def add_client(self, client: Dict) -> Dict:
+        return self.add_clients([client])[0]
+
+    def add_clients(self, clients: List[Dict]) -> List[Dict]:
+        added = []
+        with self._lock, self._conn:
+            for client in clients:
+                cursor = self._conn.execute(
+                    "INSERT INTO clients (business, contact, phone, plan, price, join_date, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [client.get(field) for field in self.CLIENT_FIELDS[:-1]] + [client.get("status", "active")]
+                )
+                added.append(dict(client, id=cursor.lastrowid))
+        return added
+
+    def iter_clients(self) -> Iterator[Dict]:
+        return self._iter_table("SELECT id AS _key, * FROM clients WHERE id > ? ORDER BY id LIMIT ?")
+
+    def get_client(self, client_id: int) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM clients WHERE id = ?", (client_id,))
+        return rows[0] if rows else None
+
+    def update_client(self, client_id: int, **fields) -> bool:
+        columns = [name for name in fields if name in self.CLIENT_FIELDS]
+        if not columns:
+            return False
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE clients SET {assignments} WHERE id = ?",
+                [fields[name] for name in columns] + [client_id]
+            )
+            return cursor.rowcount == 1
+
+    def remove_client(self, client_id: int) -> bool:
+        # AUTOINCREMENT: SQLite never reuses a deleted id
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM clients WHERE id = ?", (client_id,)).rowcount == 1
+
+    def all_clients(self) -> List[Dict]:
+        return self._query("SELECT * FROM clients ORDER BY id")
+
+    def clients_by_plan(self, plan: str) -> List[Dict]:
+        return self._query("SELECT * FROM clients WHERE plan = ? ORDER BY id", (plan,))
+
+    def monthly_income(self) -> int:
+        return self._query("SELECT COALESCE(SUM(price), 0) AS n FROM clients WHERE status = 'active'")[0]["n"]
+
+    def import_legacy(self, contacts_file: str, log_dir: str, clients_file: str):
+        """
+        Copy data from the JSON-file layout into a freshly created database
+
+        Contacts and clients are inserted with OR IGNORE; log entries from an
+        earlier, interrupted import are dropped first so a re-run does not
+        duplicate them. The meta marker is written last.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages")
+
+        if os.path.exists(contacts_file):
+            with open(contacts_file, "r") as f:
+                for contact in json.load(f):
+                    self.add_contact(contact)
+
+        if os.path.exists(log_dir) or os.path.exists(log_dir + ".json"):
+            log = MessageLog(log_dir)
+            migrate_json_log(log_dir + ".json", log)
+            batch = []
+            for entry in log.iter_records():
+                batch.append(entry)
+                if len(batch) >= 1000:
+                    self.log_messages(batch)
+                    batch = []
+            self.log_messages(batch)
+            log.close()
+
+        if os.path.exists(clients_file):
+            with open(clients_file, "r") as f:
+                clients = json.load(f)
+            with self._lock, self._conn:
+                for client in clients:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO clients (id, business, contact, phone, plan, price, join_date, status) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [client.get("id")] + [client.get(field) for field in self.CLIENT_FIELDS]
+                    )
+
+        self._set_meta("legacy_imported", datetime.now().isoformat())
+        self.legacy_imported = True
+        logger.info(f"Imported existing JSON data into {self.db_file}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_storage(kind: str = "sqlite", db_file: str = "skybot.db", contacts_file: str = "contacts.json",
+                 log_dir: str = "message_log", clients_file: str = "clients.json",
+                 normalize: Optional[Callable[[str], str]] = None) -> StorageBackend:
+    """
+    Open a storage backend
+
+    A new SQLite database is seeded from any existing JSON files; an
+    import that was interrupted runs again on the next open. When sqlite3
+    is missing the JSON backend is used instead.
+
+    Args:
+        kind: "sqlite" or "json"
+        db_file: SQLite database path
+        contacts_file: JSON contacts file (JSON backend / legacy import)
+        log_dir: Message log segment directory; <log_dir>.json is the legacy array log
+        clients_file: JSON clients file (JSON backend / legacy import)
+        normalize: Phone number normalizer used as the contact key
+    """
+    if kind == "sqlite" and sqlite3 is None:
+        logger.warning("sqlite3 not available, falling back to JSON storage")
+        kind = "json"
+
+    if kind == "json":
+        return JSONBackend(contacts_file, log_dir, clients_file, normalize)
+
+    if kind == "sqlite":
+        backend = SQLiteBackend(db_file, normalize)
+        if not backend.legacy_imported:
+            backend.import_legacy(contacts_file, log_dir, clients_file)
+        return backend
+
+    raise ValueError(f"Unknown storage backend: {kind}")
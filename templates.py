@@ -0,0 +1,191 @@
+"""
+Sky Bot - Message templates
+Templates are parsed once with string.Formatter and cached by id; a record
+with every field set is rendered with one str.format_map call
+"""
+
+import json
+import os
+import threading
+import logging
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TemplateId = Union[int, str]
+
+
+class CompiledTemplate:
+    def __init__(self, content: str, template_id: Optional[TemplateId] = None,
+                 category: Optional[str] = None, defaults: Optional[Dict] = None):
+        """
+        Compile a template
+
+        Placeholders use str.format syntax: "Hi {name}, your plan is {plan}".
+        Format specs work too ("{price:,}"); literal braces are "{{" / "}}".
+        A None value renders as empty text; a placeholder with no value at
+        all is left in the text as written (and logged once).
+
+        Args:
+            content: Template text
+            template_id: Id in the template store
+            category: Category (greeting, info, status, ...)
+            defaults: Values used when a record lacks a field
+        """
+        self.id = template_id
+        self.category = category
+        self.content = content
+        self.defaults = dict(defaults or {})
+        self.fields: List[str] = []
+        # (literal, field, spec, conversion, placeholder as written) per occurrence
+        self._parts: List[Tuple[str, Optional[str], str, Optional[str], str]] = []
+        self._reported = set()
+
+        try:
+            parsed = list(Formatter().parse(content))
+        except ValueError:
+            # Stray brace: not a template, send the text as is
+            parsed = [(content, None, None, None)]
+
+        for literal, field, spec, conversion in parsed:
+            if field is not None and field not in self.fields:
+                self.fields.append(field)
+            raw = "" if field is None else (
+                "{" + field + ("!" + conversion if conversion else "") + (":" + spec if spec else "") + "}"
+            )
+            self._parts.append((literal, field, spec or "", conversion, raw))
+
+        # format_map reads "{0}" / "{a.b}" as positional / attribute lookups,
+        # so templates with such fields always take the per-part path
+        self._mappable = all(field.isidentifier() for field in self.fields)
+
+    @property
+    def is_static(self) -> bool:
+        """True if the template has no placeholders"""
+        return not self.fields
+
+    def _unknown(self, field: str, raw: str) -> str:
+        if field not in self._reported:
+            self._reported.add(field)
+            logger.warning(f"Template {self.id if self.id is not None else repr(self.content[:40])} "
+                           f"has no value for {{{field}}}; leaving it as written")
+        return raw
+
+    def render(self, record: Optional[Dict] = None, **extra) -> str:
+        """
+        Render for one recipient
+
+        Args:
+            record: Contact or client dict
+            extra: Additional or overriding fields
+        """
+        if not self.fields:
+            return self.content
+
+        context = record or {}
+        if self.defaults or extra:
+            context = {**self.defaults, **context, **extra}
+
+        # Common case: every field is set, so the text is one format_map call
+        if self._mappable:
+            for field in self.fields:
+                if context.get(field) is None:
+                    break
+            else:
+                try:
+                    return self.content.format_map(context)
+                except (ValueError, TypeError):
+                    # e.g. "{price:,}" of a text value; the per-part path falls back to str
+                    pass
+
+        pieces = []
+        for literal, field, spec, conversion, raw in self._parts:
+            pieces.append(literal)
+            if field is None:
+                continue
+            if field not in context:
+                pieces.append(self._unknown(field, raw))
+                continue
+            value = context[field]
+            if value is None:
+                continue
+            if conversion:
+                value = {"r": repr, "s": str, "a": ascii}[conversion](value)
+            try:
+                pieces.append(format(value, spec))
+            except (ValueError, TypeError):
+                # One odd record must not abort a broadcast
+                pieces.append(str(value))
+        return "".join(pieces)
+
+
+@lru_cache(maxsize=256)
+def compile_template(content: str) -> CompiledTemplate:
+    """Compile ad-hoc message text (e.g. typed into the menu), cached by content"""
+    return CompiledTemplate(content)
+
+
+class TemplateStore:
+    def __init__(self, messages_file: str = "messages.json"):
+        """
+        Template cache backed by messages.json
+
+        Entries in the file look like {"id": 1, "content": "...", "category": "..."}.
+        The file is re-read when its mtime changes.
+
+        Args:
+            messages_file: JSON template file
+        """
+        self.messages_file = messages_file
+        self._lock = threading.Lock()
+        self._builtin: Dict[TemplateId, CompiledTemplate] = {}
+        self._loaded: Dict[TemplateId, CompiledTemplate] = {}
+        self._mtime = None
+
+    def register(self, template_id: TemplateId, content: str, category: Optional[str] = None,
+                 defaults: Optional[Dict] = None) -> CompiledTemplate:
+        """Add a template defined in code (messages.json entries with the same id win)"""
+        template = CompiledTemplate(content, template_id, category, defaults)
+        with self._lock:
+            self._builtin[template_id] = template
+        return template
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.messages_file)
+        except OSError:
+            self._loaded, self._mtime = {}, None
+            return
+
+        if mtime == self._mtime:
+            return
+
+        with open(self.messages_file, "r") as f:
+            entries = json.load(f)
+        self._loaded = {
+            entry["id"]: CompiledTemplate(entry["content"], entry["id"], entry.get("category"))
+            for entry in entries
+        }
+        self._mtime = mtime
+
+    def get(self, template_id: TemplateId) -> Optional[CompiledTemplate]:
+        """Compiled template by id"""
+        with self._lock:
+            self._refresh()
+            return self._loaded.get(template_id) or self._builtin.get(template_id)
+
+    def by_category(self, category: str) -> List[CompiledTemplate]:
+        """All templates in a category"""
+        with self._lock:
+            self._refresh()
+            templates = {**self._builtin, **self._loaded}
+        return [t for t in templates.values() if t.category == category]
+
+    def render(self, template_id: TemplateId, record: Optional[Dict] = None, **extra) -> str:
+        """Render a template by id"""
+        template = self.get(template_id)
+        if template is None:
+            raise KeyError(f"Unknown template: {template_id}")
+        return template.render(record, **extra)
@@ -0,0 +1,277 @@
+"""
+Sky Bot - Multi-tenant runtime
+Hosts one SkyWhatsAppBot per SkyBot Pro client in a single process, each
+with its own data directory, config and outbox, and shares the send
+capacity between them fairly
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Union
+
+from dispatch import TokenBucket
+from storage import StorageBackend
+from transport import Transport
+from Sky import SkyWhatsAppBot
+from SkyBot_Pro import SERVICES
+
+logger = logging.getLogger(__name__)
+
+TransportFactory = Callable[[str, str], Transport]
+
+
+def _raise_file_limit():
+    """Each tenant keeps a few SQLite files open; lift the soft fd limit to the hard one"""
+    try:
+        import resource
+
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+class TenantRuntime:
+    def __init__(self, base_dir: str = "tenants", transport: Union[str, TransportFactory] = "web",
+                 storage: str = "sqlite", rate: float = 1.0, burst: float = 5, workers: int = 4,
+                 idle_wait: float = 1.0):
+        """
+        Initialize the runtime
+
+        Each tenant lives in base_dir/<client id>/ with a config.json, its
+        own database, outbox, scheduled jobs and usage counters.
+
+        Args:
+            base_dir: Parent directory of the tenant directories
+            transport: Transport kind for every tenant ("web" keeps a browser
+                profile per tenant), or factory(client_id, tenant_dir) -> Transport
+            storage: Storage backend for tenants, "sqlite" or "json"
+            rate: Messages per second for the whole process, shared by all tenants
+            burst: Messages that may go out back-to-back before the rate applies
+            workers: Concurrent senders (each tenant has at most one message in flight)
+            idle_wait: Seconds to wait before rescanning when every outbox is empty
+        """
+        self.base_dir = base_dir
+        self.transport = transport
+        self.storage = storage
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = workers
+        self.idle_wait = idle_wait
+
+        self._lock = threading.Lock()
+        self._bots: Dict[str, SkyWhatsAppBot] = {}
+        self._order: List[str] = []
+        self._cursor = 0
+        self._busy = set()
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        os.makedirs(base_dir, exist_ok=True)
+        _raise_file_limit()
+
+    def _tenant_dir(self, client_id: str) -> str:
+        return os.path.join(self.base_dir, client_id)
+
+    def add_tenant(self, client: Dict) -> SkyWhatsAppBot:
+        """
+        Start hosting a SkyBot Pro client
+
+        A config.json is written on first use from the client record; edit
+        its "bot" settings (see SkyWhatsAppBot.CONFIG_KEYS) to change the
+        tenant's number, country code or send rate. The quota always follows
+        the record's plan and status, so calling this again for a hosted
+        client applies a plan change.
+
+        Args:
+            client: Client record with id, business, phone and plan
+
+        Returns:
+            The tenant's bot
+        """
+        client_id = str(client["id"])
+        with self._lock:
+            bot = self._bots.get(client_id)
+        if bot is not None:
+            self._apply_plan(bot, client)
+            return bot
+
+        tenant_dir = self._tenant_dir(client_id)
+        config_file = os.path.join(tenant_dir, "config.json")
+        os.makedirs(tenant_dir, exist_ok=True)
+
+        if os.path.exists(config_file):
+            with open(config_file, "r") as f:
+                config = json.load(f)
+        else:
+            config = {
+                "business": client.get("business", ""),
+                "plan": client.get("plan", "basic"),
+                "bot": {"your_number": client.get("phone", "")}
+            }
+            with open(config_file, "w") as f:
+                json.dump(config, f, indent=4)
+
+        transport = self.transport(client_id, tenant_dir) if callable(self.transport) else self.transport
+        bot = SkyWhatsAppBot(storage=self.storage, transport=transport, data_dir=tenant_dir,
+                             config=config.get("bot"))
+
+        self._apply_plan(bot, client)
+        # Due jobs go through the tenant's outbox and count against its quota
+        bot.scheduler.run_job = functools.partial(self._run_job, client_id, bot)
+
+        with self._lock:
+            if client_id in self._bots:
+                bot.close()
+                return self._bots[client_id]
+            self._bots[client_id] = bot
+            self._order.append(client_id)
+            running = bool(self._threads)
+        if running:
+            bot.scheduler.start()
+
+        logger.info(f"Hosting tenant {client_id} ({config.get('business', '')})")
+        self._wakeup.set()
+        return bot
+
+    @staticmethod
+    def _apply_plan(bot: SkyWhatsAppBot, client: Dict):
+        """Set the tenant's monthly limit from the client record (0 unless active)"""
+        active = client.get("status", "active") == "active"
+        limit = SERVICES.get(client.get("plan", "basic"), {}).get("quota") if active else 0
+        bot.quota.set_limit(str(client["id"]), limit)
+
+    def load_clients(self, clients: StorageBackend) -> int:
+        """Host every active client in a SkyBot Pro store; returns the number added"""
+        added = 0
+        for client in clients.iter_clients():
+            if client.get("status") == "active" and str(client["id"]) not in self._bots:
+                self.add_tenant(client)
+                added += 1
+        return added
+
+    def get(self, client_id) -> SkyWhatsAppBot:
+        """The bot of a hosted tenant"""
+        with self._lock:
+            return self._bots[str(client_id)]
+
+    def tenant_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._order)
+
+    def remove_tenant(self, client_id):
+        """Stop hosting a tenant; its queued messages stay in its outbox"""
+        client_id = str(client_id)
+        with self._lock:
+            bot = self._bots.pop(client_id, None)
+            if bot is None:
+                return
+            self._order.remove(client_id)
+            self._cursor = 0
+        # Let an in-flight send finish before closing
+        while client_id in self._busy:
+            time.sleep(0.05)
+        bot.close()
+
+    def queue_message(self, client_id, phone_number: str, message: str,
+                      file_path: Optional[str] = None) -> Optional[int]:
+        """Queue a message from a tenant (counted against its plan quota)"""
+        message_id = self.get(client_id).queue_message(phone_number, message, file_path, client_id=str(client_id))
+        self._wakeup.set()
+        return message_id
+
+    def queue_broadcast(self, client_id, phone_numbers: List[str], message: str,
+                        broadcast_id: Optional[str] = None) -> int:
+        """Queue a broadcast from a tenant (counted against its plan quota)"""
+        queued = self.get(client_id).queue_broadcast(phone_numbers, message, broadcast_id, client_id=str(client_id))
+        self._wakeup.set()
+        return queued
+
+    def _claim_next(self):
+        """Round robin over tenants: the next one with a due message gets to send"""
+        with self._lock:
+            candidates = len(self._order)
+
+        for _ in range(candidates):
+            with self._lock:
+                if not self._order:
+                    return None, None, None
+                self._cursor %= len(self._order)
+                client_id = self._order[self._cursor]
+                self._cursor += 1
+                if client_id in self._busy:
+                    continue
+                self._busy.add(client_id)
+                bot = self._bots[client_id]
+
+            batch = bot.outbox.claim(1)
+            if batch:
+                return client_id, bot, batch[0]
+
+            with self._lock:
+                self._busy.discard(client_id)
+
+        return None, None, None
+
+    def _work(self):
+        while not self._stopping.is_set():
+            client_id, bot, item = self._claim_next()
+            if item is None:
+                self._wakeup.clear()
+                self._wakeup.wait(self.idle_wait)
+                continue
+
+            try:
+                # The shared token is only taken once the tenant's quota lets the message out
+                bot.outbox.process(item, functools.partial(bot._deliver_queued, before_send=self.bucket.acquire))
+            finally:
+                with self._lock:
+                    self._busy.discard(client_id)
+
+    def _run_job(self, client_id: str, bot: SkyWhatsAppBot, job: Dict):
+        """Scheduler callback of a tenant: queue the job's message for that tenant"""
+        bot._run_scheduled_job(job, client_id=client_id)
+        self._wakeup.set()
+
+    def start(self):
+        """Start the shared send workers and every tenant's scheduler"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for i in range(max(1, self.workers)):
+                self._threads.append(threading.Thread(target=self._work, name=f"tenant-send-{i}", daemon=True))
+            threads = list(self._threads)
+            bots = list(self._bots.values())
+        for thread in threads:
+            thread.start()
+        # Each scheduler sleeps until its own next job is due
+        for bot in bots:
+            bot.scheduler.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the workers after their current message, and the schedulers"""
+        self._stopping.set()
+        self._wakeup.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+            bots = list(self._bots.values())
+        for bot in bots:
+            bot.scheduler.stop()
+        for thread in threads:
+            thread.join(timeout)
+
+    def close(self):
+        """Stop and close every tenant"""
+        self.stop()
+        with self._lock:
+            bots = list(self._bots.values())
+            self._bots, self._order = {}, []
+        for bot in bots:
+            bot.close()
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The bot's modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Run every test in its own directory: the bots write their data files to the cwd"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,82 @@
+import pytest
+
+from analytics import MessageAnalytics
+from storage import open_storage
+
+
+def entry(day, phone="27711111111", status="sent", client=None, hour=12):
+    return {"timestamp": f"{day}T{hour:02d}:00:00", "phone": phone, "message": "hi", "type": "instant",
+            "status": status, "client": client}
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def storage(request):
+    storage = open_storage(request.param)
+    yield storage
+    storage.close()
+
+
+def test_finished_days_are_compacted_once(storage):
+    storage.log_messages([entry("2026-10-01"), entry("2026-10-02")])
+    analytics = MessageAnalytics(storage)
+
+    assert analytics.compact(until="2026-10-18") == 2
+    assert analytics.compacted_days() == ["2026-10-01", "2026-10-02"]
+    assert analytics.compact(until="2026-10-18") == 0
+
+
+def test_today_is_read_live_and_not_compacted(storage):
+    storage.log_messages([entry("2026-10-01"), entry("2026-10-18")])
+    analytics = MessageAnalytics(storage)
+
+    analytics.compact(until="2026-10-18")
+
+    assert analytics.compacted_days() == ["2026-10-01"]
+    assert len(analytics.frame()) == 2
+
+
+def test_late_rows_for_a_compacted_day_are_counted(storage):
+    storage.log_messages([entry("2026-10-02", phone=f"2771111{n:04d}") for n in range(10)])
+    analytics = MessageAnalytics(storage)
+    assert analytics.summary(start="2026-10-02", end="2026-10-02")["messages"] == 10
+
+    storage.log_message(entry("2026-10-02", phone="27722222222"))
+
+    assert analytics.summary(start="2026-10-02", end="2026-10-02")["messages"] == 11
+    assert analytics.top_recipients(limit=20, start="2026-10-02", end="2026-10-02")[-1]["messages"] == 1
+    assert MessageAnalytics(storage).summary(start="2026-10-02", end="2026-10-02")["messages"] == 11
+
+
+def test_report_breakdowns(storage):
+    storage.log_messages([
+        entry("2026-10-01", client="1", hour=9),
+        entry("2026-10-01", client="1", status="failed", hour=9),
+        entry("2026-10-02", phone="27722222222", client="2", hour=15),
+        entry("2026-10-02", phone="27722222222", hour=15),
+    ])
+    analytics = MessageAnalytics(storage)
+
+    report = analytics.report(start="2026-10-01", end="2026-10-02")
+
+    assert report["summary"]["messages"] == 4
+    assert report["summary"]["sent"] == 3
+    assert report["summary"]["failed"] == 1
+    assert report["by_hour"] == {15: 2, 9: 1}
+    assert report["by_client"] == {"1": 1, "2": 1, "-": 1}
+    assert sorted(r["phone"] for r in report["top_recipients"]) == ["27711111111", "27722222222"]
+    assert analytics.success_rate(client="1") == 0.5
+
+
+def test_day_range_and_client_filter(storage):
+    storage.log_messages([entry("2026-10-01", client="1"), entry("2026-10-02", client="1"),
+                          entry("2026-10-03", client="2")])
+    analytics = MessageAnalytics(storage)
+
+    assert len(analytics.frame(start="2026-10-02")) == 2
+    assert len(analytics.frame(end="2026-10-02", client="1")) == 2
+    assert analytics.sends_by("day", start="2026-10-03") == {"2026-10-03": 1}
+
+
+def test_unknown_breakdown_is_rejected(storage):
+    with pytest.raises(ValueError):
+        MessageAnalytics(storage).sends_by("weekday")
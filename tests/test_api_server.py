@@ -0,0 +1,154 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+import requests
+
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def api(workdir):
+    # Imported here: Sky opens whatsapp_bot.log in the cwd on import
+    from api_server import ApiServer
+    from Sky import SkyWhatsAppBot
+
+    bot = SkyWhatsAppBot(transport="mock")
+    (workdir / "uploads").mkdir()
+    (workdir / "uploads" / "photo.png").write_bytes(b"png")
+    (workdir / "secret.txt").write_text("secret")
+
+    server = ApiServer(bot, port=0, token=TOKEN, uploads_dir="uploads")
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {TOKEN}"
+    session.base = f"http://127.0.0.1:{server.port}"
+    session.server = server
+    yield session
+
+    session.close()
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    bot.close()
+
+
+def post(api, path, payload=None, **kwargs):
+    return api.post(api.base + path, json=payload, **kwargs)
+
+
+def test_token_is_required_by_default():
+    from api_server import ApiServer
+
+    with pytest.raises(ValueError):
+        ApiServer(bot=None)
+
+
+def test_wrong_token_is_401(api):
+    response = requests.post(api.base + "/messages", json={"phone": "0712345678", "message": "hi"},
+                             headers={"Authorization": "Bearer nope"})
+
+    assert response.status_code == 401
+
+
+def test_missing_token_is_401(api):
+    response = requests.post(api.base + "/messages", json={"phone": "0712345678", "message": "hi"})
+
+    assert response.status_code == 401
+
+
+def test_valid_message_is_queued(api):
+    response = post(api, "/messages", {"phone": "0712345678", "message": "hi"})
+
+    assert response.status_code == 200
+    assert api.server.bot.outbox.counts()["pending"] == 1
+
+
+def test_non_json_body_is_415(api):
+    response = api.post(api.base + "/messages", data="phone=0712345678&message=hi",
+                        headers={"Content-Type": "application/x-www-form-urlencoded"})
+
+    assert response.status_code == 415
+
+
+@pytest.mark.parametrize("path, payload", [
+    ("/messages", {"message": "no phone"}),
+    ("/messages", ["not", "an", "object"]),
+    ("/schedule", {"phone": "0712345678", "message": "hi", "hour": "x", "minute": 1}),
+    ("/schedule", {"phone": "0712345678", "message": "hi", "minute": 1}),
+    ("/broadcast", {"message": "hi", "phones": "0712345678"}),
+    ("/contacts", {"contacts": [{"name": "no phone"}]}),
+    ("/messages", {"phone": 711111111, "message": "hi"}),
+    ("/messages", {"phone": "0712345678", "message": {"text": "hi"}}),
+    ("/messages/batch", {"messages": [{"phone": 711111111, "message": "hi"}]}),
+    ("/broadcast", {"message": "hi", "phones": [711111111]}),
+    ("/broadcast", {"message": 42, "phones": ["0712345678"]}),
+    ("/contacts", {"contacts": "abc"}),
+    ("/contacts", {"contacts": ["0712345678"]}),
+    ("/contacts", {"contacts": [{"phone": 711111111}]}),
+    ("/contacts", ["not", "an", "object"]),
+    ("/clients", {"business": "Acme", "phone": 711111111}),
+])
+def test_bad_fields_are_400(api, path, payload):
+    response = post(api, path, payload)
+
+    assert response.status_code == 400
+    assert response.json()["error"]
+
+
+def test_invalid_json_is_400(api):
+    response = api.post(api.base + "/messages", data="{not json",
+                        headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("file_path", ["../secret.txt", "/etc/passwd", "missing.png"])
+def test_attachments_outside_uploads_are_400(api, file_path):
+    response = post(api, "/messages", {"phone": "0712345678", "message": "hi", "file_path": file_path})
+
+    assert response.status_code == 400
+    assert api.server.bot.outbox.counts()["pending"] == 0
+
+
+def test_attachment_inside_uploads_is_accepted(api):
+    response = post(api, "/messages", {"phone": "0712345678", "message": "hi", "file_path": "photo.png"})
+
+    assert response.status_code == 200
+
+
+def test_bad_paging_is_400(api):
+    assert api.get(api.base + "/contacts", params={"limit": "abc"}).status_code == 400
+
+
+def test_contacts_are_paged(api):
+    post(api, "/contacts", {"contacts": [{"phone": f"07100000{i:02d}", "group": "g"} for i in range(5)]})
+
+    page = api.get(api.base + "/contacts", params={"group": "g", "limit": 2, "offset": 2}).json()
+
+    assert page["total"] == 5
+    assert len(page["contacts"]) == 2
+
+
+def test_short_body_is_400(api):
+    with socket.create_connection(("127.0.0.1", api.server.port), timeout=5) as conn:
+        conn.sendall(b"POST /messages HTTP/1.1\r\nAuthorization: Bearer " + TOKEN.encode()
+                     + b"\r\nContent-Type: application/json\r\nContent-Length: 50\r\n\r\n{\"a\": 1}")
+        conn.shutdown(socket.SHUT_WR)
+        status_line = conn.recv(200).split(b"\r\n")[0]
+
+    assert status_line == b"HTTP/1.1 400 Bad Request"
+
+
+def test_group_broadcast_checks_the_queue_for_every_recipient(api):
+    post(api, "/contacts", {"contacts": [{"phone": f"07100000{i:02d}", "group": "g"} for i in range(3)]})
+    api.server.max_queue = 2
+
+    response = post(api, "/broadcast", {"message": "hi", "group": "g"})
+
+    assert response.status_code == 429
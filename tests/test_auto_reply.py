@@ -0,0 +1,97 @@
+import pytest
+
+from auto_reply import AutoReplyEngine, FileSource, RuleSet, _literal_prefix, parse_inbound_line
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def engine(sent):
+    def reply(phone, text, client_id=None):
+        sent.append((phone, text, client_id))
+
+    return AutoReplyEngine(reply, "auto_replies.json", cooldown=60)
+
+
+def test_keywords_win_over_regexes_and_first_keyword_wins():
+    rules = RuleSet([
+        {"match": "regex", "pattern": r"price\w*", "reply": "regex"},
+        {"match": "keyword", "pattern": "price list", "reply": "phrase"},
+        {"match": "keyword", "pattern": "list", "reply": "word"},
+        {"match": "default", "reply": "fallback"},
+    ])
+
+    assert rules.match("Send me the PRICE LIST please")[0] == 1
+    assert rules.match("what prices?")[0] == 0
+    assert rules.match("hello")[0] == 3
+
+
+def test_earliest_regex_match_wins_with_its_named_groups():
+    rules = RuleSet([
+        {"match": "regex", "pattern": r"book (?P<day>\w+)", "reply": "a"},
+        {"match": "regex", "pattern": r"order #(?P<number>[0-9]+)", "reply": "b"},
+        {"match": "regex", "pattern": r"(\w)\1", "reply": "c"},
+    ])
+
+    assert rules.match("order #42 then book monday") == (1, {"number": "42"})
+    assert rules.match("book friday") == (0, {"day": "friday"})
+    assert rules.match("zz book x")[0] == 2
+    assert rules.match("nothing here") is None
+
+
+def test_literal_prefix():
+    assert _literal_prefix("order #[0-9]+") == "order "
+    assert _literal_prefix("orders?") == "order"
+    assert _literal_prefix("a|b") == ""
+
+
+def test_reply_goes_out_under_the_rule_sets_client(engine, sent):
+    engine.add_rule("hours", "Open 9-5, {phone}", client="7")
+    engine.add_rule("hours", "Default hours")
+
+    assert engine.handle({"phone": "27711111111", "text": "Your hours?", "client": 7}) == "Open 9-5, 27711111111"
+    assert engine.handle({"phone": "27722222222", "text": "hours"}) == "Default hours"
+    assert sent == [("27711111111", "Open 9-5, 27711111111", "7"), ("27722222222", "Default hours", None)]
+
+
+def test_same_reply_waits_for_the_cooldown(engine, sent):
+    engine.add_rule("hi", "Hello")
+
+    assert engine.handle({"phone": "27711111111", "text": "hi"})
+    assert engine.handle({"phone": "27711111111", "text": "hi"}) is None
+    assert engine.handle({"phone": "27722222222", "text": "hi"})
+    assert len(sent) == 2
+
+
+def test_rules_file_changes_are_picked_up(engine, workdir):
+    engine.add_rule("hi", "Hello")
+    other = AutoReplyEngine(lambda *args, **kwargs: None, "auto_replies.json")
+
+    assert other.find_reply("hi") == "Hello"
+    assert other.rules() == [{"match": "keyword", "pattern": "hi", "reply": "Hello"}]
+
+
+def test_file_source_parses_json_and_plain_lines(engine, sent, workdir):
+    engine.add_rule("hi", "Hello {phone}")
+    (workdir / "inbox.txt").write_text('27711111111 hi there\n\n{"phone": "27722222222", "text": "hi"}\n{bad\n')
+
+    assert engine.run(FileSource("inbox.txt")) == 2
+    assert parse_inbound_line('{"text": "no phone"}') is None
+    assert [phone for phone, _, _ in sent] == ["27711111111", "27722222222"]
+
+
+def test_sky_queues_auto_replies_under_the_client():
+    # Imported here: Sky opens whatsapp_bot.log in the cwd on import
+    from Sky import SkyWhatsAppBot
+
+    bot = SkyWhatsAppBot(transport="mock", config={"send_rate": 1000, "send_burst": 100})
+    bot.auto_replies.add_rule("hours", "Open 9-5", client="7")
+
+    bot.auto_replies.handle({"phone": "0711111111", "text": "hours?", "client": "7"})
+
+    [item] = bot.outbox.claim()
+    assert item["client_id"] == "7"
+    bot.close()
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+import pytest
+
+from billing import BillingEngine
+from client_registry import ClientRegistry
+from outbox import Outbox
+from storage import open_storage
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def storage():
+    storage = open_storage("sqlite")
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def registry(storage):
+    return ClientRegistry(storage, {"basic": {"price": 500}, "pro": {"price": 1500}})
+
+
+@pytest.fixture
+def outbox():
+    box = Outbox("outbox.db")
+    yield box
+    box.close()
+
+
+def add_client(registry, joined_days_ago, plan="pro", status="active", phone="0711111111"):
+    return registry.add({"business": "Acme", "contact": "Ann", "phone": phone, "plan": plan,
+                         "price": 1500 if plan == "pro" else 500, "status": status,
+                         "join_date": (TODAY - timedelta(days=joined_days_ago)).isoformat()})
+
+
+def test_due_dates_follow_the_join_date(registry):
+    client = add_client(registry, joined_days_ago=25)
+    billing = BillingEngine(registry, "billing.db")
+
+    assert billing.next_due(client) == (TODAY + timedelta(days=5)).isoformat()
+    assert billing.due_between(None, (TODAY + timedelta(days=4)).isoformat()) == []
+    assert billing.due_between(None, (TODAY + timedelta(days=5)).isoformat()) == [client["id"]]
+    billing.close()
+
+
+def test_run_invoices_and_queues_once(registry, outbox):
+    client = add_client(registry, joined_days_ago=25)
+    add_client(registry, joined_days_ago=25, status="inactive", phone="0722222222")
+    billing = BillingEngine(registry, "billing.db", sender={"business_name": "Sky", "support_number": "1"})
+
+    totals = billing.run(outbox, window_days=7, today=TODAY)
+
+    assert totals == {"invoiced": 1, "reminded": 0, "queued": 1, "amount": 1500}
+    [invoice] = billing.invoices(client["id"])
+    assert invoice["due_date"] == (TODAY + timedelta(days=5)).isoformat()
+    [item] = outbox.claim()
+    assert item["phone"] == "27711111111"
+    assert f"Invoice #{invoice['id']}" in item["message"] and "PRO plan: R1500" in item["message"]
+
+    assert billing.run(outbox, window_days=7, today=TODAY)["invoiced"] == 0
+    assert billing.next_due(client) == (TODAY + timedelta(days=35)).isoformat()
+    billing.close()
+
+
+def test_open_invoices_get_a_reminder_then_stop_when_paid(registry, outbox):
+    client = add_client(registry, joined_days_ago=25)
+    billing = BillingEngine(registry, "billing.db")
+    billing.run(outbox, today=TODAY)
+
+    later = TODAY + timedelta(days=3)
+    assert billing.run(outbox, today=later)["reminded"] == 1
+    assert billing.run(outbox, today=later)["reminded"] == 0
+    assert billing.outstanding(today=TODAY + timedelta(days=6)) == {
+        "open": 1, "amount": 1500, "overdue": 1, "overdue_amount": 1500
+    }
+
+    [invoice] = billing.invoices(client["id"], status="open")
+    assert billing.mark_paid(invoice["id"])
+    assert not billing.mark_paid(invoice["id"])
+    assert billing.run(outbox, today=TODAY + timedelta(days=6))["reminded"] == 0
+    billing.close()
+
+
+def test_restart_keeps_the_cycle(registry, outbox):
+    client = add_client(registry, joined_days_ago=25)
+    first = BillingEngine(registry, "billing.db")
+    first.run(outbox, today=TODAY)
+    first.close()
+
+    billing = BillingEngine(registry, "billing.db")
+
+    assert billing.next_due(client) == (TODAY + timedelta(days=35)).isoformat()
+    assert billing.run(outbox, today=TODAY)["queued"] == 0
+    billing.close()
@@ -0,0 +1,76 @@
+import csv
+
+import pytest
+
+import bulk_io
+from storage import open_storage
+
+SERVICES = {"basic": {"price": 500}, "pro": {"price": 1500}}
+
+
+@pytest.fixture
+def storage():
+    storage = open_storage("sqlite")
+    yield storage
+    storage.close()
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+
+def test_contacts_are_normalized_in_chunks_and_counted(storage, workdir):
+    write_csv(workdir / "contacts.csv", [
+        ["Name", "Phone", "Group"],
+        ["Ann", "071 111 1111", "vip"],
+        ["Bo", "+27 72 222 2222", ""],
+        ["Ann dup", "27711111111", "vip"],
+        ["Bad", "12", "vip"],
+    ])
+    progress = []
+
+    totals = bulk_io.import_contacts(storage, "contacts.csv", "27", chunk_size=2, progress=progress.append)
+
+    assert totals == {"rows": 4, "added": 2, "invalid": 1, "duplicates": 1}
+    assert [p["rows"] for p in progress] == [2, 4]
+    assert storage.get_contact("27711111111")["group"] == "vip"
+    assert storage.get_contact("27722222222")["group"] == "general"
+
+
+def test_contacts_need_a_phone_column(storage, workdir):
+    write_csv(workdir / "contacts.csv", [["name"], ["Ann"]])
+
+    with pytest.raises(ValueError):
+        bulk_io.import_contacts(storage, "contacts.csv", "27")
+
+
+def test_clients_dedupe_on_normalized_phone_and_price_from_plan(storage, workdir):
+    storage.add_client({"business": "Old", "phone": "+27711111111", "plan": "basic", "price": 500,
+                        "status": "active"})
+    write_csv(workdir / "clients.csv", [
+        ["business", "phone", "plan"],
+        ["Dup", "071 111 1111", "pro"],
+        ["New", "0722222222", "PRO"],
+        ["Odd", "0733333333", "platinum"],
+    ])
+
+    totals = bulk_io.import_clients(storage, "clients.csv", SERVICES, country_code="27")
+
+    assert totals == {"rows": 3, "added": 2, "duplicates": 1}
+    assert [(c["business"], c["plan"], c["price"]) for c in storage.all_clients()][1:] == [
+        ("New", "pro", 1500), ("Odd", "basic", 500)
+    ]
+
+
+@pytest.mark.parametrize("name", ["contacts.csv", "contacts.xlsx"])
+def test_export_then_import_round_trips(storage, workdir, name):
+    storage.add_contacts([{"name": f"C{i}", "phone": f"2772000000{i}", "group": "g", "country_code": "27"}
+                          for i in range(3)])
+
+    assert bulk_io.export_contacts(storage, name) == 3
+
+    other = open_storage("json")
+    assert bulk_io.import_contacts(other, name, "27")["added"] == 3
+    assert [c["name"] for c in other.all_contacts()] == ["C0", "C1", "C2"]
+    other.close()
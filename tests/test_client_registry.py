@@ -0,0 +1,66 @@
+import pytest
+
+from client_registry import ClientRegistry
+from storage import open_storage
+
+SERVICES = {"basic": {"price": 500}, "pro": {"price": 1500}}
+
+
+@pytest.fixture
+def storage():
+    storage = open_storage("sqlite")
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def registry(storage):
+    registry = ClientRegistry(storage, SERVICES)
+    registry.add_many([
+        {"business": f"B{i}", "phone": str(i), "plan": "pro" if i % 3 == 0 else "basic",
+         "price": 1500 if i % 3 == 0 else 500, "join_date": f"2026-{9 + i % 2:02d}-01", "status": "active"}
+        for i in range(10)
+    ])
+    return registry
+
+
+def test_counts_and_pages_by_filter(registry):
+    assert registry.count() == 10
+    assert registry.count(plan="pro") == 4
+    assert registry.count(plan="basic", month="2026-09") == 3
+
+    page = registry.page(page=2, page_size=3, plan="basic")
+    assert page["total"] == 6 and page["pages"] == 2
+    assert [c["business"] for c in page["clients"]] == ["B5", "B7", "B8"]
+    assert registry.months() == {"2026-09": 5, "2026-10": 5}
+
+
+def test_revenue_totals_follow_changes(registry):
+    assert registry.monthly_income() == 4 * 1500 + 6 * 500
+
+    [first] = registry.page(page_size=1)["clients"]
+    assert registry.change_plan(first["id"], "basic")
+    assert registry.update(registry.page(page_size=1, plan="pro")["clients"][0]["id"], status="inactive")
+
+    assert registry.monthly_income() == 2 * 1500 + 7 * 500
+    assert registry.income_by_plan() == {"pro": {"clients": 2, "income": 3000},
+                                         "basic": {"clients": 7, "income": 3500}}
+
+
+def test_changes_are_written_through_to_storage(registry, storage):
+    client = registry.add({"business": "New", "phone": "99", "plan": "basic", "price": 500,
+                           "join_date": "2026-10-18", "status": "active"})
+    registry.change_plan(client["id"], "pro")
+
+    assert storage.get_client(client["id"])["plan"] == "pro"
+    assert ClientRegistry(storage).monthly_income() == registry.monthly_income()
+
+    assert registry.remove(client["id"])
+    assert registry.get(client["id"]) is None
+    assert not registry.remove(client["id"])
+    assert len(registry) == 10
+
+
+def test_unknown_plan_is_rejected(registry):
+    with pytest.raises(ValueError):
+        registry.change_plan(1, "platinum")
@@ -0,0 +1,69 @@
+import json
+import os
+import time
+
+from contact_store import ContactStore
+
+
+def digits(phone):
+    return "".join(ch for ch in phone if ch.isdigit())
+
+
+def test_phones_are_unique_after_normalizing():
+    store = ContactStore("contacts.json", normalize=digits, flush_delay=60)
+
+    assert store.add({"name": "Ann", "phone": "+27 71 111 1111", "group": "vip"})
+    assert not store.add({"name": "Ann again", "phone": "27711111111"})
+
+    assert store.get("27-71-111-1111")["name"] == "Ann"
+    assert [c["name"] for c in store.by_group("vip")] == ["Ann"]
+    assert store.count() == 1
+    store.close()
+
+
+def test_writes_are_batched_until_the_flush_delay(workdir):
+    store = ContactStore("contacts.json", flush_delay=0.05)
+    store.add({"name": "Ann", "phone": "1"})
+    store.add({"name": "Bo", "phone": "2"})
+    assert not (workdir / "contacts.json").exists()
+
+    time.sleep(0.2)
+
+    assert [c["name"] for c in json.loads((workdir / "contacts.json").read_text())] == ["Ann", "Bo"]
+    store.close()
+
+
+def test_close_flushes_pending_contacts(workdir):
+    store = ContactStore("contacts.json", flush_delay=60)
+    store.add({"name": "Ann", "phone": "1"})
+
+    store.close()
+
+    assert ContactStore("contacts.json").get("1")["name"] == "Ann"
+
+
+def test_external_edits_are_picked_up(workdir):
+    store = ContactStore("contacts.json", flush_delay=60)
+    store.add({"name": "Ann", "phone": "1"})
+    store.flush()
+
+    (workdir / "contacts.json").write_text(json.dumps([{"name": "Edited", "phone": "1", "group": "x"}]))
+    os.utime(workdir / "contacts.json", (time.time() + 5, time.time() + 5))
+
+    assert store.get("1")["name"] == "Edited"
+    assert store.by_group("x")
+    store.close()
+
+
+def test_pending_changes_win_over_external_edits(workdir):
+    store = ContactStore("contacts.json", flush_delay=60)
+    store.add({"name": "Ann", "phone": "1"})
+    store.flush()
+    store.add({"name": "Bo", "phone": "2"})
+
+    (workdir / "contacts.json").write_text("[]")
+    os.utime(workdir / "contacts.json", (time.time() + 5, time.time() + 5))
+
+    assert store.count() == 2
+    store.close()
+    assert len(json.loads((workdir / "contacts.json").read_text())) == 2
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from dispatch import BroadcastDispatcher, TokenBucket
+
+
+def test_bucket_allows_a_burst_then_the_rate():
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert 0 < bucket.try_acquire() <= 0.1
+
+
+def test_bucket_acquire_waits_for_a_token():
+    bucket = TokenBucket(rate=20, capacity=1)
+    bucket.acquire()
+
+    start = time.monotonic()
+    bucket.acquire()
+
+    assert time.monotonic() - start >= 0.03
+
+
+def test_duplicates_are_sent_once_and_results_keep_input_order():
+    sent = []
+    lock = threading.Lock()
+
+    def send(phone, message):
+        with lock:
+            sent.append((phone, message))
+        return True
+
+    dispatcher = BroadcastDispatcher(send, rate=1000, burst=100, workers=4)
+
+    results = dispatcher.dispatch(["3", "1", "3", "2"], lambda phone: f"hi {phone}")
+
+    assert list(results) == ["3", "1", "2"]
+    assert all(results.values())
+    assert sorted(sent) == [("1", "hi 1"), ("2", "hi 2"), ("3", "hi 3")]
+
+
+def test_failures_are_retried_then_reported():
+    attempts = {}
+
+    def send(phone, message):
+        attempts[phone] = attempts.get(phone, 0) + 1
+        if phone == "broken":
+            raise RuntimeError("no route")
+        return attempts[phone] > 1
+
+    dispatcher = BroadcastDispatcher(send, rate=1000, burst=100, max_retries=2, backoff_base=0.001)
+    progress = []
+
+    results = dispatcher.dispatch(["flaky", "broken"], "hi",
+                                  progress=lambda done, total, phone, ok: progress.append((done, total, ok)))
+
+    assert results == {"flaky": True, "broken": False}
+    assert attempts == {"flaky": 2, "broken": 3}
+    assert progress == [(1, 2, True), (2, 2, False)]
+
+
+def test_per_dispatch_send_overrides_the_default():
+    dispatcher = BroadcastDispatcher(lambda phone, message: False, rate=1000, burst=100)
+
+    assert dispatcher.dispatch(["1"], "hi", send=lambda phone, message: True) == {"1": True}
+
+
+def test_retry_delay_is_capped_and_jittered():
+    dispatcher = BroadcastDispatcher(lambda phone, message: True, backoff_base=2, backoff_max=5)
+
+    assert 1 <= dispatcher.retry_delay(1) <= 2
+    assert 2.5 <= dispatcher.retry_delay(10) <= 5
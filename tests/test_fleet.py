@@ -0,0 +1,70 @@
+import queue
+
+import pytest
+
+from fleet import BroadcastFleet, _deliver_shard, shard_for
+from transport import MockTransport
+
+
+def task(recipients, message="Hi {name}", report_progress=True):
+    return {"broadcast": "b1", "shard": 0, "message": message, "recipients": recipients,
+            "rate": 1000, "burst": 100, "max_retries": 0, "report_progress": report_progress}
+
+
+def test_shards_are_stable_and_in_range():
+    phones = [f"2771{i:07d}" for i in range(200)]
+
+    shards = [shard_for(phone, 4) for phone in phones]
+
+    assert shards == [shard_for(phone, 4) for phone in phones]
+    assert set(shards) == {0, 1, 2, 3}
+
+
+def test_shard_is_rendered_sent_and_logged_per_attempt():
+    transport = MockTransport()
+    events = queue.Queue()
+
+    result = _deliver_shard(transport, task([("1", {"name": "Ann"}), ("2", None)]), events)
+
+    assert result["results"] == {"1": True, "2": True}
+    assert [sent["message"] for sent in transport.sent] == ["Hi Ann", "Hi {name}"]
+    assert [(entry["phone"], entry["status"]) for entry in result["log"]] == [("1", "sent"), ("2", "sent")]
+    assert events.qsize() == 2
+
+
+def test_failed_sends_are_logged_as_failed():
+    result = _deliver_shard(MockTransport(failure_rate=1.0), task([("1", None)], "static", False), queue.Queue())
+
+    assert result["results"] == {"1": False}
+    assert [entry["status"] for entry in result["log"]] == ["failed"]
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    fleet = BroadcastFleet(2, transport="mock", rate=1e6, burst=1e6, max_retries=0)
+    yield fleet
+    fleet.close()
+
+
+def test_broadcast_covers_every_recipient_once(fleet):
+    recipients = [(f"2771{i:07d}", {"name": f"C{i}"}) for i in range(50)]
+    progress, logged = [], []
+
+    results = fleet.broadcast(recipients + recipients[:5], "Hello {name}",
+                              progress=lambda done, total, phone, ok: progress.append(done),
+                              log=logged.extend)
+
+    assert list(results) == [phone for phone, _ in recipients]
+    assert all(results.values())
+    assert sorted(progress) == list(range(1, 51))
+    assert sorted(entry["phone"] for entry in logged) == sorted(results)
+    assert {entry["message"] for entry in logged} == {f"Hello C{i}" for i in range(50)}
+
+
+def test_a_dead_worker_is_restarted(fleet):
+    fleet._processes[0].terminate()
+    fleet._processes[0].join()
+
+    results = fleet.broadcast([(f"2771{i:07d}", None) for i in range(20)], "hi")
+
+    assert all(results.values())
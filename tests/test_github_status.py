@@ -0,0 +1,100 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from github_status import GitHubStatusChecker
+
+REPO = b'{"full_name": "Sky95360/Sky_b.o.t", "stargazers_count": 7, "updated_at": "2026-01-01T00:00:00Z"}'
+
+
+class StubGitHub(BaseHTTPRequestHandler):
+    """Answers like the GitHub repos API: 200 with an ETag, 304 when it matches"""
+
+    requests = []
+    delay = 0.0
+    status = 200
+
+    def do_GET(self):
+        StubGitHub.requests.append(self.headers.get("If-None-Match"))
+        time.sleep(StubGitHub.delay)
+        if StubGitHub.status != 200:
+            self.send_response(StubGitHub.status)
+            self.send_header("X-RateLimit-Remaining", "0")
+            self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(REPO)))
+            self.end_headers()
+            self.wfile.write(REPO)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    StubGitHub.requests, StubGitHub.delay, StubGitHub.status = [], 0.0, 200
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGitHub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/repos/Sky95360/Sky_b.o.t"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fresh_status_is_served_from_cache(stub):
+    checker = GitHubStatusChecker(stub, ttl=60)
+
+    first = checker.status(block=True)
+    second = checker.status()
+
+    assert "✅ Online" in first and "Stars: 7" in first
+    assert second == first
+    assert StubGitHub.requests == [None]
+
+
+def test_stale_status_revalidates_with_etag(stub):
+    checker = GitHubStatusChecker(stub, ttl=0)
+
+    checker.status(block=True)
+    text = checker.status(block=True)
+
+    assert StubGitHub.requests == [None, '"v1"']
+    assert "Sky95360/Sky_b.o.t" in text
+
+
+def test_status_does_not_wait_for_a_slow_server(stub):
+    StubGitHub.delay = 0.5
+    checker = GitHubStatusChecker(stub, ttl=60)
+
+    start = time.monotonic()
+    text = checker.status()
+
+    assert time.monotonic() - start < 0.2
+    assert "Checking" in text
+
+
+def test_timeout_is_reported(stub):
+    StubGitHub.delay = 0.5
+    checker = GitHubStatusChecker(stub, ttl=60, timeout=0.1)
+
+    assert "❌ Error" in checker.status(block=True)
+
+
+def test_rate_limit_holds_off_refreshes(stub):
+    StubGitHub.status = 403
+    checker = GitHubStatusChecker(stub, ttl=0)
+
+    assert "Cannot access repository" in checker.status(block=True)
+    checker.status(block=True)
+    checker.status()
+
+    assert len(StubGitHub.requests) == 1
@@ -0,0 +1,92 @@
+import json
+
+from message_log import MessageLog
+from message_stats import MessageStats
+
+
+def entry(day, phone="27711111111", status="sent"):
+    return {"timestamp": f"{day}T12:00:00", "phone": phone, "message": "hi", "type": "instant", "status": status}
+
+
+def open_stats(**options):
+    log = MessageLog("message_log")
+    return log, MessageStats(log, "stats.json", **options)
+
+
+def test_records_land_in_their_own_day_segment():
+    log = MessageLog("message_log")
+    log.append(entry("2026-10-18"))
+    log.append(entry("2026-10-17"))
+    log.close()
+
+    assert [path.rsplit("/", 1)[-1] for path in log.segments()] == [
+        "2026-10-17-0000.jsonl", "2026-10-18-0000.jsonl"
+    ]
+    assert [record["timestamp"][:10] for record in log.iter_records("2026-10-17")] == ["2026-10-17"]
+
+
+def test_counts_by_day_phone_type_and_status():
+    log, stats = open_stats()
+    log.append(entry("2026-10-18"))
+    log.append(entry("2026-10-18", phone="27722222222", status="failed"))
+
+    assert stats.count("2026-10-18") == 2
+    assert stats.count("2026-10-18", status="failed") == 1
+    assert stats.count_for_phone("27722222222", "2026-10-18") == 1
+    assert stats.count_for_type("instant", "2026-10-18") == 2
+    log.close()
+
+
+def test_restart_does_not_double_count_mixed_days():
+    log = MessageLog("message_log")
+    log.append(entry("2026-10-18"))
+    # Catching up on the existing record writes the first snapshot
+    stats = MessageStats(log, "stats.json", checkpoint_every=1)
+    # A late record for an older day (midnight race, fleet batch, import)
+    log.append(entry("2026-10-17"))
+    log.close()
+
+    log, stats = open_stats()
+    assert dict(stats.by_day) == {"2026-10-17": 1, "2026-10-18": 1}
+    log.close()
+
+
+def test_restart_replays_records_after_the_last_checkpoint():
+    log, stats = open_stats(checkpoint_every=100)
+    for day in ("2026-10-18", "2026-10-17", "2026-10-18", "2026-10-16"):
+        log.append(entry(day))
+    stats.checkpoint()
+    log.append(entry("2026-10-17"))
+    log.append(entry("2026-10-18"))
+    log.close()
+
+    log, stats = open_stats()
+    assert dict(stats.by_day) == {"2026-10-16": 1, "2026-10-17": 2, "2026-10-18": 3}
+    log.close()
+
+
+def test_deltas_are_compacted_into_the_snapshot():
+    log, stats = open_stats(checkpoint_every=1, compact_every=3)
+    for i in range(10):
+        log.append(entry(f"2026-10-{1 + i % 3:02d}"))
+    log.close()
+
+    with open("stats.json.delta") as f:
+        assert sum(1 for _ in f) < 3
+    with open("stats.json") as f:
+        assert json.load(f)["generation"] == 2
+
+    log, stats = open_stats()
+    assert sum(stats.by_day.values()) == 10
+    log.close()
+
+
+def test_rebuild_recounts_from_the_log():
+    log, stats = open_stats()
+    log.append(entry("2026-10-18"))
+    stats.by_day["2026-10-18"] = 99
+
+    stats.rebuild()
+
+    assert stats.count("2026-10-18") == 1
+    log.close()
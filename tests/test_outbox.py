@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+from outbox import FAILED, IN_FLIGHT, PENDING, SENT, DeferDelivery, Outbox
+
+
+@pytest.fixture
+def outbox():
+    box = Outbox("outbox.db", max_attempts=2, retry_delay=0.05)
+    yield box
+    box.close()
+
+
+def test_message_moves_pending_in_flight_sent(outbox):
+    message_id = outbox.enqueue("27711111111", "hi")
+    assert outbox.get(message_id)["status"] == PENDING
+
+    [item] = outbox.claim()
+    assert outbox.get(message_id)["status"] == IN_FLIGHT
+    assert outbox.claim() == []
+
+    assert outbox.process(item, lambda item: True)
+    assert outbox.get(message_id)["status"] == SENT
+    assert outbox.counts() == {PENDING: 0, IN_FLIGHT: 0, SENT: 1, FAILED: 0}
+
+
+def test_failures_retry_with_backoff_then_fail(outbox):
+    message_id = outbox.enqueue("27711111111", "hi")
+
+    assert not outbox.process(outbox.claim()[0], lambda item: False)
+    row = outbox.get(message_id)
+    assert row["status"] == PENDING and row["next_attempt_at"] > time.time()
+    assert outbox.claim() == []
+
+    time.sleep(0.06)
+    outbox.process(outbox.claim()[0], lambda item: 1 / 0)
+    row = outbox.get(message_id)
+    assert row["status"] == FAILED
+    assert row["attempts"] == 2
+    assert "division by zero" in row["last_error"]
+
+
+def test_defer_gives_the_attempt_back(outbox):
+    message_id = outbox.enqueue("27711111111", "hi")
+
+    def over_quota(item):
+        raise DeferDelivery(time.time() + 60, "monthly quota used up")
+
+    assert not outbox.process(outbox.claim()[0], over_quota)
+    row = outbox.get(message_id)
+    assert row["status"] == PENDING
+    assert row["attempts"] == 0
+    assert row["last_error"] == "monthly quota used up"
+
+
+def test_dedupe_key_queues_once(outbox):
+    assert outbox.enqueue("27711111111", "hi", dedupe_key="b1:27711111111")
+    assert outbox.enqueue("27711111111", "hi", dedupe_key="b1:27711111111") is None
+    assert outbox.counts()[PENDING] == 1
+
+
+def test_restart_replays_claimed_messages():
+    box = Outbox("outbox.db")
+    never_sent = box.enqueue("27711111111", "a")
+    was_sending = box.enqueue("27722222222", "b")
+    box.claim(2)
+    box.mark_sending(was_sending)
+    box.close()
+
+    box = Outbox("outbox.db")
+    assert box.get(never_sent)["status"] == PENDING
+    assert box.get(was_sending)["status"] == PENDING
+    box.close()
+
+
+def test_restart_can_refuse_unconfirmed_sends():
+    box = Outbox("outbox.db")
+    never_sent = box.enqueue("27711111111", "a")
+    was_sending = box.enqueue("27722222222", "b")
+    box.claim(2)
+    box.mark_sending(was_sending)
+    box.close()
+
+    box = Outbox("outbox.db", resend_unconfirmed=False)
+    assert box.get(never_sent)["status"] == PENDING
+    assert box.get(was_sending)["status"] == FAILED
+    box.close()
+
+
+def test_worker_picks_up_messages_queued_by_another_process(outbox):
+    outbox.poll_interval = 0.05
+    delivered = []
+    outbox.start(lambda item: delivered.append(item["message"]) or True)
+
+    other = Outbox("outbox.db", recover=False)
+    other.enqueue("27711111111", "from the cli")
+    deadline = time.time() + 2
+    while not delivered and time.time() < deadline:
+        time.sleep(0.02)
+    other.close()
+
+    assert delivered == ["from the cli"]
+
+
+def test_menu_status_is_queued_not_sent_inline(monkeypatch):
+    # Imported here: Sky opens whatsapp_bot.log in the cwd on import
+    from Sky import SkyWhatsAppBot
+
+    bot = SkyWhatsAppBot(transport="mock", config={"send_rate": 1000, "send_burst": 100})
+    answers = iter(["7", "0711111111", "13"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    monkeypatch.setattr(bot, "start_background", lambda: None)
+    monkeypatch.setattr(bot, "check_github_status", lambda block=False: "OK")
+    monkeypatch.setattr(bot, "send_instant_message", lambda *args, **kwargs: pytest.fail("sent inline"))
+    monkeypatch.setattr(bot, "close", lambda: None)
+
+    bot.menu()
+
+    [item] = bot.outbox.claim()
+    assert item["phone"] == bot.format_phone_number("0711111111")
+    assert "OK" in item["message"]
+    monkeypatch.undo()
+    bot.close()
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+import phone_numbers
+from phone_numbers import check_recipients, format_phone, is_valid_phone, normalize_phone_series, normalize_phones
+
+SAMPLES = [
+    "0712345678",        # local, trunk 0
+    "071 234 5678",
+    "+27 71 234 5678",   # international
+    "0027712345678",     # 00 prefix
+    "27712345678",       # already formatted
+    "712345678",         # missing country code
+    "+44 7700 900123",   # other country
+    "447700900123",
+    "(071) 234-5678",
+    "12345",             # too short
+    "0000000000",
+    "+1234567890123456", # too long
+    "",
+    "abc",
+]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("0712345678", "27712345678"),
+    ("+27 71 234 5678", "27712345678"),
+    ("0027712345678", "27712345678"),
+    ("27712345678", "27712345678"),
+    ("712345678", "27712345678"),
+    ("+44 7700 900123", "447700900123"),
+])
+def test_format_phone(raw, expected):
+    assert format_phone(raw, "27") == expected
+
+
+def test_formatting_is_idempotent():
+    for raw in SAMPLES:
+        once = format_phone(raw, "27")
+        assert format_phone(once, "27") == once or not is_valid_phone(once)
+
+
+def test_vectorized_matches_scalar():
+    result = normalize_phone_series(pd.Series(SAMPLES * 3), "27")
+
+    scalar = [format_phone(raw, "27") for raw in SAMPLES * 3]
+    valid = [is_valid_phone(phone) for phone in scalar]
+    assert list(result["valid"]) == valid
+    assert [p for p, ok in zip(result["phone"], result["valid"]) if ok] == [p for p, ok in zip(scalar, valid) if ok]
+
+
+def test_normalize_phones_same_on_both_paths(monkeypatch):
+    scalar = normalize_phones(SAMPLES, "27")
+    monkeypatch.setattr(phone_numbers, "VECTORIZE_MIN", 0)
+
+    assert normalize_phones(SAMPLES, "27") == scalar
+    assert scalar[0] == "27712345678" and scalar[9] is None
+
+
+def test_series_marks_later_copies_as_duplicates():
+    result = normalize_phone_series(pd.Series(["0712345678", "+27712345678", "12", "0712345678"]), "27")
+
+    assert list(result["duplicate"]) == [False, True, False, True]
+
+
+def test_check_recipients_reports_invalid_and_duplicates():
+    report = check_recipients(["0712345678", "bad", "+27 71 234 5678", "0722222222"], "27")
+
+    assert report == {
+        "valid": ["27712345678", "27722222222"],
+        "invalid": ["bad"],
+        "duplicates": ["+27 71 234 5678"],
+    }
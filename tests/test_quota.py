@@ -0,0 +1,106 @@
+import json
+import time
+
+import pytest
+
+from quota import QuotaMeter
+
+
+@pytest.fixture
+def plans():
+    return {"1": 3, "2": None}
+
+
+@pytest.fixture
+def meter(plans):
+    quota = QuotaMeter("usage.json", limit_for=plans.get, flush_delay=0.01)
+    yield quota
+    quota.close()
+
+
+def test_reserve_grants_up_to_the_limit(meter):
+    assert meter.reserve("1", 2) == 2
+    assert meter.reserve("1", 5) == 1
+    assert not meter.try_consume("1")
+    assert meter.remaining("1") == 0
+
+
+def test_refund_gives_sends_back(meter):
+    meter.reserve("1", 3)
+    meter.refund("1", 2)
+
+    assert meter.used("1") == 1
+    assert meter.remaining("1") == 2
+
+
+def test_unlimited_plan(meter):
+    assert meter.reserve("2", 1000) == 1000
+    assert meter.remaining("2") is None
+
+
+def test_counters_survive_a_restart(meter):
+    meter.reserve("1", 2)
+    meter.close()
+
+    with open("usage.json") as f:
+        assert json.load(f)["used"] == {"1": 2}
+    assert QuotaMeter("usage.json").used("1") == 2
+
+
+def test_plan_change_applies_after_the_ttl(plans):
+    meter = QuotaMeter("usage.json", limit_for=plans.get, limit_ttl=0.05)
+    assert meter.limit("1") == 3
+
+    plans["1"] = 10
+    assert meter.limit("1") == 3
+    time.sleep(0.06)
+    assert meter.limit("1") == 10
+    meter.close()
+
+
+def test_invalidate_and_set_limit(meter, plans):
+    assert meter.limit("1") == 3
+    plans["1"] = 10
+    meter.invalidate("1")
+    assert meter.limit("1") == 10
+
+    meter.set_limit("1", 0)
+    meter.invalidate()
+    assert meter.limit("1") == 10
+    meter.set_limit("1", 0)
+    assert meter.reserve("1") == 0
+
+
+def test_broadcast_sends_are_logged_under_their_client():
+    # Imported here: Sky opens whatsapp_bot.log in the cwd on import
+    from Sky import SkyWhatsAppBot
+
+    bot = SkyWhatsAppBot(transport="mock", config={"send_rate": 1000, "send_burst": 100})
+    phones = ["0711111111", "0722222222"]
+    bot.quota.set_limit("7", 10)
+
+    results = bot.send_to_multiple_contacts(phones, "hi", client_id="7")
+
+    assert results == dict.fromkeys(phones, True)
+    assert bot.quota.used("7") == 2
+    assert [row["client"] for row in bot.storage.messages_on()] == ["7", "7"]
+    assert bot.message_report(client_id="7")["summary"]["sent"] == 2
+    bot.close()
+
+
+def test_async_broadcast_sends_are_logged_under_their_client():
+    import asyncio
+
+    from async_bot import AsyncSkyWhatsAppBot
+
+    bot = AsyncSkyWhatsAppBot(transport="mock", config={"send_rate": 1000, "send_burst": 100})
+    bot.bot.quota.set_limit("7", 1)
+
+    results = asyncio.run(bot.send_to_multiple_contacts(["0711111111", "0722222222"], "hi", client_id="7"))
+
+    assert sorted(results.values()) == [False, True]
+    assert bot.bot.quota.used("7") == 1
+    assert [row["client"] for row in bot.bot.storage.messages_on()] == ["7"]
+    asyncio.run(bot.close())
+    # The wrapper only releases its thread pool; the wrapped bot is closed by its owner
+    bot.bot.close()
@@ -0,0 +1,94 @@
+import time
+from datetime import datetime, timedelta
+
+import scheduler
+from scheduler import DAY, Scheduler
+
+
+def at(seconds: float) -> datetime:
+    return datetime.now() + timedelta(seconds=seconds)
+
+
+def stored_ids():
+    """Job ids as a fresh process would load them"""
+    reloaded = Scheduler("jobs.db")
+    try:
+        return [job["id"] for job in reloaded.jobs()]
+    finally:
+        reloaded.close()
+
+
+def test_jobs_run_in_fire_time_order():
+    ran = []
+    jobs = Scheduler("jobs.db", run_job=lambda job: ran.append(job["id"]))
+    jobs.add("late", at(-1))
+    jobs.add("early", at(-3))
+    jobs.add("future", at(60))
+
+    assert jobs.run_pending() == 2
+    assert ran == ["early", "late"]
+    assert [job["id"] for job in jobs.jobs()] == ["future"]
+    jobs.close()
+
+
+def test_replaced_and_cancelled_jobs_do_not_fire():
+    ran = []
+    jobs = Scheduler("jobs.db", run_job=lambda job: ran.append(job["message"]))
+    jobs.add("a", at(-1), message="old")
+    jobs.add("a", at(-1), message="new")
+    jobs.add("b", at(-1), message="cancelled")
+    jobs.cancel("b")
+
+    jobs.run_pending()
+
+    assert ran == ["new"]
+    jobs.close()
+
+
+def test_recurring_job_advances_and_survives_restart():
+    jobs = Scheduler("jobs.db", run_job=lambda job: None)
+    jobs.add("daily", at(-10), interval=DAY)
+    jobs.run_pending()
+    next_run = jobs.jobs()[0]["next_run"]
+    jobs.close()
+
+    assert next_run > time.time()
+    reloaded = Scheduler("jobs.db")
+    assert [(job["id"], job["next_run"]) for job in reloaded.jobs()] == [("daily", next_run)]
+    reloaded.close()
+
+
+def test_one_shot_job_is_kept_until_handed_off(monkeypatch):
+    monkeypatch.setattr(scheduler, "RETRY_DELAY", 0)
+    attempts = []
+
+    def flaky(job):
+        attempts.append(job["id"])
+        if len(attempts) == 1:
+            raise RuntimeError("outbox unavailable")
+
+    jobs = Scheduler("jobs.db", run_job=flaky)
+    jobs.add("once", at(-1))
+
+    jobs.run_pending()
+    assert stored_ids() == ["once"]
+
+    jobs.run_pending()
+    assert attempts == ["once", "once"]
+    assert len(jobs) == 0
+    assert stored_ids() == []
+    jobs.close()
+
+
+def test_background_thread_fires_on_time():
+    ran = []
+    jobs = Scheduler("jobs.db", run_job=lambda job: ran.append(time.time()))
+    jobs.start()
+    target = time.time() + 0.2
+    jobs.add("soon", datetime.fromtimestamp(target))
+
+    time.sleep(0.5)
+    jobs.close()
+
+    assert len(ran) == 1
+    assert 0 <= ran[0] - target < 0.2
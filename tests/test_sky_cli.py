@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+import sky_cli
+
+
+def run(capsys, *argv):
+    status = sky_cli.main(list(argv))
+    return status, json.loads(capsys.readouterr().out)
+
+
+def test_send_queues_one_message(capsys):
+    status, result = run(capsys, "send", "0712345678", "Hello!")
+
+    assert status == 0
+    assert result["queued"] == 1 and len(result["ids"]) == 1
+
+
+def test_send_now_reports_each_result(capsys, workdir):
+    (workdir / "messages.jsonl").write_text('{"phone": "0711111111", "message": "a"}\n'
+                                            '# comment\n\n{"phone": "0722222222", "message": "b"}\n')
+
+    status, result = run(capsys, "send", "--input", "messages.jsonl", "--now", "--transport", "mock")
+
+    assert status == 0
+    assert result["sent"] == 2 and result["failed"] == 0
+
+
+@pytest.mark.parametrize("argv", [
+    ["send"],
+    ["send", "0711111111", "hi", "--input", "x.jsonl"],
+    ["send", "--input", "missing.jsonl"],
+    ["send", "--input", "bad.jsonl"],
+    ["send", "0711111111", "hi", "--at", "noon"],
+    ["broadcast", "hi"],
+])
+def test_bad_input_exits_2_with_an_error(capsys, workdir, argv):
+    (workdir / "bad.jsonl").write_text('{"phone": "0711111111", "message": "a"}\n{broken\n')
+
+    status, result = run(capsys, *argv)
+
+    assert status == 2
+    assert result["error"]
+
+
+def test_broadcast_to_imported_group_resumes_by_id(capsys, workdir):
+    (workdir / "contacts.csv").write_text("name,phone\nAnn,0711111111\nBo,0722222222\n")
+    assert run(capsys, "import", "contacts.csv", "--group", "vip")[1]["added"] == 2
+
+    status, result = run(capsys, "broadcast", "Hi {name}", "--group", "vip", "--broadcast-id", "b1")
+    assert status == 0
+    assert result == {"broadcast_id": "b1", "recipients": 2, "queued": 2}
+
+    assert run(capsys, "broadcast", "Hi {name}", "--group", "vip", "--broadcast-id", "b1")[1]["queued"] == 0
+
+
+def test_scheduled_sends_are_listed(capsys):
+    assert run(capsys, "send", "0711111111", "later", "--at", "23:59", "--daily")[1]["scheduled"] == 1
+
+    status, result = run(capsys, "schedule", "list")
+
+    assert status == 0
+    [job] = result["jobs"]
+    assert job["message"] == "later"
+
+
+def test_pro_clients_import_and_report(capsys, workdir):
+    (workdir / "clients.csv").write_text("business,phone,plan\nAcme,0711111111,pro\nBeta,0722222222,basic\n")
+    assert run(capsys, "import", "clients.csv", "--bot", "pro")[1]["added"] == 2
+
+    status, result = run(capsys, "clients", "report", "--plan", "pro", "--all")
+
+    assert status == 0
+    assert [client["business"] for client in result["clients"]] == ["Acme"]
+    assert result["income"]["monthly"] == 2000
+
+
+def test_simple_bot_records_created_messages(capsys):
+    status, result = run(capsys, "--storage", "json", "send", "0711111111", "hi", "--bot", "simple")
+
+    assert status == 0
+    assert result == {"created": 1}
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from storage import SQLiteBackend, open_storage
+
+
+def entry(day, phone="27711111111", status="sent"):
+    return {"timestamp": f"{day}T12:00:00", "phone": phone, "message": "hi", "type": "instant", "status": status}
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def storage(request):
+    storage = open_storage(request.param)
+    yield storage
+    storage.close()
+
+
+def test_contacts_are_unique_by_phone_and_paged_by_group(storage):
+    assert storage.add_contact({"name": "Ann", "phone": "27711111111", "group": "vip"})
+    assert not storage.add_contact({"name": "Ann again", "phone": "27711111111"})
+    assert storage.add_contacts([{"name": f"C{i}", "phone": f"277200000{i:02d}"} for i in range(5)]) == 5
+
+    assert storage.contact_count() == 6
+    assert storage.contact_count("vip") == 1
+    assert [c["name"] for c in storage.contacts_in_group("vip")] == ["Ann"]
+    assert len(storage.contacts_page(offset=4, limit=10)) == 2
+    assert storage.get_contact("27711111111")["name"] == "Ann"
+
+
+def test_message_counts_by_day_and_status(storage):
+    storage.log_messages([entry("2026-10-17"), entry("2026-10-18"), entry("2026-10-18", status="failed")])
+
+    assert storage.message_count("2026-10-18") == 2
+    assert storage.message_count("2026-10-18", status="sent") == 1
+    assert storage.total_message_count() == 3
+    assert storage.message_days() == ["2026-10-17", "2026-10-18"]
+    assert storage.message_days(since="2026-10-18") == ["2026-10-18"]
+    assert storage.message_day_counts() == {"2026-10-17": 1, "2026-10-18": 2}
+    assert [e["status"] for e in storage.messages_on("2026-10-18")] == ["sent", "failed"]
+
+
+def test_client_ids_are_never_reused(storage):
+    first = storage.add_client({"business": "A", "phone": "1", "plan": "basic", "price": 500, "status": "active"})
+    second = storage.add_client({"business": "B", "phone": "2", "plan": "pro", "price": 1500, "status": "active"})
+    assert storage.remove_client(second["id"])
+
+    third = storage.add_client({"business": "C", "phone": "3", "plan": "pro", "price": 1500, "status": "active"})
+
+    assert third["id"] > second["id"] > first["id"]
+    assert storage.update_client(first["id"], status="inactive")
+    assert storage.monthly_income() == 1500
+    assert [c["business"] for c in storage.clients_by_plan("pro")] == ["C"]
+
+
+def test_new_database_imports_the_json_files_once(workdir):
+    json_storage = open_storage("json")
+    json_storage.add_contact({"name": "Ann", "phone": "27711111111"})
+    json_storage.log_message(entry("2026-10-18"))
+    json_storage.add_client({"business": "A", "phone": "1", "plan": "basic", "price": 500, "status": "active"})
+    json_storage.close()
+
+    storage = open_storage("sqlite")
+    assert (storage.contact_count(), storage.total_message_count(), len(storage.all_clients())) == (1, 1, 1)
+    storage.close()
+
+    storage = open_storage("sqlite")
+    assert storage.total_message_count() == 1
+    storage.close()
+
+
+def test_interrupted_legacy_import_runs_again_without_duplicates(workdir):
+    (workdir / "contacts.json").write_text(json.dumps([{"name": "Ann", "phone": "27711111111"}]))
+    json_storage = open_storage("json")
+    json_storage.log_message(entry("2026-10-18"))
+    json_storage.close()
+    partial = SQLiteBackend("skybot.db")
+    partial.log_message(entry("2026-10-18"))
+    partial.close()
+
+    storage = open_storage("sqlite")
+
+    assert storage.legacy_imported
+    assert storage.total_message_count() == 1
+    storage.close()
+
+
+def simple_bot(storage):
+    from simple_whatsapp_bot import SimpleWhatsAppBot
+
+    return SimpleWhatsAppBot(storage=storage)
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "json"])
+def test_simple_bot_imports_text_files_once(workdir, kind):
+    (workdir / "contacts.txt").write_text("Ann|Smith|27711111111|2024-01-01\nbroken\n")
+    (workdir / "messages.txt").write_text("2024-01-01 10:00:00|27711111111|hi|there\n")
+
+    bot = simple_bot(kind)
+
+    assert bot.storage.get_contact("27711111111")["name"] == "Ann|Smith"
+    assert [e["message"] for e in bot.storage.messages_on("2024-01-01")] == ["hi|there"]
+    assert sorted(path.name for path in workdir.glob("*.txt*")) == ["contacts.txt.migrated", "messages.txt.migrated"]
+    bot.storage.close()
+
+    bot = simple_bot(kind)
+    assert bot.storage.total_message_count() == 1
+    bot.storage.close()
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "json"])
+def test_simple_bot_resumes_an_interrupted_import_without_duplicates(workdir, kind):
+    lines = ["2024-01-01 10:00:00|27711111111|hi", "2024-01-01 10:00:00|27711111111|hi",
+             "2024-01-02 09:00:00|27722222222|bye"]
+    (workdir / "messages.txt.importing").write_text("\n".join(lines) + "\n")
+    # The crash happened after the first line was logged
+    storage = open_storage(kind, db_file="simple_bot.db", contacts_file="simple_contacts.json",
+                           log_dir="simple_message_log", clients_file="simple_clients.json")
+    storage.log_message({"timestamp": "2024-01-01 10:00:00", "phone": "27711111111", "message": "hi",
+                         "type": "manual", "status": "created"})
+    storage.close()
+
+    bot = simple_bot(kind)
+
+    assert bot.storage.message_count("2024-01-01") == 2
+    assert bot.storage.message_count("2024-01-02") == 1
+    assert not (workdir / "messages.txt.importing").exists()
+    assert (workdir / "messages.txt.migrated").exists()
+    bot.storage.close()
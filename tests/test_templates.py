@@ -0,0 +1,61 @@
+from templates import CompiledTemplate, TemplateStore
+
+
+def test_plain_fields_render_from_the_record():
+    template = CompiledTemplate("Hi {name}, 100% {group}!")
+
+    assert template.render({"name": "Ann", "group": "vip"}) == "Hi Ann, 100% vip!"
+    assert template.fields == ["name", "group"]
+
+
+def test_static_text_and_stray_braces_are_sent_as_is():
+    assert CompiledTemplate("No placeholders").is_static
+    assert CompiledTemplate("Oops {unclosed").render({"name": "x"}) == "Oops {unclosed"
+    assert CompiledTemplate("{{literal}} {name}").render({"name": "x"}) == "{literal} x"
+
+
+def test_format_specs_per_occurrence():
+    template = CompiledTemplate("R{price:,} ({price:>8}) {name!r}")
+
+    assert template.render({"price": 1234567, "name": "Ann"}) == "R1,234,567 ( 1234567) 'Ann'"
+
+
+def test_none_renders_empty():
+    template = CompiledTemplate("Hi {name}, R{price:,}")
+
+    assert template.render({"name": None, "price": None}) == "Hi , R"
+
+
+def test_missing_fields_are_left_as_written():
+    template = CompiledTemplate("Hi {name}, R{price:,}")
+
+    assert template.render({"name": "Ann"}) == "Hi Ann, R{price:,}"
+    assert template.render(None) == "Hi {name}, R{price:,}"
+
+
+def test_unformattable_value_falls_back_to_text():
+    assert CompiledTemplate("R{price:,}").render({"price": "call us"}) == "Rcall us"
+
+
+def test_defaults_and_extras():
+    template = CompiledTemplate("Hi {name} from {business}", defaults={"name": "friend"})
+
+    assert template.render({}, business="Sky") == "Hi friend from Sky"
+    assert template.render({"name": "Ann"}, business="Sky", name="Bo") == "Hi Bo from Sky"
+
+
+def test_store_prefers_messages_file_and_reloads_on_change(workdir):
+    store = TemplateStore("messages.json")
+    store.register(1, "builtin {name}")
+    assert store.render(1, {"name": "a"}) == "builtin a"
+
+    (workdir / "messages.json").write_text('[{"id": 1, "content": "file {name}", "category": "greeting"}]')
+    assert store.render(1, {"name": "a"}) == "file a"
+    assert [t.id for t in store.by_category("greeting")] == [1]
+
+
+def test_non_identifier_fields_are_plain_record_keys():
+    template = CompiledTemplate("{0} {first.name}")
+
+    assert template.render({"0": "a", "first.name": "b"}) == "a b"
+    assert template.render({"0": "a"}) == "a {first.name}"
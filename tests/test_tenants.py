@@ -0,0 +1,74 @@
+import json
+import time
+
+import pytest
+
+
+@pytest.fixture
+def runtime():
+    # Imported here: Sky opens whatsapp_bot.log in the cwd on import
+    from tenants import TenantRuntime
+
+    runtime = TenantRuntime(transport="mock", rate=1000, burst=100, workers=2, idle_wait=0.05)
+    yield runtime
+    runtime.close()
+
+
+def client(client_id, plan="pro", status="active"):
+    return {"id": client_id, "business": f"Business {client_id}", "phone": f"07{client_id:08d}",
+            "plan": plan, "status": status}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_each_tenant_gets_its_own_directory_and_config(runtime, workdir):
+    bot = runtime.add_tenant(client(1))
+
+    assert runtime.add_tenant(client(1)) is bot
+    assert runtime.tenant_ids() == ["1"]
+    config = json.loads((workdir / "tenants" / "1" / "config.json").read_text())
+    assert config["business"] == "Business 1"
+    assert config["bot"]["your_number"] == "0700000001"
+
+
+def test_queued_messages_go_out_under_their_tenant(runtime):
+    runtime.add_tenant(client(1))
+    runtime.add_tenant(client(2))
+    runtime.start()
+
+    runtime.queue_message(1, "0711111111", "from one")
+    runtime.queue_broadcast(2, ["0722222222", "0733333333"], "from two")
+
+    wait_for(lambda: len(runtime.get(1).transport.sent) == 1 and len(runtime.get(2).transport.sent) == 2)
+    wait_for(lambda: runtime.get(2).storage.message_count() == 2)
+    assert [row["client"] for row in runtime.get(2).storage.messages_on()] == ["2", "2"]
+    assert runtime.get(1).quota.used("1") == 1
+
+
+def test_plan_limits_follow_the_client_record(runtime):
+    bot = runtime.add_tenant(client(1, plan="basic"))
+    assert bot.quota.remaining("1") == 100
+
+    runtime.add_tenant(client(1, status="inactive"))
+    runtime.start()
+    message_id = runtime.queue_message(1, "0711111111", "held back")
+
+    wait_for(lambda: bot.outbox.get(message_id)["last_error"])
+    assert bot.outbox.get(message_id)["status"] == "pending"
+    assert bot.outbox.get(message_id)["next_attempt_at"] > time.time()
+    assert bot.transport.sent == []
+
+
+def test_removed_tenant_is_closed(runtime):
+    runtime.add_tenant(client(1))
+
+    runtime.remove_tenant(1)
+
+    assert runtime.tenant_ids() == []
+    with pytest.raises(KeyError):
+        runtime.get(1)
@@ -0,0 +1,256 @@
+"""
+Sky Bot - Message transports
+How a message actually reaches WhatsApp: pywhatkit tabs, a persistent
+WhatsApp Web session, or an offline mock
+"""
+
+import os
+import random
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+
+class Transport:
+    """Interface for sending WhatsApp messages"""
+
+    # True if send_* may be called from several threads at once
+    concurrent = False
+
+    def send_text(self, phone_number: str, message: str):
+        """
+        Send a text message
+
+        Args:
+            phone_number: Number with country code, digits only
+            message: Message text
+        """
+        raise NotImplementedError
+
+    def send_image(self, phone_number: str, image_path: str, caption: str = ""):
+        """Send an image with an optional caption"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyWhatKitTransport(Transport):
+    """Original behaviour: pywhatkit opens a new WhatsApp Web tab per message"""
+
+    def __init__(self, wait_time: int = 20, close_tab: bool = True, tab_close_delay: int = 3):
+        self._kit = None
+        self.wait_time = wait_time
+        self.close_tab = close_tab
+        self.tab_close_delay = tab_close_delay
+
+    @property
+    def kit(self):
+        """pywhatkit, imported on the first send (slow to import, and it wants a display)"""
+        if self._kit is None:
+            import pywhatkit
+
+            self._kit = pywhatkit
+        return self._kit
+
+    def send_text(self, phone_number: str, message: str):
+        self.kit.sendwhatmsg_instantly(
+            phone_no=f"+{phone_number}",
+            message=message,
+            wait_time=self.wait_time,
+            tab_close=self.close_tab,
+            close_time=self.tab_close_delay
+        )
+
+    def send_image(self, phone_number: str, image_path: str, caption: str = ""):
+        self.kit.sendwhats_image(
+            receiver=f"+{phone_number}",
+            img_path=image_path,
+            caption=caption,
+            wait_time=self.wait_time,
+            tab_close=self.close_tab,
+            close_time=self.tab_close_delay
+        )
+
+
+class WebSessionTransport(Transport):
+    """
+    One long-lived WhatsApp Web browser session reused for every message
+
+    The browser profile is kept in `profile_dir`, so the QR code only has
+    to be scanned once. WhatsApp Web is loaded once at startup; chats are
+    then opened inside the running app, and a send returns once WhatsApp
+    has taken the message (its bubble no longer shows the pending clock).
+    """
+
+    WEB_URL = "https://web.whatsapp.com"
+    SEND_LINK = "https://api.whatsapp.com/send"
+    COMPOSE_BOX = "div[contenteditable='true'][data-tab='10']"
+    SEND_BUTTON = "span[data-icon='send']"
+    ATTACH_INPUT = "input[type='file'][accept*='image']"
+    CAPTION_BOX = "div[contenteditable='true'][data-tab='undefined']"
+    OUTGOING = "div.message-out"
+    PENDING_ICON = "span[data-icon='msg-time']"
+
+    # Clicking a send link inside the app makes WhatsApp Web switch chats itself
+    OPEN_CHAT_SCRIPT = (
+        "var link = document.createElement('a');"
+        "link.href = arguments[0];"
+        "document.body.appendChild(link);"
+        "link.click();"
+        "link.remove();"
+    )
+
+    def __init__(self, profile_dir: str = "whatsapp_session", wait_time: int = 20,
+                 login_timeout: int = 120, headless: bool = False, send_timeout: int = 60):
+        from selenium import webdriver
+        from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        self._by = By
+        self._ec = EC
+        self._wait_cls = WebDriverWait
+        self._stale = StaleElementReferenceException
+        self._timeout = TimeoutException
+        self.wait_time = wait_time
+        self.send_timeout = send_timeout
+        self._lock = threading.Lock()
+        self._chat: Optional[str] = None
+
+        options = webdriver.ChromeOptions()
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+        if headless:
+            options.add_argument("--headless=new")
+
+        self.driver = webdriver.Chrome(options=options)
+        self.driver.get(self.WEB_URL)
+
+        # Wait once for the chat list (QR scan on first run)
+        self._wait(login_timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#pane-side"))
+        )
+        logger.info("WhatsApp Web session ready")
+
+    def _wait(self, timeout: Optional[int] = None):
+        return self._wait_cls(self.driver, timeout or self.wait_time, ignored_exceptions=(self._stale,))
+
+    def _compose_box(self):
+        return self._wait().until(
+            self._ec.presence_of_element_located((self._by.CSS_SELECTOR, self.COMPOSE_BOX))
+        )
+
+    def _open_chat(self, phone_number: str, text: str = ""):
+        """
+        Open a chat (with `text` as the draft) without reloading WhatsApp Web
+
+        Falls back to loading the send URL if the app didn't switch chats.
+        """
+        query = f"?phone={phone_number}&text={quote(text)}"
+        previous = self.driver.find_elements(self._by.CSS_SELECTOR, self.COMPOSE_BOX)
+        self.driver.execute_script(self.OPEN_CHAT_SCRIPT, self.SEND_LINK + query)
+        try:
+            if previous and phone_number != self._chat:
+                # The old chat's compose box goes away when the new chat opens
+                self._wait().until(self._ec.staleness_of(previous[0]))
+            self._compose_box()
+        except self._timeout:
+            logger.warning(f"In-app chat switch to {phone_number} failed, reloading WhatsApp Web")
+            self._chat = None
+            self.driver.get(f"{self.WEB_URL}/send{query}")
+            self._compose_box()
+        self._chat = phone_number
+
+    def _last_outgoing(self):
+        bubbles = self.driver.find_elements(self._by.CSS_SELECTOR, self.OUTGOING)
+        return bubbles[-1] if bubbles else None
+
+    def _click_send(self):
+        """Click send and wait until the new outgoing bubble has left the pending state"""
+        previous = self._last_outgoing()
+        self._wait().until(
+            self._ec.element_to_be_clickable((self._by.CSS_SELECTOR, self.SEND_BUTTON))
+        ).click()
+
+        def accepted(driver):
+            bubble = self._last_outgoing()
+            if bubble is None or bubble == previous:
+                return False
+            return not bubble.find_elements(self._by.CSS_SELECTOR, self.PENDING_ICON)
+
+        self._wait(self.send_timeout).until(accepted)
+
+    def send_text(self, phone_number: str, message: str):
+        with self._lock:
+            self._open_chat(phone_number, message)
+            self._click_send()
+
+    def send_image(self, phone_number: str, image_path: str, caption: str = ""):
+        with self._lock:
+            self._open_chat(phone_number)
+            self.driver.find_element(self._by.CSS_SELECTOR, self.ATTACH_INPUT).send_keys(
+                os.path.abspath(image_path)
+            )
+            if caption:
+                self._wait().until(
+                    self._ec.presence_of_element_located((self._by.CSS_SELECTOR, self.CAPTION_BOX))
+                ).send_keys(caption)
+            self._click_send()
+
+    def close(self):
+        with self._lock:
+            self.driver.quit()
+
+
+class MockTransport(Transport):
+    """Offline transport for tests and benchmarks; records instead of sending"""
+
+    concurrent = True
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0):
+        """
+        Args:
+            latency: Seconds each send takes
+            failure_rate: Fraction of sends that raise (0.0 - 1.0)
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.sent: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def _record(self, **message):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError(f"Mock send failed for {message['phone']}")
+        with self._lock:
+            self.sent.append(message)
+
+    def send_text(self, phone_number: str, message: str):
+        self._record(phone=phone_number, message=message)
+
+    def send_image(self, phone_number: str, image_path: str, caption: str = ""):
+        self._record(phone=phone_number, message=caption, image=image_path)
+
+
+def create_transport(kind: str = "pywhatkit", **options) -> Transport:
+    """
+    Build a transport by name
+
+    Args:
+        kind: "pywhatkit", "web" (persistent session) or "mock"
+        options: Passed to the transport's constructor
+    """
+    transports = {
+        "pywhatkit": PyWhatKitTransport,
+        "web": WebSessionTransport,
+        "mock": MockTransport,
+    }
+    if kind not in transports:
+        raise ValueError(f"Unknown transport: {kind}")
+    return transports[kind](**options)